@@ -3,6 +3,8 @@ import logging
 import httpx
 from typing import AsyncGenerator, Dict, Any
 from app.config.settings import settings
+from ai.llm.errors import LLMStreamError
+from ai.llm.http_pool import HTTPClientPool
 import json 
 
 # Configuration des logs
@@ -15,6 +17,10 @@ class DeepseekClient:
         self.api_key = settings.DEEPSEEK_API_KEY 
         self.base_url = "https://api.deepseek.com/v1/chat/completions"  # URL corrigée
         self.timeout = 60.0  # Timeout plus long pour les requêtes streaming
+
+    def _client(self) -> httpx.AsyncClient:
+        """Client HTTP partagé (keep-alive) pour ce backend"""
+        return HTTPClientPool.get_client("deepseek", self.timeout)
     
     async def generate_response(self, prompt: str, stream: bool = False) -> AsyncGenerator[str, None] | Dict[str, Any]:
         """
@@ -48,89 +54,90 @@ class DeepseekClient:
     async def _stream_response(self, headers: Dict[str, str], payload: Dict[str, Any]) -> AsyncGenerator[str, None]:
         """Gère la réponse streaming"""
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                async with client.stream(
-                    "POST",
-                    self.base_url,  # URL corrigée
-                    json=payload,
-                    headers=headers
-                ) as response:
-                    response.raise_for_status()
+            client = self._client()
+            async with client.stream(
+                "POST",
+                self.base_url,  # URL corrigée
+                json=payload,
+                headers=headers
+            ) as response:
+                response.raise_for_status()
                     
-                    async for line in response.aiter_lines():
-                        line = line.strip()
+                async for line in response.aiter_lines():
+                    line = line.strip()
                         
-                        # Traiter les lignes SSE
-                        if line.startswith("data:"):
-                            data_content = line[5:].strip()
+                    # Traiter les lignes SSE
+                    if line.startswith("data:"):
+                        data_content = line[5:].strip()
                             
-                            # Fin du stream
-                            if data_content == "[DONE]":
-                                break
+                        # Fin du stream
+                        if data_content == "[DONE]":
+                            break
                             
-                            # Parser le JSON
-                            if data_content:
-                                try:
-                                    data = json.loads(data_content)
+                        # Parser le JSON
+                        if data_content:
+                            try:
+                                data = json.loads(data_content)
                                     
-                                    # Extraire le contenu du delta
-                                    choices = data.get("choices", [])
-                                    if choices:
-                                        delta = choices[0].get("delta", {})
-                                        content = delta.get("content", "")
+                                # Extraire le contenu du delta
+                                choices = data.get("choices", [])
+                                if choices:
+                                    delta = choices[0].get("delta", {})
+                                    content = delta.get("content", "")
                                         
-                                        if content:
-                                            yield content
+                                    if content:
+                                        yield content
                                             
-                                except json.JSONDecodeError as e:
-                                    logger.warning(f"Erreur parsing JSON: {data_content} - {e}")
-                                    continue
-                                except Exception as e:
-                                    logger.error(f"Erreur traitement chunk: {e}")
-                                    continue
+                            except json.JSONDecodeError as e:
+                                logger.warning(f"Erreur parsing JSON: {data_content} - {e}")
+                                continue
+                            except Exception as e:
+                                logger.error(f"Erreur traitement chunk: {e}")
+                                continue
                         
-                        # Petit délai pour éviter la surcharge
-                        await asyncio.sleep(0.01)
+                    # Délai optionnel (désactivé par défaut) : la contre-pression vient de l'envoi ASGI
+                    if settings.STREAM_CHUNK_DELAY:
+                        await asyncio.sleep(settings.STREAM_CHUNK_DELAY)
                         
-        except httpx.TimeoutException:
+        except httpx.TimeoutException as e:
             logger.error("Timeout lors du streaming DeepSeek")
-            yield "Erreur: Timeout de la requête"
+            raise LLMStreamError("Erreur: Timeout de la requête") from e
         except httpx.HTTPStatusError as e:
             logger.error(f"Erreur HTTP DeepSeek: {e.response.status_code} - {e.response.text}")
-            yield f"Erreur API: {e.response.status_code}"
+            raise LLMStreamError(f"Erreur API: {e.response.status_code}") from e
         except Exception as e:
             logger.error(f"Erreur streaming DeepSeek: {e}", exc_info=True)
-            yield "Erreur lors de la génération de la réponse"
+            raise LLMStreamError("Erreur lors de la génération de la réponse") from e
     
     async def _single_response(self, headers: Dict[str, str], payload: Dict[str, Any]) -> Dict[str, Any]:
         """Gère la réponse simple (non-streaming)"""
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    self.base_url,
-                    json=payload,
-                    headers=headers
-                )
-                response.raise_for_status()
-                data = response.json()
+            client = self._client()
+            response = await client.post(
+                self.base_url,
+                json=payload,
+                headers=headers
+            )
+            response.raise_for_status()
+            data = response.json()
                 
-                # Extraire le contenu de la réponse
-                choices = data.get("choices", [])
-                if choices:
-                    message_content = choices[0].get("message", {}).get("content", "")
-                    return {
-                        'message': {
-                            'content': message_content
-                        },
-                        'usage': data.get('usage', {}),
-                        'model': data.get('model', self.model)
-                    }
-                else:
-                    return {
-                        'message': {
-                            'content': 'Aucune réponse générée'
-                        }
+            # Extraire le contenu de la réponse
+            choices = data.get("choices", [])
+            if choices:
+                message_content = choices[0].get("message", {}).get("content", "")
+                return {
+                    'message': {
+                        'content': message_content
+                    },
+                    'usage': data.get('usage', {}),
+                    'model': data.get('model', self.model)
+                }
+            else:
+                return {
+                    'message': {
+                        'content': 'Aucune réponse générée'
                     }
+                }
                     
         except httpx.TimeoutException:
             logger.error("Timeout lors de la requête DeepSeek")
@@ -0,0 +1,2 @@
+class LLMStreamError(Exception):
+    """Le flux du LLM s'est interrompu : la réponse déjà envoyée est incomplète"""
@@ -0,0 +1,66 @@
+import importlib.util
+import logging
+from typing import Dict
+
+import httpx
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPClientPool:
+    """
+    Pool de clients httpx partagés par backend LLM (un seul par processus).
+    Les connexions restent ouvertes (keep-alive) entre les requêtes, ce qui évite
+    de repayer l'établissement TCP/TLS à chaque question.
+    """
+    _clients: Dict[str, httpx.AsyncClient] = {}
+
+    # Configuration par backend : (connexions max, HTTP/2 souhaité)
+    _backends = {
+        "ollama": (settings.OLLAMA_MAX_CONNECTIONS, settings.OLLAMA_HTTP2),
+        "deepseek": (settings.DEEPSEEK_MAX_CONNECTIONS, settings.DEEPSEEK_HTTP2),
+    }
+
+    @classmethod
+    def get_client(cls, backend: str, timeout: float = 60.0) -> httpx.AsyncClient:
+        """Récupère (ou crée à la demande) le client partagé d'un backend"""
+        client = cls._clients.get(backend)
+        if client is None or client.is_closed:
+            client = cls._create_client(backend, timeout)
+            cls._clients[backend] = client
+        return client
+
+    @classmethod
+    def _create_client(cls, backend: str, timeout: float) -> httpx.AsyncClient:
+        max_connections, http2 = cls._backends.get(backend, (settings.HTTP_MAX_CONNECTIONS, False))
+
+        # HTTP/2 nécessite le paquet optionnel "h2" (httpx[http2])
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning(f"HTTP/2 indisponible pour '{backend}' (paquet h2 absent) - repli sur HTTP/1.1")
+            http2 = False
+
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+        )
+        logger.info(f"Création du client HTTP '{backend}' - connexions max: {max_connections}, HTTP/2: {http2}")
+        return httpx.AsyncClient(timeout=timeout, limits=limits, http2=http2)
+
+    @classmethod
+    async def startup(cls):
+        """Ouvre les clients de tous les backends au démarrage de l'application"""
+        for backend in cls._backends:
+            cls.get_client(backend)
+
+    @classmethod
+    async def close(cls):
+        """Ferme toutes les connexions à l'arrêt de l'application"""
+        for backend, client in list(cls._clients.items()):
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.error(f"Erreur fermeture client HTTP '{backend}': {e}")
+        cls._clients.clear()
@@ -1,8 +1,10 @@
 import asyncio
 import logging
 import httpx
-from typing import AsyncGenerator, Dict, Any
+from typing import AsyncGenerator, Dict, Any, Optional
 from app.config.settings import settings
+from ai.llm.errors import LLMStreamError
+from ai.llm.http_pool import HTTPClientPool
 import json
 
 # Configuration des logs
@@ -10,10 +12,17 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class OllamaClient:
+    # Mesures de temps renvoyées par Ollama dans le dernier message (durées en ns)
+    STATS_FIELDS = ("total_duration", "load_duration", "prompt_eval_count", "prompt_eval_duration", "eval_count", "eval_duration")
+
     def __init__(self) -> None:
         self.model = settings.OLLAMA_MODEL  
         self.base_url = settings.OLLAMA_API_URL  
         self.timeout = 60.0
+
+    def _client(self) -> httpx.AsyncClient:
+        """Client HTTP partagé (keep-alive) pour ce backend"""
+        return HTTPClientPool.get_client("ollama", self.timeout)
     
     async def generate_response(self, prompt: str, stream: bool = False) -> AsyncGenerator[str, None] | Dict[str, Any]:
         """
@@ -30,6 +39,7 @@ class OllamaClient:
             "model": self.model,
             "prompt": prompt,
             "stream": stream,
+            "keep_alive": settings.OLLAMA_KEEP_ALIVE,
             "options": {
                 "temperature": 0.7,
                 "num_predict": 2000  # Équivalent à max_tokens
@@ -44,59 +54,60 @@ class OllamaClient:
     async def _stream_response(self, payload: Dict[str, Any]) -> AsyncGenerator[str, None]:
         """Gère la réponse streaming"""
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                async with client.stream(
-                    "POST",
-                    f"{self.base_url}/generate",
-                    json=payload
-                ) as response:
-                    response.raise_for_status()
+            client = self._client()
+            async with client.stream(
+                "POST",
+                f"{self.base_url}/generate",
+                json=payload
+            ) as response:
+                response.raise_for_status()
                     
-                    async for line in response.aiter_lines():
-                        line = line.strip()
-                        if line:
-                            try:
-                                data = json.loads(line)
-                                if "response" in data:
-                                    yield data["response"]
-                            except json.JSONDecodeError as e:
-                                logger.warning(f"Erreur parsing JSON: {line} - {e}")
-                                continue
-                            except Exception as e:
-                                logger.error(f"Erreur traitement chunk: {e}")
-                                continue
+                async for line in response.aiter_lines():
+                    line = line.strip()
+                    if line:
+                        try:
+                            data = json.loads(line)
+                            if "response" in data:
+                                yield data["response"]
+                        except json.JSONDecodeError as e:
+                            logger.warning(f"Erreur parsing JSON: {line} - {e}")
+                            continue
+                        except Exception as e:
+                            logger.error(f"Erreur traitement chunk: {e}")
+                            continue
                         
-                        # Petit délai pour éviter la surcharge
-                        await asyncio.sleep(0.01)
+                    # Délai optionnel (désactivé par défaut) : la contre-pression vient de l'envoi ASGI
+                    if settings.STREAM_CHUNK_DELAY:
+                        await asyncio.sleep(settings.STREAM_CHUNK_DELAY)
                         
-        except httpx.TimeoutException:
+        except httpx.TimeoutException as e:
             logger.error("Timeout lors du streaming Ollama")
-            yield "Erreur: Timeout de la requête"
+            raise LLMStreamError("Erreur: Timeout de la requête") from e
         except httpx.HTTPStatusError as e:
             logger.error(f"Erreur HTTP Ollama: {e.response.status_code} - {e.response.text}")
-            yield f"Erreur API: {e.response.status_code}"
+            raise LLMStreamError(f"Erreur API: {e.response.status_code}") from e
         except Exception as e:
             logger.error(f"Erreur streaming Ollama: {e}", exc_info=True)
-            yield "Erreur lors de la génération de la réponse"
+            raise LLMStreamError("Erreur lors de la génération de la réponse") from e
     
     async def _single_response(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Gère la réponse simple (non-streaming)"""
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/generate",
-                    json=payload
-                    )
-                response.raise_for_status()
-                data = response.json()
+            client = self._client()
+            response = await client.post(
+                f"{self.base_url}/generate",
+                json=payload
+                )
+            response.raise_for_status()
+            data = response.json()
                 
-                return {
-                    'message': {
-                        'content': data.get("response", "")
-                    },
-                    'model': data.get("model", self.model),
-                    'stats': data.get("stats", {})
-                }
+            return {
+                'message': {
+                    'content': data.get("response", "")
+                },
+                'model': data.get("model", self.model),
+                'stats': data.get("stats", {})
+            }
                 
         except httpx.TimeoutException:
             logger.error("Timeout lors de la requête Ollama")
@@ -113,21 +124,26 @@ class OllamaClient:
             logger.error(f"Erreur Ollama: {e}", exc_info=True)
             return {'message': {'content': 'Erreur lors de la génération de la réponse'}}
     
-    async def generate_with_context(self, messages: list, stream: bool = False) -> AsyncGenerator[str, None] | Dict[str, Any]:
+    async def generate_with_context(self, messages: list, stream: bool = False, options: Optional[Dict[str, Any]] = None) -> AsyncGenerator[str, None] | Dict[str, Any]:
         """
         Génère une réponse avec un contexte de conversation
         
         Args:
-            messages: Liste des messages [{"role": "user/assistant", "content": "..."}]
+            messages: Liste des messages [{"role": "system/user/assistant", "content": "..."}]
+                      Le message système doit rester identique d'une requête à l'autre :
+                      Ollama réutilise alors le préfixe déjà évalué au lieu de le recalculer
             stream: Si True, retourne un générateur async
+            options: Options Ollama qui remplacent celles par défaut
         """
         payload = {
             "model": self.model,
             "messages": messages,
             "stream": stream,
+            "keep_alive": settings.OLLAMA_KEEP_ALIVE,
             "options": {
                 "temperature": 0.7,
-                "num_predict": 2000
+                "num_predict": 2000,
+                **(options or {})
             }
         }
         
@@ -139,69 +155,86 @@ class OllamaClient:
     async def _stream_chat_response(self, payload: Dict[str, Any]) -> AsyncGenerator[str, None]:
         """Gère la réponse streaming pour le chat"""
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                async with client.stream(
-                    "POST",
-                    f"{self.base_url}/chat",
-                    json=payload
-                ) as response:
-                    response.raise_for_status()
+            client = self._client()
+            async with client.stream(
+                "POST",
+                f"{self.base_url}/chat",
+                json=payload
+            ) as response:
+                response.raise_for_status()
                     
-                    async for line in response.aiter_lines():
-                        line = line.strip()
-                        if line:
-                            try:
-                                data = json.loads(line)
-                                if "message" in data and "content" in data["message"]:
-                                    yield data["message"]["content"]
-                            except json.JSONDecodeError as e:
-                                logger.warning(f"Erreur parsing JSON: {line} - {e}")
-                                continue
-                            except Exception as e:
-                                logger.error(f"Erreur traitement chunk: {e}")
-                                continue
+                async for line in response.aiter_lines():
+                    line = line.strip()
+                    if line:
+                        try:
+                            data = json.loads(line)
+                            if "message" in data and "content" in data["message"]:
+                                yield data["message"]["content"]
+                            if data.get("done"):
+                                self._log_stats(self._extract_stats(data))
+                        except json.JSONDecodeError as e:
+                            logger.warning(f"Erreur parsing JSON: {line} - {e}")
+                            continue
+                        except Exception as e:
+                            logger.error(f"Erreur traitement chunk: {e}")
+                            continue
                         
-                        await asyncio.sleep(0.01)
+                    if settings.STREAM_CHUNK_DELAY:
+                        await asyncio.sleep(settings.STREAM_CHUNK_DELAY)
                         
         except Exception as e:
             logger.error(f"Erreur streaming chat Ollama: {e}")
-            yield "Erreur lors de la génération de la réponse"
+            raise LLMStreamError("Erreur lors de la génération de la réponse") from e
     
     async def _single_chat_response(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Gère la réponse simple pour le chat"""
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/chat",
-                    json=payload
-                )
-                response.raise_for_status()
-                data = response.json()
+            client = self._client()
+            response = await client.post(
+                f"{self.base_url}/chat",
+                json=payload
+            )
+            response.raise_for_status()
+            data = response.json()
                 
-                return {
-                    'message': data.get("message", {}),
-                    'model': data.get("model", self.model),
-                    'stats': data.get("stats", {})
-                }
+            stats = self._extract_stats(data)
+            self._log_stats(stats)
+            return {
+                'message': data.get("message", {}),
+                'model': data.get("model", self.model),
+                'stats': stats
+            }
                 
         except Exception as e:
             logger.error(f"Erreur chat Ollama: {e}")
             return {'message': {'content': 'Erreur lors de la génération de la réponse'}}
     
+    def _extract_stats(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {field: data[field] for field in self.STATS_FIELDS if field in data}
+
+    def _log_stats(self, stats: Dict[str, Any]):
+        """Temps d'évaluation du prompt : chute nette quand le préfixe est servi depuis le cache"""
+        if "prompt_eval_duration" in stats:
+            logger.info(
+                f"Ollama prompt: {stats.get('prompt_eval_count', 0)} tokens évalués en "
+                f"{stats['prompt_eval_duration'] / 1e6:.0f} ms | génération: {stats.get('eval_count', 0)} tokens en "
+                f"{stats.get('eval_duration', 0) / 1e6:.0f} ms"
+            )
+
     async def test_connection(self) -> Dict[str, Any]:
         """Test de connexion à l'API Ollama"""
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.head(self.base_url)
-                response.raise_for_status()
+            client = self._client()
+            response = await client.head(self.base_url)
+            response.raise_for_status()
                 
-                # Test supplémentaire avec une petite requête
-                test_result = await self.generate_response("Test de connexion", stream=False)
-                return {
-                    'success': True,
-                    'model': self.model,
-                    'response_length': len(test_result.get('message', {}).get('content', ''))
-                }
+            # Test supplémentaire avec une petite requête
+            test_result = await self.generate_response("Test de connexion", stream=False)
+            return {
+                'success': True,
+                'model': self.model,
+                'response_length': len(test_result.get('message', {}).get('content', ''))
+            }
         except httpx.TimeoutException:
             return {
                 'success': False,
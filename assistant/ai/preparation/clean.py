@@ -1,17 +1,64 @@
+import html
 import re
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Iterable, List, Optional
+
 from bs4 import BeautifulSoup
 
+# Contenu non textuel retiré avant les balises (commentaires, <script>, <style>)
+_NON_TEXT_RE = re.compile(r"<!--.*?-->|<(script|style)\b[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+# Les valeurs d'attribut entre guillemets peuvent contenir ">" ; un guillemet isolé part dans le repli
+_TAG_RE = re.compile(r"""</?[a-zA-Z](?:=\s*"[^"]*"|=\s*'[^']*'|[^'"<>])*>|<![^<>]*>""")
+# Reste de balise après nettoyage : balisage mal formé (balise non fermée, attribut coupé...)
+_MALFORMED_RE = re.compile(r"<[a-zA-Z/!]")
+_SPACES_RE = re.compile(r"\s+")
+
+
 def clean_text(text: str) -> str:
     """Nettoie le texte en supprimant HTML, CSS et caractères spéciaux."""
     if not isinstance(text, str):
         return ""
-    
-    # Suppression HTML/CSS/JS
-    soup = BeautifulSoup(text, "html.parser")
-    text = soup.get_text(separator=" ")
-    text = re.sub(r'<(style|script).*?>.*?</\1>', '', text, flags=re.DOTALL)
-    
+
+    # Chemin rapide : expressions régulières compilées, sans construire d'arbre HTML
+    if "<" in text:
+        stripped = _TAG_RE.sub(" ", _NON_TEXT_RE.sub(" ", text))
+        if _MALFORMED_RE.search(stripped):
+            return _clean_with_soup(text)
+        text = stripped
+    if "&" in text:
+        text = html.unescape(text)
+
     # Normalisation
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    return _SPACES_RE.sub(" ", text).strip()
+
 
+def clean_texts(texts: Iterable[str],
+                workers: int = 1,
+                chunksize: int = 512,
+                executor: Optional[Executor] = None) -> List[str]:
+    """
+    Nettoie une liste de textes, en parallèle sur un pool de processus si `workers` > 1
+    (ou si un `executor` est fourni). Les textes sont envoyés par lots de `chunksize`
+    pour amortir le coût de sérialisation entre processus.
+    """
+    texts = list(texts)
+    if executor is None and (workers <= 1 or len(texts) <= chunksize):
+        return [clean_text(text) for text in texts]
+
+    batches = [texts[i:i + chunksize] for i in range(0, len(texts), chunksize)]
+    if executor is not None:
+        return [text for batch in executor.map(_clean_batch, batches) for text in batch]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [text for batch in pool.map(_clean_batch, batches) for text in batch]
+
+
+def _clean_batch(texts: List[str]) -> List[str]:
+    return [clean_text(text) for text in texts]
+
+
+def _clean_with_soup(text: str) -> str:
+    """Repli pour le balisage mal formé : le parseur HTML tolère les balises incomplètes"""
+    soup = BeautifulSoup(text, "html.parser")
+    for tag in soup(["script", "style"]):
+        tag.decompose()
+    return _SPACES_RE.sub(" ", soup.get_text(separator=" ")).strip()
@@ -1,10 +1,87 @@
+from contextlib import contextmanager
+from typing import List, Optional
+
+import numpy as np
 import pandas as pd
 from ai.utils.model_loader import ModelLoader
 
 class EmbeddingGenerator:
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+    def __init__(self,
+                 model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+                 batch_size: int = 64,
+                 chunk_size: int = 8192,
+                 workers: int = 1,
+                 normalize: bool = True):
+        """
+        Args:
+            batch_size: Taille des lots envoyés au modèle
+            chunk_size: Nombre de lignes encodées par appel (borne la mémoire intermédiaire)
+            workers: >1 pour encoder sur plusieurs cœurs CPU (pool multi-processus sentence-transformers)
+            normalize: Vecteurs unitaires, pour des index cosinus / produit scalaire
+        """
         self.model = ModelLoader.get_model(model_name)
-    
-    def generate(self, df: pd.DataFrame, text_column: str = "text") -> pd.DataFrame:
-        df["embedding"] = df[text_column].apply(self.model.encode)
-        return df
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.normalize = normalize
+        self._pool = None
+
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    @contextmanager
+    def process_pool(self):
+        """
+        Garde le pool multi-processus ouvert pour tout le bloc : les appels à encode
+        (un par chunk lors d'une ingestion) réutilisent les mêmes processus et modèles
+        au lieu de les relancer à chaque appel. Sans effet si workers <= 1.
+        """
+        if self.workers <= 1 or self._pool is not None:
+            yield
+            return
+        self._pool = self.model.start_multi_process_pool(["cpu"] * self.workers)
+        try:
+            yield
+        finally:
+            self.model.stop_multi_process_pool(self._pool)
+            self._pool = None
+
+    def generate(self, df: pd.DataFrame, text_column: str = "text") -> np.ndarray:
+        """Encode une colonne texte ; la ligne i de la matrice correspond à la ligne i du DataFrame"""
+        return self.encode(df[text_column].fillna("").astype(str).tolist())
+
+    def encode(self, texts: List[str], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Encode des textes par lots dans une matrice float32 préallouée.
+        Les textes sont triés par longueur pour que chaque lot ait un padding minimal,
+        puis chaque résultat est écrit directement à sa position d'origine.
+        Hors d'un bloc process_pool, le pool multi-processus est créé pour cet appel seulement.
+        """
+        if out is None:
+            out = np.empty((len(texts), self.dimension), dtype="float32")
+        if not texts:
+            return out
+
+        order = np.argsort([len(t) for t in texts], kind="stable")
+        with self.process_pool():
+            for start in range(0, len(order), self.chunk_size):
+                positions = order[start:start + self.chunk_size]
+                chunk = [texts[i] for i in positions]
+                out[positions] = self._encode_chunk(chunk, self._pool)
+        return out
+
+    def _encode_chunk(self, chunk: List[str], pool) -> np.ndarray:
+        if pool is not None:
+            return self.model.encode_multi_process(
+                chunk, pool,
+                batch_size=self.batch_size,
+                normalize_embeddings=self.normalize
+            )
+        return self.model.encode(
+            chunk,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=self.normalize,
+            show_progress_bar=False
+        )
@@ -0,0 +1,191 @@
+import hashlib
+from typing import Any, Dict, List
+
+import faiss
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from .embedding import EmbeddingGenerator
+from .indexing import FAISSIndexer
+from .storage import ProductStore
+from app.config.logger import app_logger as logger
+
+
+class IncrementalIndexer:
+    """
+    Ingestion incrémentale du catalogue produits.
+    Chaque produit est identifié par son id et le hash de son texte nettoyé ;
+    seuls les produits nouveaux ou modifiés sont ré-encodés.
+
+    L'identifiant FAISS d'un produit est sa ligne dans les métadonnées : les
+    nouvelles versions sont ajoutées en fin de table, les anciennes lignes
+    deviennent des tombstones (retirées de l'index) jusqu'au prochain compactage.
+    """
+
+    def __init__(self,
+                 embedder: EmbeddingGenerator,
+                 store: ProductStore,
+                 id_column: str = "id",
+                 text_column: str = "text",
+                 compaction_ratio: float = 0.2,
+                 index_type: str = "flat"):
+        self.embedder = embedder
+        self.index_type = index_type
+        self.store = store
+        self.id_column = id_column
+        self.text_column = text_column
+        self.compaction_ratio = compaction_ratio
+
+    def sync(self, df: pd.DataFrame) -> Dict[str, int]:
+        """
+        Synchronise l'index avec le catalogue complet `df`.
+        Les produits absents de `df` sont considérés comme supprimés.
+        """
+        df = df.drop_duplicates(subset=self.id_column, keep="last").reset_index(drop=True)
+        product_ids = df[self.id_column].astype(str).tolist()
+        hashes = [self._content_hash(text) for text in df[self.text_column].fillna("").astype(str)]
+
+        manifest = self.store.load_manifest()
+        if not manifest or not self._matches_store(manifest):
+            return self._full_build(df, product_ids, hashes)
+
+        products: Dict[str, Dict[str, Any]] = manifest["products"]
+        tombstones: List[int] = manifest["tombstones"]
+        next_row: int = manifest["next_row"]
+
+        changed = [i for i, (pid, h) in enumerate(zip(product_ids, hashes))
+                   if pid not in products or products[pid]["hash"] != h]
+        updated = [product_ids[i] for i in changed if product_ids[i] in products]
+        deleted = set(products) - set(product_ids)
+        stats = {
+            "added": len(changed) - len(updated),
+            "updated": len(updated),
+            "deleted": len(deleted),
+            "unchanged": len(product_ids) - len(changed),
+            "compacted": 0,
+        }
+        if not changed and not deleted:
+            logger.info(f"Index produits à jour : {stats}")
+            return stats
+
+        index = self._load_id_index()
+        vectors = np.array(self.store.load_vectors(mmap=False), dtype="float32")
+        metadata = self.store.load_metadata()
+
+        # Anciennes versions et produits supprimés -> tombstones
+        stale_rows = [products[pid]["row"] for pid in updated] + [products[pid]["row"] for pid in deleted]
+        if stale_rows:
+            index.remove_ids(np.array(stale_rows, dtype="int64"))
+            tombstones.extend(stale_rows)
+        for pid in deleted:
+            del products[pid]
+
+        # Nouvelles versions ajoutées en fin de table
+        if changed:
+            new_df = df.iloc[changed]
+            new_vectors = self.embedder.generate(new_df, self.text_column)
+            new_rows = np.arange(next_row, next_row + len(changed), dtype="int64")
+            index.add_with_ids(new_vectors, new_rows)
+            vectors = np.vstack([vectors, new_vectors])
+            new_table = pa.Table.from_pandas(new_df.drop(columns=["embedding"], errors="ignore"), preserve_index=False)
+            metadata = pa.concat_tables([metadata, new_table], promote_options="permissive")
+            for i, row in zip(changed, new_rows):
+                products[product_ids[i]] = {"hash": hashes[i], "row": int(row)}
+            next_row += len(changed)
+
+        manifest.update(products=products, tombstones=tombstones, next_row=next_row)
+        if tombstones and len(tombstones) / next_row > self.compaction_ratio:
+            stats["compacted"] = len(tombstones)
+            index, vectors, metadata, manifest = self._compact(vectors, metadata, manifest)
+
+        self.store.save(metadata, vectors, index)
+        self.store.save_manifest(manifest)
+        logger.info(f"Index produits synchronisé : {stats}")
+        return stats
+
+    @staticmethod
+    def build_manifest(df: pd.DataFrame, id_column: str = "id", text_column: str = "text") -> Dict[str, Any]:
+        """
+        Manifest d'un index construit hors de sync (identifiant FAISS = ligne du DataFrame).
+        Doublon d'id : la dernière occurrence gagne, l'ancienne ligne devient un tombstone.
+        """
+        products: Dict[str, Dict[str, Any]] = {}
+        tombstones: List[int] = []
+        texts = df[text_column].fillna("").astype(str)
+        for row, (pid, text) in enumerate(zip(df[id_column].astype(str), texts)):
+            if pid in products:
+                tombstones.append(products[pid]["row"])
+            products[pid] = {"hash": IncrementalIndexer._content_hash(text), "row": row}
+        return {"products": products, "tombstones": tombstones, "next_row": len(df)}
+
+    def compact(self):
+        """Réécrit l'index et les métadonnées sans les tombstones"""
+        manifest = self.store.load_manifest()
+        if not manifest or not manifest["tombstones"]:
+            return
+        vectors = np.array(self.store.load_vectors(mmap=False), dtype="float32")
+        index, vectors, metadata, manifest = self._compact(vectors, self.store.load_metadata(), manifest)
+        self.store.save(metadata, vectors, index)
+        self.store.save_manifest(manifest)
+
+    # --------------------------------------------------------------------------
+    # Méthodes utilitaires
+    # --------------------------------------------------------------------------
+
+    def _full_build(self, df: pd.DataFrame, product_ids: List[str], hashes: List[str]) -> Dict[str, int]:
+        embeddings = self.embedder.generate(df, self.text_column)
+        rows = np.arange(len(df), dtype="int64")
+        index = FAISSIndexer.create_id_index(embeddings, rows, self.index_type)
+        self.store.save(df, embeddings, index)
+        self.store.save_manifest({
+            "products": {pid: {"hash": h, "row": int(r)} for pid, h, r in zip(product_ids, hashes, rows)},
+            "tombstones": [],
+            "next_row": len(df),
+        })
+        logger.info(f"Index produits construit : {len(df)} produits")
+        return {"added": len(df), "updated": 0, "deleted": 0, "unchanged": 0, "compacted": 0}
+
+    def _matches_store(self, manifest: Dict[str, Any]) -> bool:
+        """Le manifest décrit-il bien les fichiers sur disque (reconstruction complète faite ailleurs) ?"""
+        try:
+            n_vectors = len(self.store.load_vectors(mmap=True))
+            n_rows = self.store.load_metadata().num_rows
+        except Exception as e:
+            logger.warning(f"Index produits illisible, reconstruction complète : {str(e)}")
+            return False
+        if manifest.get("next_row") == n_vectors == n_rows:
+            return True
+        logger.warning(
+            f"Manifest obsolète (next_row={manifest.get('next_row')}, {n_vectors} vecteurs, "
+            f"{n_rows} lignes de métadonnées) : reconstruction complète"
+        )
+        return False
+
+    def _compact(self, vectors: np.ndarray, metadata: pa.Table, manifest: Dict[str, Any]):
+        products = manifest["products"]
+        live_ids = sorted(products, key=lambda pid: products[pid]["row"])
+        live_rows = np.array([products[pid]["row"] for pid in live_ids], dtype="int64")
+
+        vectors = vectors[live_rows]
+        metadata = metadata.take(pa.array(live_rows))
+        new_rows = np.arange(len(live_rows), dtype="int64")
+        # Le compactage ré-entraîne l'index sur le catalogue courant
+        index = FAISSIndexer.create_id_index(vectors, new_rows, self.index_type)
+        for pid, row in zip(live_ids, new_rows):
+            products[pid]["row"] = int(row)
+        manifest.update(products=products, tombstones=[], next_row=len(live_rows))
+        logger.info(f"Compactage de l'index produits : {len(live_rows)} produits conservés")
+        return index, vectors, metadata, manifest
+
+    def _load_id_index(self) -> faiss.IndexIDMap2:
+        """Index modifiable ; un ancien index plat est converti (identifiant = ligne)"""
+        index = self.store.load_index(mmap=False)
+        if isinstance(index, faiss.IndexIDMap2):
+            return index
+        vectors = np.array(self.store.load_vectors(mmap=False), dtype="float32")
+        return FAISSIndexer.create_id_index(vectors, np.arange(len(vectors), dtype="int64"), self.index_type)
+
+    @staticmethod
+    def _content_hash(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
@@ -1,11 +1,107 @@
+import math
+from typing import Optional
+
 import numpy as np
 import faiss
 
 class FAISSIndexer:
+    """
+    Construction des index FAISS produits.
+    Types disponibles :
+    - flat     : recherche exacte (IndexFlat)
+    - hnsw     : graphe HNSW, très bon rappel, pas de suppression unitaire
+    - ivf_flat : partition IVF + vecteurs complets
+    - ivf_pq   : partition IVF + quantification produit (index le plus compact)
+    - sq8      : quantification scalaire 8 bits (4x plus petit, recherche exhaustive)
+    """
+    INDEX_TYPES = ("flat", "hnsw", "ivf_flat", "ivf_pq", "sq8")
+
+    @staticmethod
+    def create_index(embeddings: np.ndarray, index_type: str = "flat", metric: str = "l2", **params) -> faiss.Index:
+        """Crée, entraîne si nécessaire, puis remplit un index FAISS."""
+        embeddings = np.ascontiguousarray(embeddings, dtype="float32")
+        index = FAISSIndexer.build_empty(embeddings.shape[1], len(embeddings), index_type, metric, **params)
+        if not index.is_trained:
+            index.train(embeddings)
+        index.add(embeddings)
+        return index
+
+    @staticmethod
+    def create_id_index(embeddings: np.ndarray, ids: np.ndarray, index_type: str = "flat", metric: str = "l2", **params) -> faiss.IndexIDMap2:
+        """Crée un index FAISS à identifiants explicites (ajout/suppression unitaires)."""
+        if index_type == "hnsw":
+            raise ValueError("HNSW ne supporte pas la suppression unitaire : utiliser flat, sq8 ou ivf_* en mode incrémental")
+        embeddings = np.ascontiguousarray(embeddings, dtype="float32")
+        base = FAISSIndexer.build_empty(embeddings.shape[1], len(embeddings), index_type, metric, **params)
+        if not base.is_trained:
+            base.train(embeddings)
+        index = faiss.IndexIDMap2(base)
+        index.add_with_ids(embeddings, np.asarray(ids, dtype="int64"))
+        return index
+
+    @staticmethod
+    def build_empty(dimension: int,
+                    n_vectors: int,
+                    index_type: str = "flat",
+                    metric: str = "l2",
+                    nlist: Optional[int] = None,
+                    nprobe: Optional[int] = None,
+                    pq_m: Optional[int] = None,
+                    hnsw_m: int = 32,
+                    ef_search: int = 64) -> faiss.Index:
+        """Crée un index vide (non entraîné) ; les paramètres non fournis sont déduits de la taille du catalogue."""
+        if index_type not in FAISSIndexer.INDEX_TYPES:
+            raise ValueError(f"Type d'index inconnu: {index_type} ({', '.join(FAISSIndexer.INDEX_TYPES)})")
+        faiss_metric = faiss.METRIC_INNER_PRODUCT if metric == "ip" else faiss.METRIC_L2
+
+        if index_type == "flat":
+            return faiss.IndexFlatIP(dimension) if metric == "ip" else faiss.IndexFlatL2(dimension)
+
+        if index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(dimension, hnsw_m, faiss_metric)
+            index.hnsw.efConstruction = max(40, 2 * hnsw_m)
+            index.hnsw.efSearch = ef_search
+            return index
+
+        if index_type == "sq8":
+            return faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_8bit, faiss_metric)
+
+        # IVF : ~4·sqrt(n) listes, avec au moins 39 vecteurs d'entraînement par liste
+        nlist = nlist or max(1, min(int(4 * math.sqrt(n_vectors)), n_vectors // 39))
+        quantizer = faiss.IndexFlatIP(dimension) if metric == "ip" else faiss.IndexFlatL2(dimension)
+        if index_type == "ivf_flat":
+            index = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss_metric)
+        else:
+            pq_m = pq_m or FAISSIndexer._pq_subquantizers(dimension)
+            # 256 centroïdes par sous-quantifieur demandent assez de vecteurs d'entraînement
+            nbits = 8 if n_vectors >= 256 * 39 else max(1, min(8, int(math.log2(max(2, n_vectors // 39)))))
+            index = faiss.IndexIVFPQ(quantizer, dimension, nlist, pq_m, nbits, faiss_metric)
+        index.nprobe = nprobe or max(1, nlist // 16)
+        return index
+
+    @staticmethod
+    def select_index_type(n_vectors: int, recall_target: float = 0.95) -> str:
+        """
+        Choisit un type d'index selon la taille du catalogue et le rappel visé.
+        Au-delà d'un petit catalogue, la recherche exhaustive (flat, mais aussi sq8)
+        est ce qui coûte : seuls des index non exhaustifs sont choisis automatiquement.
+        - petit catalogue (< 10k) : flat, exact et déjà rapide
+        - rappel >= 0.90 : ivf_flat (seules nlist/16 listes sont parcourues) jusqu'à 1M vecteurs, hnsw au-delà
+        - sinon : ivf_pq, le plus compact
+        sq8 n'est jamais choisi ici : il divise la mémoire par 4 mais reste un parcours
+        complet, à demander explicitement si la RAM est la contrainte.
+        Seuils indicatifs, à vérifier sur le catalogue réel avec benchmarks/index_benchmark.py.
+        """
+        if n_vectors < 10_000:
+            return "flat"
+        if recall_target >= 0.90:
+            return "ivf_flat" if n_vectors <= 1_000_000 else "hnsw"
+        return "ivf_pq"
+
     @staticmethod
-    def create_index(embeddings: np.ndarray) -> faiss.Index:
-        """Crée un index FAISS L2."""
-        dimension = embeddings.shape[1]
-        index = faiss.IndexFlatL2(dimension)
-        index.add(embeddings.astype("float32"))
-        return index
\ No newline at end of file
+    def _pq_subquantizers(dimension: int) -> int:
+        """Plus grand diviseur de la dimension donnant des sous-vecteurs d'au moins 8 composantes"""
+        for m in range(max(1, dimension // 8), 0, -1):
+            if dimension % m == 0:
+                return m
+        return 1
@@ -0,0 +1,240 @@
+import argparse
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, Optional
+
+import faiss
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from .clean import clean_texts
+from .embedding import EmbeddingGenerator
+from .indexing import FAISSIndexer
+from .storage import ProductStore
+from app.config.logger import app_logger as logger
+
+# Seules ces colonnes sont lues dans l'export Mongo aplati (des centaines de colonnes variants[i]...)
+CSV_DTYPES = {
+    "_id": "string",
+    "name": "string",
+    "slug": "string",
+    "description": "string",
+    "category": "string",
+    "mainImgUrl": "string",
+    "stockStatus": "string",
+    "stock": "Int64",
+    "isFlashSale": "boolean",
+    "style.size": "string",
+    "style.color": "string",
+    "style.material": "string",
+    "price": "float64",
+    "costPrice": "float64",
+    "discountPrice": "float64",
+    "sku": "Int64",
+    "brand": "string",
+}
+
+# Schéma fixe des métadonnées : identique d'un chunk à l'autre
+METADATA_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("name", pa.string()),
+    ("description", pa.string()),
+    ("brand", pa.string()),
+    ("stockStatus", pa.string()),
+    ("mainImgUrl", pa.string()),
+    ("slug", pa.string()),
+    ("price", pa.float64()),
+    ("costPrice", pa.float64()),
+    ("discountPrice", pa.float64()),
+    ("stock", pa.int64()),
+    ("sku", pa.int64()),
+    ("text", pa.string()),
+])
+
+
+class StreamingIngestor:
+    """
+    Ingestion du catalogue CSV par chunks, à mémoire bornée :
+    chaque chunk est lu (colonnes utiles uniquement), nettoyé, transformé en texte,
+    encodé directement dans la matrice .npy ouverte en mmap, puis ses métadonnées
+    sont ajoutées au fichier Arrow. L'index est ensuite entraîné sur un échantillon
+    et rempli par lots depuis le .npy.
+
+    La mémoire dépend de la taille des chunks, pas du catalogue (hors index FAISS
+    lui-même, dont la taille dépend du type choisi : ivf_pq ou sq8 pour limiter la RAM).
+    Le manifest écrit est celui d'IncrementalIndexer : les synchronisations suivantes
+    peuvent se faire en incrémental.
+    """
+
+    def __init__(self,
+                 embedder: EmbeddingGenerator,
+                 store: ProductStore,
+                 chunksize: int = 5000,
+                 index_type: str = "auto",
+                 recall_target: float = 0.95,
+                 train_size: int = 100_000,
+                 categories: Optional[Dict[str, str]] = None,
+                 clean_workers: int = 1):
+        """
+        Args:
+            clean_workers: >1 pour nettoyer le HTML des descriptions sur un pool de processus
+        """
+        self.embedder = embedder
+        self.store = store
+        self.chunksize = chunksize
+        self.index_type = index_type
+        self.recall_target = recall_target
+        self.train_size = train_size
+        self.categories = categories or {}
+        self.clean_workers = clean_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def run(self, csv_path: str) -> Dict[str, int]:
+        n_rows = self.count_rows(csv_path)
+        if not n_rows:
+            raise ValueError(f"Aucun produit dans {csv_path}")
+        logger.info(f"Ingestion de {n_rows} produits depuis {csv_path} (chunks de {self.chunksize})")
+
+        products: Dict[str, Dict[str, object]] = {}
+        tombstones = []
+        row = 0
+        # Pool de nettoyage HTML créé une seule fois pour toute l'ingestion
+        self._executor = ProcessPoolExecutor(self.clean_workers) if self.clean_workers > 1 else None
+        try:
+            # Processus d'encodage lancés une seule fois, réutilisés par tous les chunks
+            with self.embedder.process_pool(), \
+                    self.store.vectors_writer(n_rows, self.embedder.dimension) as vectors, \
+                    self.store.metadata_writer(METADATA_SCHEMA) as writer:
+                for chunk in self.iter_chunks(csv_path):
+                    texts = chunk["text"].tolist()
+                    self.embedder.encode(texts, out=vectors[row:row + len(chunk)])
+                    writer.write_table(pa.Table.from_pandas(chunk, schema=METADATA_SCHEMA, preserve_index=False))
+
+                    for pid, text in zip(chunk["id"], texts):
+                        # Doublon d'id : la dernière occurrence gagne, l'ancienne ligne devient un tombstone
+                        if pid in products:
+                            tombstones.append(products[pid]["row"])
+                        products[pid] = {"hash": hashlib.sha1(text.encode("utf-8")).hexdigest(), "row": row}
+                        row += 1
+                    logger.info(f"Ingestion : {row}/{n_rows} produits encodés")
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+        index = self._build_index(self.store.load_vectors(mmap=True), tombstones)
+        # L'index est publié en dernier : les workers ne rechargent qu'une version complète
+        self.store.write_index(index)
+        self.store.save_manifest({"products": products, "tombstones": tombstones, "next_row": row})
+        stats = {"rows": row, "products": len(products), "duplicates": len(tombstones)}
+        logger.info(f"Ingestion terminée : {stats}")
+        return stats
+
+    def iter_chunks(self, csv_path: str) -> Iterator[pd.DataFrame]:
+        """Lit le CSV par chunks et renvoie des DataFrames au format des métadonnées (avec `text`)"""
+        reader = pd.read_csv(
+            csv_path,
+            usecols=lambda column: column in CSV_DTYPES,
+            dtype=CSV_DTYPES,
+            chunksize=self.chunksize,
+        )
+        for chunk in reader:
+            chunk = chunk.dropna(subset=["_id"])
+            if not chunk.empty:
+                yield self.prepare_chunk(chunk)
+
+    def prepare_chunk(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        chunk = chunk.rename(columns={"_id": "id"})
+        chunk["description"] = clean_texts(chunk["description"].tolist(), executor=self._executor)
+        chunk["text"] = self.build_text(chunk)
+        return chunk.reindex(columns=METADATA_SCHEMA.names)
+
+    def build_text(self, chunk: pd.DataFrame) -> pd.Series:
+        """Texte encodé pour chaque produit (construction vectorisée sur le chunk)"""
+        def col(name: str) -> pd.Series:
+            return chunk[name].astype("string").fillna("") if name in chunk else pd.Series("", index=chunk.index)
+
+        category = chunk["category"].map(self.categories).fillna("Non catégorisé") if "category" in chunk \
+            else pd.Series("Non catégorisé", index=chunk.index)
+        promotion = chunk["isFlashSale"].fillna(False).map({True: "Oui", False: "Non"}) if "isFlashSale" in chunk \
+            else pd.Series("Non", index=chunk.index)
+        return (
+            "ID: " + col("id")
+            + "\nProduit: " + col("name")
+            + "\nMarque: " + col("brand")
+            + "\nDescription: " + col("description")
+            + "\nCatégorie: " + category.astype("string")
+            + "\nPrix: " + col("price") + " | Prix réduit: " + col("discountPrice")
+            + "\nSKU: " + col("sku") + " | Stock: " + col("stock")
+            + "\nStatut stock: " + col("stockStatus")
+            + "\nCaractéristiques: " + col("style.color") + " " + col("style.material") + " " + col("style.size")
+            + "\nPromotion: " + promotion.astype("string")
+        ).astype(str)
+
+    def count_rows(self, csv_path: str) -> int:
+        """Premier passage sur la seule colonne _id, pour dimensionner la matrice .npy"""
+        return sum(
+            int(chunk["_id"].notna().sum())
+            for chunk in pd.read_csv(csv_path, usecols=["_id"], dtype={"_id": "string"}, chunksize=self.chunksize * 10)
+        )
+
+    # --------------------------------------------------------------------------
+    # Méthodes utilitaires
+    # --------------------------------------------------------------------------
+
+    def _build_index(self, vectors: np.ndarray, tombstones) -> faiss.Index:
+        n_vectors, dimension = vectors.shape
+        index_type = self.index_type
+        if index_type == "auto":
+            index_type = FAISSIndexer.select_index_type(n_vectors, self.recall_target)
+        if index_type == "hnsw":
+            # HNSW ne supporte pas la suppression : ivf_flat reste modifiable avec un rappel comparable
+            index_type = "ivf_flat"
+
+        index = FAISSIndexer.build_empty(dimension, n_vectors, index_type)
+        if not index.is_trained:
+            rng = np.random.default_rng(0)
+            sample = np.sort(rng.choice(n_vectors, size=min(n_vectors, self.train_size), replace=False))
+            index.train(np.ascontiguousarray(vectors[sample], dtype="float32"))
+
+        index = faiss.IndexIDMap2(index)
+        for start in range(0, n_vectors, self.chunksize):
+            batch = np.ascontiguousarray(vectors[start:start + self.chunksize], dtype="float32")
+            index.add_with_ids(batch, np.arange(start, start + len(batch), dtype="int64"))
+        if tombstones:
+            index.remove_ids(np.array(tombstones, dtype="int64"))
+        logger.info(f"Index {index_type} construit : {index.ntotal} vecteurs")
+        return index
+
+
+def load_categories(csv_path: str) -> Dict[str, str]:
+    """Correspondance id de catégorie -> nom, depuis l'export des catégories"""
+    df = pd.read_csv(csv_path, usecols=["_id", "name"], dtype="string").dropna()
+    return dict(zip(df["_id"], df["name"]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingestion du catalogue CSV vers l'index produits, par chunks")
+    parser.add_argument("--csv", default="ai/data/raw/products.csv", help="Export CSV des produits")
+    parser.add_argument("--categories", default="ai/data/raw/yalla-prod.categories-20-02-2025.csv", help="Export CSV des catégories (optionnel)")
+    parser.add_argument("--out", default="ai/data/embeddings", help="Dossier de l'index produits")
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--chunksize", type=int, default=5000, help="Produits lus et encodés par chunk")
+    parser.add_argument("--batch-size", type=int, default=64, help="Taille des lots envoyés au modèle")
+    parser.add_argument("--workers", type=int, default=1, help="Processus d'encodage")
+    parser.add_argument("--index-type", default="auto", choices=("auto",) + FAISSIndexer.INDEX_TYPES)
+    parser.add_argument("--recall-target", type=float, default=0.95)
+    parser.add_argument("--clean-workers", type=int, default=1, help="Processus de nettoyage HTML")
+    args = parser.parse_args()
+
+    ingestor = StreamingIngestor(
+        EmbeddingGenerator(args.model, batch_size=args.batch_size, chunk_size=args.chunksize, workers=args.workers),
+        ProductStore(args.out),
+        chunksize=args.chunksize,
+        index_type=args.index_type,
+        recall_target=args.recall_target,
+        categories=load_categories(args.categories) if args.categories else None,
+        clean_workers=args.clean_workers,
+    )
+    ingestor.run(args.csv)
@@ -1,26 +1,65 @@
 import pandas as pd
-import numpy as np
-from .clean import clean_text
 
 from .embedding import EmbeddingGenerator
 from .indexing import FAISSIndexer
-import faiss
-import os
+from .storage import ProductStore
+from .incremental import IncrementalIndexer
+from .ingest import StreamingIngestor, load_categories
 
 class RAGPipeline:
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
-        self.embedder = EmbeddingGenerator(model_name)
+    def __init__(self,
+                 model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+                 workers: int = 1,
+                 index_type: str = "auto",
+                 recall_target: float = 0.95):
+        """
+        Args:
+            index_type: Type d'index FAISS (voir FAISSIndexer.INDEX_TYPES) ou "auto"
+            recall_target: Rappel visé pour le choix automatique du type d'index
+        """
+        self.embedder = EmbeddingGenerator(model_name, workers=workers)
+        self.index_type = index_type
+        self.recall_target = recall_target
+
+    def _resolve_index_type(self, n_vectors: int) -> str:
+        if self.index_type == "auto":
+            return FAISSIndexer.select_index_type(n_vectors, self.recall_target)
+        return self.index_type
     
     def run_from_dataframe(self, df: pd.DataFrame, output_dir: str = "ai/data/embeddings"):
-        # 2. Génération des embeddings
-        df = self.embedder.generate(df)
+        # 2. Génération des embeddings (matrice float32 préallouée, par lots)
+        embeddings = self.embedder.generate(df)
 
         # 3. Indexation
-        embeddings = np.vstack(df["embedding"].values)
-        index = FAISSIndexer.create_index(embeddings)
+        index = FAISSIndexer.create_index(embeddings, self._resolve_index_type(len(embeddings)))
+
+        # 4. Sauvegarde (index + vecteurs .npy + métadonnées Arrow, ouverts en mmap)
+        store = ProductStore(output_dir)
+        store.save(df, embeddings, index)
+        # Le manifest d'une synchronisation précédente ne décrit plus ces lignes
+        if "id" in df:
+            store.save_manifest(IncrementalIndexer.build_manifest(df))
+        else:
+            store.delete_manifest()
+        return df, index
+
+    def run_incremental(self, df: pd.DataFrame, output_dir: str = "ai/data/embeddings", compaction_ratio: float = 0.2):
+        """Ré-encode uniquement les produits nouveaux ou modifiés depuis la dernière synchronisation"""
+        index_type = self._resolve_index_type(len(df))
+        if index_type == "hnsw":
+            # HNSW ne supporte pas la suppression : ivf_flat reste modifiable avec un rappel comparable
+            index_type = "ivf_flat"
+        indexer = IncrementalIndexer(self.embedder, ProductStore(output_dir), compaction_ratio=compaction_ratio, index_type=index_type)
+        return indexer.sync(df)
 
-        # 4. Sauvegarde
-        os.makedirs(output_dir, exist_ok=True)
-        df.to_pickle(f"{output_dir}/produits_embeddings.pkl")
-        faiss.write_index(index, f"{output_dir}/produits_faiss.index")
-        return df, index
\ No newline at end of file
+    def run_from_csv(self, csv_path: str, output_dir: str = "ai/data/embeddings", chunksize: int = 5000, categories_path: str = None):
+        """Construit l'index directement depuis l'export CSV, par chunks (mémoire bornée)"""
+        ingestor = StreamingIngestor(
+            self.embedder,
+            ProductStore(output_dir),
+            chunksize=chunksize,
+            index_type=self.index_type,
+            recall_target=self.recall_target,
+            categories=load_categories(categories_path) if categories_path else None,
+        )
+        return ingestor.run(csv_path)
@@ -0,0 +1,146 @@
+import argparse
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import faiss
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# mmap "zero-copy" des codes (faiss >= 1.10), sinon mmap classique
+MMAP_FLAG = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+
+class ProductStore:
+    """
+    Stockage sur disque de l'index produits, partageable entre processus :
+    - produits_faiss.index    : index FAISS ouvert en mmap
+    - produits_vectors.npy    : vecteurs contigus float32/float16 (ouverts en mmap)
+    - produits_metadata.arrow : métadonnées en Arrow IPC, lues en mmap colonne par colonne
+    - produits_manifest.json  : hash de contenu par produit (ingestion incrémentale)
+    Plusieurs workers uvicorn partagent ainsi le cache de pages de l'OS au lieu
+    de garder chacun une copie en RAM, et rien n'est dépicklé au démarrage.
+    """
+    INDEX_FILE = "produits_faiss.index"
+    VECTORS_FILE = "produits_vectors.npy"
+    METADATA_FILE = "produits_metadata.arrow"
+    MANIFEST_FILE = "produits_manifest.json"
+    LEGACY_FILE = "produits_embeddings.pkl"
+
+    def __init__(self, directory: str = "ai/data/embeddings"):
+        self.directory = Path(directory)
+
+    def save(self, metadata: Union[pd.DataFrame, pa.Table], embeddings: np.ndarray, index: faiss.Index, vector_dtype: str = "float32"):
+        """
+        Écrit les métadonnées (sans colonne embedding), les vecteurs puis l'index.
+        Chaque fichier est écrit à côté puis renommé : les processus qui ont déjà
+        ouvert l'ancienne version en mmap continuent de la lire sans incohérence.
+        L'index, qui porte la version (index_version), est publié en dernier :
+        un worker qui le voit changer trouve déjà les métadonnées correspondantes.
+        """
+        if isinstance(metadata, pd.DataFrame):
+            metadata = pa.Table.from_pandas(metadata.drop(columns=["embedding"], errors="ignore"), preserve_index=False)
+        with self.metadata_writer(metadata.schema) as writer:
+            writer.write_table(metadata)
+        with self.vectors_writer(len(embeddings), embeddings.shape[1], vector_dtype) as vectors:
+            vectors[:] = embeddings
+        self.write_index(index)
+
+    def write_index(self, index: faiss.Index):
+        os.makedirs(self.directory, exist_ok=True)
+        with self._atomic(self.INDEX_FILE) as path:
+            faiss.write_index(index, path)
+
+    @contextmanager
+    def vectors_writer(self, n_vectors: int, dimension: int, vector_dtype: str = "float32"):
+        """Matrice .npy ouverte en écriture mmap (remplissage par lots), publiée à la sortie du bloc"""
+        os.makedirs(self.directory, exist_ok=True)
+        with self._atomic(self.VECTORS_FILE) as path:
+            vectors = np.lib.format.open_memmap(path, mode="w+", dtype=vector_dtype, shape=(n_vectors, dimension))
+            yield vectors
+            vectors.flush()
+            del vectors
+
+    @contextmanager
+    def metadata_writer(self, schema: pa.Schema):
+        """Écriture des métadonnées Arrow par lots (write_table / write_batch), publiée à la sortie du bloc"""
+        os.makedirs(self.directory, exist_ok=True)
+        with self._atomic(self.METADATA_FILE) as path:
+            with pa.OSFile(path, "wb") as sink:
+                with pa.ipc.new_file(sink, schema) as writer:
+                    yield writer
+
+    def load_manifest(self) -> Dict[str, Any]:
+        path = self.directory / self.MANIFEST_FILE
+        if not path.exists():
+            return {}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_manifest(self, manifest: Dict[str, Any]):
+        with self._atomic(self.MANIFEST_FILE) as path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False)
+
+    def delete_manifest(self):
+        """L'ingestion incrémentale suivante repartira d'une construction complète"""
+        try:
+            os.remove(self.directory / self.MANIFEST_FILE)
+        except FileNotFoundError:
+            pass
+
+    def index_version(self) -> Optional[float]:
+        """
+        Date de modification de l'index (détection d'une nouvelle version sur disque).
+        L'index est toujours publié après les vecteurs et les métadonnées.
+        """
+        try:
+            return os.stat(self.directory / self.INDEX_FILE).st_mtime
+        except OSError:
+            return None
+
+    def load_index(self, mmap: bool = True) -> faiss.Index:
+        return faiss.read_index(str(self.directory / self.INDEX_FILE), MMAP_FLAG if mmap else 0)
+
+    def load_vectors(self, mmap: bool = True) -> np.ndarray:
+        return np.load(self.directory / self.VECTORS_FILE, mmap_mode="r" if mmap else None)
+
+    def load_metadata(self, columns: Optional[List[str]] = None) -> pa.Table:
+        """
+        Ouvre les métadonnées en mmap (aucune copie : les colonnes ne sont lues
+        qu'au premier accès). Repli sur l'ancien pickle si la conversion n'a pas été faite.
+        """
+        path = self.directory / self.METADATA_FILE
+        if not path.exists():
+            df = pd.read_pickle(self.directory / self.LEGACY_FILE).drop(columns=["embedding"], errors="ignore")
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        else:
+            table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+        if columns:
+            table = table.select([c for c in columns if c in table.column_names])
+        return table
+
+    @contextmanager
+    def _atomic(self, filename: str):
+        final_path = self.directory / filename
+        tmp_path = self.directory / f".{filename}.tmp"
+        yield str(tmp_path)
+        os.replace(tmp_path, final_path)
+
+    def convert_legacy(self, vector_dtype: str = "float32"):
+        """Convertit l'ancien produits_embeddings.pkl vers le format mmap"""
+        df = pd.read_pickle(self.directory / self.LEGACY_FILE)
+        embeddings = np.vstack(df["embedding"].values)
+        index = faiss.read_index(str(self.directory / self.INDEX_FILE))
+        self.save(df, embeddings, index, vector_dtype)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Conversion de l'ancien pickle produits vers le format mmap")
+    parser.add_argument("--dir", default="ai/data/embeddings", help="Dossier des embeddings")
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16"], help="Type des vecteurs .npy")
+    args = parser.parse_args()
+    ProductStore(args.dir).convert_legacy(args.dtype)
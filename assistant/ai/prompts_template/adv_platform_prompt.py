@@ -1,14 +1,44 @@
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from pathlib import Path
 from ai.utils.language_util import LanguageService
+from ai.utils.site_retriever import site_retriever
+from app.config.settings import settings
+from app.schemas.history import History
 from app.config.logger import translate_logger, app_logger
 
 class ADVPlatformTemplate:
-    def __init__(self, data_dir: str = "ai/data/adv"):
+    # Préfixe système identique pour toutes les requêtes : Ollama réutilise son évaluation (cache KV)
+    SYSTEM_PROMPT = """=== PRÉSENTATION ADV - ASSISTANT POWERPOINT ===
+Tu réponds aux questions sur le projet ADV à partir du [CONTEXTE DU PROJET] fourni avec la question.
+
+[DIRECTIVES DE RÉPONSE]
+1. Si l'information existe dans le contexte :
+   - Réponse concise (15-30 mots)
+   - Format direct sans préambule
+   - Termes techniques appropriés
+
+2. Si l'information EST INCONNUE :
+   - Répondre strictement : "Je n'ai pas d'information concernant ce point dans la présentation actuelle."
+   - Ne pas inventer de réponse
+   - Ne pas proposer de rechercher
+
+[EXEMPLES]
+- Bonne réponse : "Le déploiement est prévu pour Q2 2024 (voir slide 15)."
+- Réponse absente : "Je n'ai pas d'information concernant ce point dans la présentation actuelle."
+
+[INTERDICTIONS]
+✖ Pas de "Je suis un assistant..."
+✖ Pas d'excuses ou justifications
+✖ Pas de hors-sujet
+✖ Maximum 40 mots
+
+Respecte la directive linguistique donnée avec chaque question."""
+
+    def __init__(self, data_dir: str = "ai/data/adv", language_service: Optional[LanguageService] = None):
         self.data_dir = Path(data_dir)
         self.platform_data = self._load_platform_data()
-        self.language_util = LanguageService()
-    
+        self.language_util = language_service or LanguageService()
+
     def _load_platform_data(self) -> Dict:
         """Charge les données de la plateforme ADV depuis un fichier texte"""
         data = {"description": ""}
@@ -19,53 +49,41 @@ class ADVPlatformTemplate:
             app_logger.error(f"Erreur lors du chargement des données: {str(e)}")
             raise
         return data
-    
-    async def build_prompt(self, question: str, context: str = "") -> str:
+
+    def system_prompt(self) -> str:
+        """Partie fixe du prompt ; sans recherche de sections, le document complet y est aussi stable"""
+        if settings.SITE_RAG_ENABLED:
+            return self.SYSTEM_PROMPT
+        return f"{self.SYSTEM_PROMPT}\n\n[CONTEXTE DU PROJET]\n{self.platform_data['description']}"
+
+    async def build_messages(self, question: str, context: str = "", history: Optional[History] = None) -> List[Dict[str, str]]:
         """
-        Génère un prompt structuré avec gestion des réponses inconnues
-        
+        Génère les messages /api/chat : préfixe système fixe, puis partie variable
+
         Args:
             question: La question posée par l'utilisateur
             context: Contexte supplémentaire (slide actuelle, etc.)
+            history: Historique déjà chargé pour la requête (évite une lecture Redis)
         """
-        lang = await self.language_util.get_language_instruction()
+        lang = await self.language_util.get_language_instruction(history)
         translate_logger.info(f"Langue détectée: {lang}")
-        
-        prompt_template = f"""
-=== PRÉSENTATION ADV - ASSISTANT POWERPOINT ===
-[CONTEXTE DU PROJET]
-{self.platform_data['description']}
 
-[CONTEXTE ACTUEL]
+        user_prompt = ""
+        # Seules les sections pertinentes du document entrent dans le prompt
+        if settings.SITE_RAG_ENABLED:
+            user_prompt += f"[CONTEXTE DU PROJET]\n{await site_retriever.retrieve(question)}\n\n"
+        user_prompt += f"""[CONTEXTE ACTUEL]
 {context if context else "Aucun contexte spécifique fourni"}
 
 [QUESTION UTILISATEUR]
 {question}
 
-[DIRECTIVES DE RÉPONSE]
-1. Si l'information existe dans le contexte :
-   - Réponse concise (15-30 mots)
-   - Format direct sans préambule
-   - Termes techniques appropriés
-
-2. Si l'information EST INCONNUE :
-   - Répondre strictement : "Je n'ai pas d'information concernant ce point dans la présentation actuelle."
-   - Ne pas inventer de réponse
-   - Ne pas proposer de rechercher
-
-[EXEMPLES]
-- Bonne réponse : "Le déploiement est prévu pour Q2 2024 (voir slide 15)."
-- Réponse absente : "Je n'ai pas d'information concernant ce point dans la présentation actuelle."
-
-[INTERDICTIONS]
-✖ Pas de "Je suis un assistant..."
-✖ Pas d'excuses ou justifications
-✖ Pas de hors-sujet
-✖ Maximum 40 mots
-
 # DIRECTIVES LINGUISTIQUES
 {lang}
 
 [RÉPONSE ATTENDUE]
 """
-        return prompt_template
+        return [
+            {"role": "system", "content": self.system_prompt()},
+            {"role": "user", "content": user_prompt},
+        ]
@@ -1,17 +1,19 @@
-from typing import List
+from typing import List, Optional
+from app.schemas.history import History
 from app.enum.QueryType import QueryType
 from app.services.history_service import HistoryService
 
 class ClassifierPromptTemplate:
-    def __init__(self):
+    def __init__(self, history_service: Optional[HistoryService] = None):
         self.query_types = [t.value for t in QueryType]
-        self.history_service = HistoryService()
+        self.history_service = history_service or HistoryService()
     
    
         
-    async def build_prompt(self, query: str) -> str:
+    async def build_prompt(self, query: str, history: Optional[History] = None) -> str:
         # Récupération et analyse de l'historique
-        history = await self.history_service.get()
+        if history is None:
+            history = await self.history_service.get(query_limit=2)
         user_queries = history.user_queries if history else []
         last_query_type = history.query_type if history else ""
         
@@ -20,7 +22,7 @@ class ClassifierPromptTemplate:
         
         return f"""CLASSIFICATEUR - RÉPONSE JSON UNIQUEMENT
 
-TYPES: PRODUCT_INFO | OTHER
+TYPES: {" | ".join(self.query_types)}
 
 CONTEXTE ACTUEL:
 Requête: "{query}"
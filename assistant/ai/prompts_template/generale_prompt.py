@@ -1,30 +1,18 @@
+from typing import Dict, List, Optional
 from ai.utils.language_util import LanguageService
+from app.schemas.history import History
 from app.services.history_service import HistoryService
 from app.config.logger import translate_logger ,app_logger
+from app.config.settings import settings
 class GeneralDiscussionTemplate:
     """
     Template optimisé pour des transitions naturelles vers YALLA
     """
+    # Préfixe système identique pour toutes les requêtes : Ollama réutilise son évaluation (cache KV)
+    SYSTEM_PROMPT = """Tu es un conseiller YALLA. Les requêtes reçues sont hors-contexte shopping, ton rôle est de ramener naturellement vers nos services.
 
-    def __init__(self):
-        self.lang_service = LanguageService()
-        self.history_service = HistoryService()
-
-    async def build_prompt(self, query: str) -> str:
-        lang = await self.lang_service.get_language_instruction()
-        translate_logger.info(f"Langue: {lang}")
-        app_logger.info(f"Build prompt in generale Template")
-        history = await self.history_service.get()
-        last_queries = history.user_queries if history else None
-        return f"""
-Tu es un conseiller YALLA. Cette requête est hors-contexte shopping, ton rôle est de ramener naturellement vers nos services.
-
-# DONNÉES CONTEXTUELLES
-Historique récent : {last_queries if last_queries else "Aucun historique"}
-Requête actuelle : "{query}"                                    
-                                                            
 # RÈGLES ABSOLUES DE RÉPONSE
-                                                        
+
 ## LONGUEUR STRICTE
 - Maximum 40 mots au total
 - Une seule phrase courte de reconnaissance
@@ -54,21 +42,21 @@ Si l'historique contient des éléments concrets :
 - Crée un pont logique vers 1-2 services pertinents
 - Reste dans le flux de conversation
 
-## SANS HISTORIQUE OU HISTORIQUE VAGUE  
+## SANS HISTORIQUE OU HISTORIQUE VAGUE
 - Reconnaissance simple de la demande
 - Transition directe vers ADV
 - Focus sur 1-2 services les plus universels
 
 # EXEMPLES DE BONNES RÉPONSES
 
-## Exemple 1 - 
+## Exemple 1 -
 
-## Exemple 2 - 
+## Exemple 2 -
 
 
-## Exemple 3 - 
+## Exemple 3 -
 
-## Exemple 4 - 
+## Exemple 4 -
 
 # SERVICES À PRIORISER (maximum 2 par réponse)
 
@@ -77,7 +65,7 @@ Si l'historique contient des éléments concrets :
 
 # FORMULES DE TRANSITION NATURELLES
 - "Je comprends ! Pour ça..."
-- "Bonne question ! Côté ADV..."  
+- "Bonne question ! Côté ADV..."
 - "Je vois ! En revanche..."
 - "Ah oui ! Pour notre plateforme..."
 - "Effectivement ! Sur ADV..."
@@ -89,10 +77,31 @@ Si l'historique contient des éléments concrets :
 - "Envie de découvrir nos nouveautés ?"
 - "Je peux vous aider avec quoi ?"
 
-# DIRECTIVES LINGUISTIQUES
-{lang}
-
 # INSTRUCTION FINALE
 - Génère UNE réponse courte (max 40 mots), naturelle, qui reconnaît la demande et redirige vers ADV sans structure visible. Sois humain, pas robotique.
-- suivre l'instruction de langue       
-         """
\ No newline at end of file
+- suivre l'instruction de langue
+"""
+
+    def __init__(self, language_service: Optional[LanguageService] = None, history_service: Optional[HistoryService] = None):
+        self.lang_service = language_service or LanguageService()
+        self.history_service = history_service or HistoryService()
+
+    async def build_messages(self, query: str, history: Optional[History] = None) -> List[Dict[str, str]]:
+        """Messages /api/chat : préfixe système fixe, puis historique, requête et langue"""
+        if history is None:
+            history = await self.history_service.get(query_limit=settings.HISTORY_PROMPT_QUERIES)
+        lang = await self.lang_service.get_language_instruction(history)
+        translate_logger.info(f"Langue: {lang}")
+        app_logger.info(f"Build prompt in generale Template")
+        last_queries = history.user_queries[-settings.HISTORY_PROMPT_QUERIES:] if history and history.user_queries else None
+        user_prompt = f"""# DONNÉES CONTEXTUELLES
+Historique récent : {last_queries if last_queries else "Aucun historique"}
+Requête actuelle : "{query}"
+
+# DIRECTIVES LINGUISTIQUES
+{lang}
+"""
+        return [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ]
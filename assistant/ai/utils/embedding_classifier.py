@@ -0,0 +1,106 @@
+import json
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from ai.utils.model_loader import ModelLoader
+from app.config.logger import classifier_logger as logger
+from app.config.settings import settings
+from app.enum.QueryType import QueryType
+
+
+class EmbeddingClassifier:
+    """
+    Classifieur local par plus proches voisins sur les exemples annotés.
+    Chaque classe est notée par la moyenne de ses `top_k` meilleures similarités
+    cosinus avec la requête ; un softmax à température donne la confiance.
+    Sauf valeur imposée (CLASSIFIER_TEMPERATURE), la température est ajustée à
+    chaque `fit` : celle qui minimise la log-loss leave-one-out sur les exemples.
+    """
+    # Températures candidates pour l'ajustement
+    TEMPERATURE_GRID = np.geomspace(0.005, 1.0, 200)
+
+    def __init__(self,
+                 examples_path: str = "ai/data/examples/classification/classifier_examples.json",
+                 model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+        self.examples_path = Path(examples_path)
+        self.model_name = model_name
+        self.top_k = settings.CLASSIFIER_TOP_K
+        self.fixed_temperature = settings.CLASSIFIER_TEMPERATURE
+        self.temperature: Optional[float] = self.fixed_temperature
+        self.classes: List[QueryType] = list(QueryType)
+
+        self._embeddings: Optional[np.ndarray] = None
+        self._labels: Optional[np.ndarray] = None
+
+    def load_examples(self) -> List[Tuple[str, QueryType]]:
+        """
+        Lit les exemples annotés. Les anciens types (SEARCH_PRODUCT, PLATFORM_HELP...)
+        qui ne sont pas des QueryType concernent tous la plateforme -> PLATFORM_INFO.
+        """
+        with open(self.examples_path, "r", encoding="utf-8") as f:
+            examples = json.load(f)["examples"]
+
+        values = {t.value for t in QueryType}
+        labeled = []
+        for example in examples:
+            label = example["response"]["Type"]
+            labeled.append((example["query"], QueryType(label) if label in values else QueryType.PLATFORM_INFO))
+        return labeled
+
+    def fit(self, examples: Optional[List[Tuple[str, QueryType]]] = None):
+        """Calcule les embeddings normalisés des exemples, puis ajuste la température"""
+        examples = examples if examples is not None else self.load_examples()
+        model = ModelLoader.get_model(self.model_name)
+        texts = [query for query, _ in examples]
+        self._embeddings = np.asarray(model.encode(texts, normalize_embeddings=True), dtype="float32")
+        self._labels = np.array([self.classes.index(label) for _, label in examples])
+        if self.fixed_temperature is None:
+            self.temperature, log_loss = self.fit_temperature()
+            logger.info(f"Température ajustée: {self.temperature:.4f} (log-loss leave-one-out {log_loss:.3f})")
+        logger.info(f"Classifieur kNN prêt - {len(examples)} exemples")
+
+    def leave_one_out_scores(self) -> np.ndarray:
+        """Scores par classe de chaque exemple, calculés sans cet exemple (n_exemples x n_classes)"""
+        similarities = self._embeddings @ self._embeddings.T
+        indices = np.arange(len(self._labels))
+        return np.stack([
+            self._class_scores(similarities[i][indices != i], self._labels[indices != i])
+            for i in indices
+        ])
+
+    def fit_temperature(self) -> Tuple[float, float]:
+        """Température de la grille minimisant la log-loss leave-one-out ; renvoie (température, log-loss)"""
+        scores = self.leave_one_out_scores()
+        logits = scores[None, :, :] / self.TEMPERATURE_GRID[:, None, None]
+        shifted = logits - logits.max(axis=2, keepdims=True)
+        log_probabilities = shifted - np.log(np.exp(shifted).sum(axis=2, keepdims=True))
+        losses = -log_probabilities[:, np.arange(len(self._labels)), self._labels].mean(axis=1)
+        best = int(np.argmin(losses))
+        return float(self.TEMPERATURE_GRID[best]), float(losses[best])
+
+    def predict(self, query: str) -> Tuple[QueryType, float]:
+        """Renvoie le type le plus probable et sa confiance (softmax des scores par classe)"""
+        if self._embeddings is None:
+            self.fit()
+
+        model = ModelLoader.get_model(self.model_name)
+        embedding = np.asarray(model.encode(query, normalize_embeddings=True), dtype="float32")
+        probabilities = self._class_probabilities(self._embeddings @ embedding)
+        best = int(np.argmax(probabilities))
+        return self.classes[best], float(probabilities[best])
+
+    def _class_scores(self, similarities: np.ndarray, labels: np.ndarray) -> np.ndarray:
+        scores = np.full(len(self.classes), -1.0, dtype="float32")
+        for i in range(len(self.classes)):
+            class_sims = similarities[labels == i]
+            if class_sims.size:
+                top = np.sort(class_sims)[-self.top_k:]
+                scores[i] = top.mean()
+        return scores
+
+    def _class_probabilities(self, similarities: np.ndarray) -> np.ndarray:
+        logits = self._class_scores(similarities, self._labels) / self.temperature
+        exp = np.exp(logits - logits.max())
+        return exp / exp.sum()
@@ -0,0 +1,107 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.config.logger import translate_logger as logger
+from app.config.settings import settings
+from app.utils.redis_manager import RedisManager, RedisOperationError
+
+
+class LanguageCache:
+    """
+    Cache des détections de langue et des traductions.
+    - LRU borné avec TTL en mémoire pour les deux
+    - traductions partagées entre workers via Redis (un appel réseau évité par worker)
+    La détection n'est pas envoyée dans Redis : langid coûte moins qu'un aller-retour réseau.
+    """
+
+    def __init__(self):
+        self.max_entries = settings.LANGUAGE_CACHE_MAX_ENTRIES
+        self.ttl = settings.LANGUAGE_CACHE_TTL
+        self.redis_manager = RedisManager()
+
+        self._detections: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._translations: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.counters: Dict[str, Dict[str, int]] = {
+            "detection": {"hits": 0, "misses": 0},
+            "translation": {"hits": 0, "redis_hits": 0, "misses": 0, "timeouts": 0, "errors": 0},
+        }
+
+    def get_detection(self, text: str) -> Optional[str]:
+        lang = self._get_local(self._detections, text)
+        self.counters["detection"]["hits" if lang else "misses"] += 1
+        return lang
+
+    def set_detection(self, text: str, lang: str):
+        self._set_local(self._detections, text, lang)
+
+    async def get_translation(self, text: str, source_lang: str) -> Optional[str]:
+        """Mémoire locale, puis Redis (la valeur trouvée est recopiée en local)"""
+        key = self._translation_key(text, source_lang)
+        translated = self._get_local(self._translations, key)
+        if translated:
+            self.counters["translation"]["hits"] += 1
+            return translated
+        try:
+            translated = await self.redis_manager.get_cached(key)
+        except RedisOperationError as e:
+            logger.warning(f"Cache de traduction Redis indisponible: {str(e)}")
+        if translated:
+            self.counters["translation"]["redis_hits"] += 1
+            self._set_local(self._translations, key, translated)
+            return translated
+        self.counters["translation"]["misses"] += 1
+        return None
+
+    async def set_translation(self, text: str, source_lang: str, translated: str):
+        key = self._translation_key(text, source_lang)
+        self._set_local(self._translations, key, translated)
+        try:
+            await self.redis_manager.set_cached(key, translated, self.ttl)
+        except RedisOperationError as e:
+            logger.warning(f"Cache de traduction Redis indisponible: {str(e)}")
+
+    def record(self, kind: str, event: str):
+        self.counters[kind][event] += 1
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Compteurs et taux de succès par type de cache"""
+        stats = {}
+        for kind, counters in self.counters.items():
+            hits = counters["hits"] + counters.get("redis_hits", 0)
+            total = hits + counters["misses"]
+            stats[kind] = {
+                **counters,
+                "entries": len(self._detections if kind == "detection" else self._translations),
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+            }
+        return stats
+
+    # --------------------------------------------------------------------------
+    # Méthodes utilitaires
+    # --------------------------------------------------------------------------
+
+    def _get_local(self, entries: "OrderedDict[str, Tuple[str, float]]", key: str) -> Optional[str]:
+        entry = entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del entries[key]
+            return None
+        entries.move_to_end(key)
+        return value
+
+    def _set_local(self, entries: "OrderedDict[str, Tuple[str, float]]", key: str, value: str):
+        entries[key] = (value, time.monotonic() + self.ttl)
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    @staticmethod
+    def _translation_key(text: str, source_lang: str) -> str:
+        return f"lang:translation:{source_lang}:fr:{hashlib.sha1(text.encode('utf-8')).hexdigest()}"
+
+
+language_cache = LanguageCache()
@@ -1,7 +1,13 @@
-from deep_translator import GoogleTranslator
+import asyncio
+import re
+import threading
 from app.config.logger import error_logger, translate_logger
-import langid
+from langid.langid import LanguageIdentifier, model as langid_model
 from typing import Optional, Tuple
+from app.schemas.history import History
+from app.config.settings import settings
+from ai.utils.language_cache import language_cache
+from ai.utils.translation import translator
 
 
 # history injection
@@ -9,23 +15,51 @@ from typing import Optional, Tuple
 from app.services.history_service import HistoryService
 
 
+# Lettres arabes (blocs de base, supplément, étendu, formes de présentation) et latines
+ARABIC_LETTERS_RE = re.compile(r"[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]")
+LATIN_LETTERS_RE = re.compile(r"[A-Za-z\u00C0-\u024F]")
+
+
 class LanguageService:
-    def __init__(self):
-        self.history_service = HistoryService()
+    # Langues gérées : langid ne choisit qu'entre elles
+    SUPPORTED_CODES = ("fr", "en", "ar", "de")
+    # Part minimale de lettres arabes pour conclure sans modèle
+    ARABIC_SCRIPT_RATIO = 0.8
+
+    # Modèle langid partagé par le processus, chargé au démarrage (preload)
+    _identifier: Optional[LanguageIdentifier] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def preload(cls) -> LanguageIdentifier:
+        """Charge le modèle langid (~2 s) et le restreint aux langues gérées"""
+        if cls._identifier is None:
+            with cls._lock:
+                if cls._identifier is None:
+                    identifier = LanguageIdentifier.from_modelstring(langid_model, norm_probs=False)
+                    identifier.set_languages(list(cls.SUPPORTED_CODES))
+                    cls._identifier = identifier
+                    translate_logger.info(f"Modèle langid chargé ({', '.join(cls.SUPPORTED_CODES)})")
+        return cls._identifier
+
+    def __init__(self, history_service: Optional[HistoryService] = None):
+        self.history_service = history_service or HistoryService()
         self.supported_languages = {
             "fr": "Répondez UNIQUEMENT en français. N'utilisez aucune autre langue.",
             "en": "STRICT LANGUAGE RULE: You MUST respond in ENGLISH only. Never use other languages.",
             "ar": ".رد باللغة العربية فقط. لا تستخدم أي لغة أخرى",
             "de": "Antworten Sie NUR auf Deutsch. Verwende keine andere Sprache."
         }
-        # Mapping des codes de langue vers les codes utilisés par GoogleTranslator
+        # Langues sources prises en charge par les backends de traduction
         self.translation_mapping = {
             'en': 'en',
             'ar': 'ar',
             'de': 'de'
         }
+        self.cache = language_cache
+        self.translator = translator
 
-    def process_language(self, query: str) -> Tuple[str, str]:
+    async def process_language(self, query: str) -> Tuple[str, str]:
         """
         Traite la langue de la requête: détection et traduction si nécessaire.
         
@@ -43,58 +77,80 @@ class LanguageService:
         # Traduction si nécessaire (vers le français)
         processed_query = query
         if(lang == 'ar'):
-            processed_query = self.translate_to_french(query, lang) 
+            processed_query = await self.translate_async(query, lang)
     
         return processed_query, lang
 
-    def translate_to_french(self, query: str, source_lang: str) -> Optional[str]:
+    async def translate_async(self, query: str, source_lang: str) -> str:
         """
-        Traduit un texte vers le français si la langue source n'est pas le français.
-        
-        Args:
-            query: Texte à traduire
-            source_lang: Code langue source (fr, en, ar, etc.)
-            
-        Returns:
-            Texte traduit en français ou None en cas d'échec
+        Traduction vers le français, mise en cache et exécutée hors de la boucle
+        d'événements avec un délai maximal : un traducteur lent ne bloque plus les autres flux.
+        En cas d'échec ou de dépassement, la requête d'origine est conservée.
         """
-        if source_lang == 'fr':
-            return query  # Pas besoin de traduction
-            
+        cached = await self.cache.get_translation(query, source_lang)
+        if cached:
+            return cached
+        if source_lang not in self.translation_mapping:
+            error_logger.warning(f"Langue non supportée pour la traduction: {source_lang}")
+            return query
         try:
-            if source_lang not in self.translation_mapping:
-                error_logger.warning(f"Langue non supportée pour la traduction: {source_lang}")
-                return query
-                
-            translated = GoogleTranslator(
-                source=self.translation_mapping[source_lang],
-                target='fr'
-            ).translate(query)
-            
-            translate_logger.info(f"Traduction réussie: {source_lang} -> fr")
-            translate_logger.info(f"Nouvelle requete en francais : {translated}")
-            return translated
-            
+            # Regroupée avec les requêtes concurrentes et traduite dans un thread
+            translated = await asyncio.wait_for(
+                self.translator.translate(query, self.translation_mapping[source_lang]),
+                timeout=settings.TRANSLATION_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            self.cache.record("translation", "timeouts")
+            error_logger.error(f"Traduction abandonnée après {settings.TRANSLATION_TIMEOUT}s")
+            return query
         except Exception as e:
+            self.cache.record("translation", "errors")
             error_logger.error(f"Échec de traduction: {str(e)}")
-            return None
+            return query
+        if not translated:
+            self.cache.record("translation", "errors")
+            return query
+        translate_logger.info(f"Traduction réussie ({self.translator.backend.name}): {source_lang} -> fr")
+        await self.cache.set_translation(query, source_lang, translated)
+        return translated
 
     def detect_language(self, text: str) -> str:
-        """Détecte la langue du texte en utilisant langid et langdetect"""
-    
+        """Détecte la langue du texte : écriture Unicode si elle suffit, sinon langid restreint"""
+
         if not text or not isinstance(text, str):
             error_logger.warning("Texte vide ou invalide fourni pour la détection de langue")
             return "fr"  # Langue par défaut
+        cached = self.cache.get_detection(text)
+        if cached:
+            return cached
         try:
-            # Détection avec langid
-            langid_result, langid_confidence = langid.classify(text)
-            return langid_result
+            lang = self.detect_script(text)
+            if lang is None:
+                # Texte latin : fr / en / de se départagent avec langid
+                lang, _ = self.preload().classify(text)
+            self.cache.set_detection(text, lang)
+            return lang
 
         except Exception as e:
             error_logger.error(f"Erreur de détection de langue: {str(e)}")
             return "fr"
 
-    async def get_language_instruction(self) -> str:
-        lang = await self.history_service.get_language()
+    def detect_script(self, text: str) -> Optional[str]:
+        """
+        Chemin rapide sans modèle : un texte majoritairement en lettres arabes est
+        de l'arabe, un texte sans aucune lettre garde la langue par défaut.
+        Renvoie None quand l'écriture ne suffit pas (texte latin).
+        """
+        arabic = len(ARABIC_LETTERS_RE.findall(text))
+        latin = len(LATIN_LETTERS_RE.findall(text))
+        if arabic and arabic >= self.ARABIC_SCRIPT_RATIO * (arabic + latin):
+            return "ar"
+        if not arabic and not latin:
+            return "fr"
+        return None
+
+    async def get_language_instruction(self, history: Optional[History] = None) -> str:
+        """Instruction de langue ; réutilise l'historique déjà chargé s'il est fourni"""
+        lang = history.lang if history else await self.history_service.get_language()
         return self.supported_languages.get(lang, self.supported_languages["fr"])
 
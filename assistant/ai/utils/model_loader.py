@@ -1,49 +1,144 @@
-from sentence_transformers import SentenceTransformer
-from typing import Dict
+import asyncio
+import threading
+import time
 import warnings
-import torch
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from app.config.logger import models_logger as logger
+
 
 class ModelLoader:
-    _instances: Dict[str, SentenceTransformer] = {}
-    _initialized = False
+    """
+    Registre unique des modèles du processus.
+    - get_model : modèles SentenceTransformer (embeddings), chargés une seule fois
+    - register / load : tout autre modèle ou index (Whisper, langid, traduction, FAISS...)
+      déclaré par son service, chargé une seule fois, paresseusement ou en arrière-plan
+    L'état de chaque entrée (pending, queued, loading, ready, failed) et son temps de
+    chargement alimentent /health/ready.
+    """
+    _instances: Dict[str, Any] = {}
+    _model_lock = threading.Lock()
+
+    _loaders: Dict[str, Callable[[], Any]] = {}
+    _futures: Dict[str, Future] = {}
+    _status: Dict[str, Dict[str, Any]] = {}
+    _lock = threading.Lock()
+    _executor: Optional[ThreadPoolExecutor] = None
 
     @classmethod
-    def get_model(cls, 
-                  model_name: str = "sentence-transformers/all-MiniLM-L6-v2", 
-                  device: str = None, 
-                  **kwargs) -> SentenceTransformer:
+    def get_model(cls,
+                  model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+                  device: str = None,
+                  **kwargs):
         if model_name not in cls._instances:
-            if device is None:
-                device = "cuda" if torch.cuda.is_available() else "cpu"
-
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                model = SentenceTransformer(
-                    model_name,
-                    device=device,
-                    tokenizer_kwargs={'clean_up_tokenization_spaces': False},
-                    **kwargs
-                )
-                model.max_seq_length = 512  # Optional
-                cls._instances[model_name] = model
+            with cls._model_lock:
+                if model_name not in cls._instances:
+                    # Imports différés : torch n'est chargé que si un embedding est demandé
+                    import torch
+                    from sentence_transformers import SentenceTransformer
+
+                    if device is None:
+                        device = "cuda" if torch.cuda.is_available() else "cpu"
+                    with warnings.catch_warnings():
+                        warnings.simplefilter("ignore")
+                        model = SentenceTransformer(
+                            model_name,
+                            device=device,
+                            tokenizer_kwargs={'clean_up_tokenization_spaces': False},
+                            **kwargs
+                        )
+                        model.max_seq_length = 512  # Optional
+                    cls._instances[model_name] = model
+                    logger.info(f"Modèle d'embedding chargé: {model_name} ({device})")
         return cls._instances[model_name]
-    
-    @classmethod
-    def initialize(cls):
-        # Charge les modèles au démarrage
-        if not cls._initialized:
-            # Modèle d'embedding
-            cls.get_model(
-                model_name="sentence-transformers/all-MiniLM-L6-v2",
-                model_type="embedding",
-                device="cpu",
-                max_seq_length=256
-            )
-            
-            # Modèle Whisper pour ASR
-            cls.get_model(
-                model_name="openai/whisper-medium",
-                model_type="asr",
-                device="cpu",
-                token=False
-            )
\ No newline at end of file
+
+    @classmethod
+    def register(cls, name: str, loader: Callable[[], Any]):
+        """Déclare un modèle ; rien n'est chargé avant load / preload"""
+        with cls._lock:
+            cls._loaders[name] = loader
+            cls._status.setdefault(name, {"state": "pending", "load_time": None, "error": None})
+
+    @classmethod
+    def load(cls, name: str) -> Future:
+        """Lance le chargement s'il n'a pas encore eu lieu ; le même Future est partagé par tous les appelants"""
+        with cls._lock:
+            if name not in cls._loaders:
+                raise KeyError(f"Modèle non enregistré: {name}")
+            future = cls._futures.get(name)
+            if future is None or (future.done() and (future.cancelled() or future.exception() is not None)):
+                cls._status[name].update(state="queued", error=None)
+                future = cls._get_executor().submit(cls._run_loader, name)
+                cls._futures[name] = future
+            return future
+
+    @classmethod
+    def get(cls, name: str, timeout: Optional[float] = None) -> Any:
+        """Modèle chargé (bloquant) : attend la fin du chargement en cours"""
+        return cls.load(name).result(timeout)
+
+    @classmethod
+    async def wait(cls, *names: str) -> list:
+        """Attend, sans bloquer la boucle d'événements, que les modèles demandés soient prêts"""
+        return await asyncio.gather(*(asyncio.wrap_future(cls.load(name)) for name in names))
+
+    @classmethod
+    async def settle(cls, *names: str):
+        """Attend la fin du chargement, réussi ou non : modèles pour lesquels le service a un repli"""
+        futures = [asyncio.wrap_future(cls.load(name)) for name in names if name in cls._loaders]
+        await asyncio.gather(*futures, return_exceptions=True)
+
+    @classmethod
+    def preload(cls, names: Optional[Iterable[str]] = None, workers: int = 4):
+        """Charge les modèles en parallèle dans des threads, sans attendre leur fin"""
+        cls._get_executor(workers)
+        for name in names if names is not None else list(cls._loaders):
+            if name in cls._loaders:
+                cls.load(name)
+            else:
+                logger.warning(f"Préchargement ignoré, modèle non enregistré: {name}")
+
+    @classmethod
+    def is_ready(cls, *names: str) -> bool:
+        return all(cls._status.get(name, {}).get("state") == "ready" for name in names)
+
+    @classmethod
+    def status(cls) -> Dict[str, Dict[str, Any]]:
+        with cls._lock:
+            return {name: dict(state) for name, state in cls._status.items()}
+
+    @classmethod
+    def shutdown(cls):
+        """Arrête les chargements en attente (les chargements en cours se terminent)"""
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
+
+    # --------------------------------------------------------------------------
+    # Méthodes utilitaires
+    # --------------------------------------------------------------------------
+
+    @classmethod
+    def _get_executor(cls, workers: int = 4) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="model-loader")
+        return cls._executor
+
+    @classmethod
+    def _run_loader(cls, name: str) -> Any:
+        with cls._lock:
+            cls._status[name]["state"] = "loading"
+        start = time.perf_counter()
+        try:
+            model = cls._loaders[name]()
+        except Exception as e:
+            with cls._lock:
+                cls._status[name].update(state="failed", error=str(e), load_time=None)
+            logger.error(f"Échec du chargement du modèle {name}: {str(e)}")
+            raise
+        load_time = round(time.perf_counter() - start, 3)
+        with cls._lock:
+            cls._status[name].update(state="ready", load_time=load_time, error=None)
+        logger.info(f"Modèle {name} prêt en {load_time:.2f} s")
+        return model
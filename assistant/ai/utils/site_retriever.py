@@ -0,0 +1,148 @@
+import asyncio
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from ai.utils.model_loader import ModelLoader
+from app.config.logger import app_logger as logger
+from app.config.settings import settings
+
+
+@dataclass
+class SiteChunk:
+    position: int
+    text: str
+    tokens: int
+
+
+class SiteInfoRetriever:
+    """
+    Recherche des sections de site_info.txt pertinentes pour une question.
+    Le document est découpé en sections qui se chevauchent (paragraphes regroupés
+    jusqu'à CHUNK_TOKENS), encodées une fois avec MiniLM ; seules les meilleures
+    sections entrent dans le prompt, dans la limite d'un budget de tokens.
+    Un prompt plus court réduit directement le temps de premier token sur Ollama CPU.
+    """
+
+    def __init__(self,
+                 site_info_path: str = "ai/data/adv/site_info.txt",
+                 model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+        self.site_info_path = Path(site_info_path)
+        self.model_name = model_name
+        self.chunk_tokens = settings.SITE_RAG_CHUNK_TOKENS
+        self.overlap_tokens = settings.SITE_RAG_CHUNK_OVERLAP
+        self.top_k = settings.SITE_RAG_TOP_K
+        self.token_budget = settings.SITE_RAG_TOKEN_BUDGET
+
+        self._chunks: List[SiteChunk] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._document = ""
+        self._version: Optional[Tuple[float, int]] = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Découpe et encode le document ; ne refait le travail que si le fichier a changé"""
+        version = self._get_version()
+        if self._matrix is not None and version == self._version:
+            return
+        with self._lock:
+            if self._matrix is not None and version == self._version:
+                return
+            document = self.site_info_path.read_text(encoding="utf-8").strip()
+            chunks = self.split(document)
+            model = ModelLoader.get_model(self.model_name)
+            matrix = np.asarray(
+                model.encode([c.text for c in chunks], normalize_embeddings=True, show_progress_bar=False),
+                dtype="float32"
+            )
+            self._document, self._chunks, self._matrix, self._version = document, chunks, matrix, version
+            logger.info(f"site_info.txt découpé en {len(chunks)} sections ({sum(c.tokens for c in chunks)} tokens)")
+
+    async def retrieve(self, question: str) -> str:
+        """Contexte à injecter dans le prompt ; document complet si la recherche échoue"""
+        try:
+            return await asyncio.to_thread(self._retrieve, question)
+        except Exception as e:
+            logger.error(f"Recherche dans site_info.txt impossible, document complet utilisé: {str(e)}")
+            return self._document or self.site_info_path.read_text(encoding="utf-8").strip()
+
+    def split(self, document: str) -> List[SiteChunk]:
+        """
+        Regroupe les paragraphes (lignes pour un paragraphe trop long) jusqu'à
+        chunk_tokens ; chaque section reprend la fin de la précédente sur overlap_tokens.
+        """
+        units = []
+        for paragraph in re.split(r"\n\s*\n", document):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if self.count_tokens(paragraph) <= self.chunk_tokens:
+                units.append(paragraph)
+            else:
+                units.extend(line.strip() for line in paragraph.splitlines() if line.strip())
+
+        chunks: List[SiteChunk] = []
+        current: List[str] = []
+        for unit in units:
+            if current and self.count_tokens("\n".join(current + [unit])) > self.chunk_tokens:
+                chunks.append(self._make_chunk(len(chunks), current))
+                current = self._overlap(current)
+                if self.count_tokens("\n".join(current + [unit])) > self.chunk_tokens:
+                    current = []
+            current.append(unit)
+        if current:
+            chunks.append(self._make_chunk(len(chunks), current))
+        return chunks
+
+    @staticmethod
+    def count_tokens(text: str) -> int:
+        """Estimation du nombre de tokens (~4 caractères par token)"""
+        return len(text) // 4 + 1
+
+    # --------------------------------------------------------------------------
+    # Méthodes utilitaires
+    # --------------------------------------------------------------------------
+
+    def _retrieve(self, question: str) -> str:
+        self.load()
+        model = ModelLoader.get_model(self.model_name)
+        query = np.asarray(model.encode([question], normalize_embeddings=True, show_progress_bar=False), dtype="float32")[0]
+        scores = self._matrix @ query
+
+        selected, used = [], 0
+        for i in np.argsort(-scores)[:self.top_k]:
+            chunk = self._chunks[i]
+            if selected and used + chunk.tokens > self.token_budget:
+                continue
+            selected.append(chunk)
+            used += chunk.tokens
+        # Ordre du document : les sections voisines restent lisibles
+        selected.sort(key=lambda c: c.position)
+        return "\n[...]\n".join(c.text for c in selected)
+
+    def _overlap(self, units: List[str]) -> List[str]:
+        """Dernières unités de la section précédente, dans la limite de overlap_tokens"""
+        kept: List[str] = []
+        for unit in reversed(units):
+            if self.count_tokens("\n".join([unit] + kept)) > self.overlap_tokens:
+                break
+            kept.insert(0, unit)
+        return kept
+
+    def _make_chunk(self, position: int, units: List[str]) -> SiteChunk:
+        text = "\n".join(units)
+        return SiteChunk(position=position, text=text, tokens=self.count_tokens(text))
+
+    def _get_version(self) -> Optional[Tuple[float, int]]:
+        try:
+            stat = self.site_info_path.stat()
+            return stat.st_mtime, stat.st_size
+        except OSError:
+            return None
+
+
+site_retriever = SiteInfoRetriever()
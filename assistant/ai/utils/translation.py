@@ -0,0 +1,247 @@
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from deep_translator import GoogleTranslator
+
+from app.config.logger import translate_logger as logger, error_logger
+from app.config.settings import settings
+
+
+class Translator(ABC):
+    """Interface commune des backends de traduction (appels bloquants, par lots)"""
+    name = "base"
+
+    @abstractmethod
+    def translate_batch(self, texts: List[str], source_lang: str, target_lang: str = "fr") -> List[str]:
+        ...
+
+    def translate(self, text: str, source_lang: str, target_lang: str = "fr") -> str:
+        return self.translate_batch([text], source_lang, target_lang)[0]
+
+    def warmup(self):
+        """Charge les ressources du backend avant la première requête"""
+
+
+class GoogleTranslatorBackend(Translator):
+    """Traduction en ligne via deep-translator (nécessite un accès internet)"""
+    name = "google"
+
+    def translate_batch(self, texts: List[str], source_lang: str, target_lang: str = "fr") -> List[str]:
+        return GoogleTranslator(source=source_lang, target=target_lang).translate_batch(texts)
+
+
+class CTranslate2Translator(Translator):
+    """
+    Traduction locale sur CPU avec un modèle MarianMT / NLLB converti pour CTranslate2
+    (même moteur que faster-whisper). Conversion, par exemple :
+        ct2-transformers-converter --model Helsinki-NLP/opus-mt-ar-fr \\
+            --output_dir ai/models/opus-mt-ar-fr-ct2 --quantization int8 \\
+            --copy_files source.spm target.spm tokenizer_config.json vocab.json
+
+    Le traducteur CTranslate2 est un pool de `inter_threads` répliques chaudes :
+    plusieurs lots sont traduits en parallèle sans recharger le modèle.
+    """
+    name = "ctranslate2"
+    # Codes FLORES-200 utilisés par NLLB
+    NLLB_CODES = {"ar": "arb_Arab", "fr": "fra_Latn", "en": "eng_Latn", "de": "deu_Latn"}
+
+    _instances: Dict[str, Tuple[object, object]] = {}
+    _lock = threading.Lock()
+
+    def __init__(self,
+                 model_dir: str,
+                 tokenizer_dir: Optional[str] = None,
+                 compute_type: str = "int8",
+                 inter_threads: int = 2,
+                 intra_threads: int = 2,
+                 beam_size: int = 2,
+                 max_batch_size: int = 16):
+        self.model_dir = model_dir
+        self.tokenizer_dir = tokenizer_dir or model_dir
+        self.compute_type = compute_type
+        self.inter_threads = inter_threads
+        self.intra_threads = intra_threads
+        self.beam_size = beam_size
+        self.max_batch_size = max_batch_size
+        self.is_nllb = "nllb" in Path(model_dir).name.lower()
+
+    def warmup(self):
+        self._get_model()
+        self.translate_batch(["مرحبا"], "ar")
+
+    def translate_batch(self, texts: List[str], source_lang: str, target_lang: str = "fr") -> List[str]:
+        translator, tokenizer = self._get_model()
+        if self.is_nllb:
+            tokenizer.src_lang = self.NLLB_CODES.get(source_lang, source_lang)
+        sources = [tokenizer.convert_ids_to_tokens(tokenizer.encode(text)) for text in texts]
+        target_prefix = [[self.NLLB_CODES.get(target_lang, target_lang)]] * len(texts) if self.is_nllb else None
+
+        results = translator.translate_batch(
+            sources,
+            target_prefix=target_prefix,
+            beam_size=self.beam_size,
+            max_batch_size=self.max_batch_size,
+        )
+        outputs = []
+        for result in results:
+            tokens = result.hypotheses[0][1:] if self.is_nllb else result.hypotheses[0]
+            outputs.append(tokenizer.decode(tokenizer.convert_tokens_to_ids(tokens), skip_special_tokens=True))
+        return outputs
+
+    def _get_model(self):
+        """Modèle et tokenizer chargés une seule fois par processus"""
+        if self.model_dir not in self._instances:
+            with self._lock:
+                if self.model_dir not in self._instances:
+                    import ctranslate2
+                    from transformers import AutoTokenizer
+
+                    translator = ctranslate2.Translator(
+                        self.model_dir,
+                        device="cpu",
+                        compute_type=self.compute_type,
+                        inter_threads=self.inter_threads,
+                        intra_threads=self.intra_threads,
+                    )
+                    tokenizer = AutoTokenizer.from_pretrained(self.tokenizer_dir)
+                    self._instances[self.model_dir] = (translator, tokenizer)
+                    logger.info(f"Modèle de traduction local chargé: {self.model_dir} ({self.compute_type})")
+        return self._instances[self.model_dir]
+
+
+class FallbackTranslator(Translator):
+    """Essaie chaque backend dans l'ordre (ex. modèle local puis Google)"""
+
+    def __init__(self, backends: List[Translator]):
+        self.backends = backends
+        self.name = "+".join(b.name for b in backends)
+
+    def warmup(self):
+        """Un backend indisponible n'empêche pas les autres de servir : échec seulement si aucun ne démarre"""
+        last_error: Optional[Exception] = None
+        ready = 0
+        for backend in self.backends:
+            try:
+                backend.warmup()
+                ready += 1
+            except Exception as e:
+                logger.warning(f"Backend de traduction indisponible ({backend.name}): {str(e)}")
+                last_error = e
+        if not ready:
+            raise RuntimeError(f"Aucun backend de traduction disponible: {last_error}")
+
+    def translate_batch(self, texts: List[str], source_lang: str, target_lang: str = "fr") -> List[str]:
+        last_error: Optional[Exception] = None
+        for backend in self.backends:
+            try:
+                return backend.translate_batch(texts, source_lang, target_lang)
+            except Exception as e:
+                error_logger.error(f"Échec de traduction ({backend.name}): {str(e)}")
+                last_error = e
+        raise RuntimeError(f"Aucun backend de traduction disponible: {last_error}")
+
+
+class BatchingTranslator:
+    """
+    Façade asynchrone : les requêtes concurrentes arrivées en moins de `max_wait`
+    secondes sont regroupées en un seul lot, traduit dans un thread (la boucle
+    d'événements n'est jamais bloquée). `concurrency` lots peuvent tourner en parallèle,
+    un par réplique du pool de modèles.
+    """
+
+    def __init__(self, backend: Translator, max_batch: int = 16, max_wait: float = 0.01, concurrency: int = 2):
+        self.backend = backend
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.concurrency = concurrency
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def translate(self, text: str, source_lang: str, target_lang: str = "fr") -> str:
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, source_lang, target_lang, future))
+        return await future
+
+    def warmup(self):
+        self.backend.warmup()
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._worker = loop.create_task(self._collect())
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            groups: Dict[Tuple[str, str], list] = {}
+            for item in batch:
+                groups.setdefault((item[1], item[2]), []).append(item)
+            for (source_lang, target_lang), items in groups.items():
+                await self._semaphore.acquire()
+                loop.create_task(self._dispatch(items, source_lang, target_lang))
+
+    async def _dispatch(self, items: list, source_lang: str, target_lang: str):
+        try:
+            texts = [item[0] for item in items]
+            results = await asyncio.to_thread(self.backend.translate_batch, texts, source_lang, target_lang)
+            for item, result in zip(items, results):
+                if not item[3].done():
+                    item[3].set_result(result)
+        except Exception as e:
+            for item in items:
+                if not item[3].done():
+                    item[3].set_exception(e)
+        finally:
+            self._semaphore.release()
+
+
+def build_translator() -> BatchingTranslator:
+    """Backend configuré (TRANSLATION_BACKEND), avec Google en repli optionnel"""
+    backends: List[Translator] = []
+    if settings.TRANSLATION_BACKEND == "ctranslate2":
+        if Path(settings.TRANSLATION_MODEL_DIR).exists():
+            backends.append(CTranslate2Translator(
+                settings.TRANSLATION_MODEL_DIR,
+                compute_type=settings.TRANSLATION_COMPUTE_TYPE,
+                inter_threads=settings.TRANSLATION_INTER_THREADS,
+                intra_threads=settings.TRANSLATION_INTRA_THREADS,
+                max_batch_size=settings.TRANSLATION_BATCH_SIZE,
+            ))
+        else:
+            logger.warning(f"Modèle de traduction local absent ({settings.TRANSLATION_MODEL_DIR})")
+    if settings.TRANSLATION_BACKEND == "google" or settings.TRANSLATION_GOOGLE_FALLBACK:
+        backends.append(GoogleTranslatorBackend())
+    if not backends:
+        raise RuntimeError("Aucun backend de traduction configuré")
+
+    backend = backends[0] if len(backends) == 1 else FallbackTranslator(backends)
+    logger.info(f"Traduction: backend {backend.name}")
+    return BatchingTranslator(
+        backend,
+        max_batch=settings.TRANSLATION_BATCH_SIZE,
+        max_wait=settings.TRANSLATION_MAX_WAIT_MS / 1000,
+        concurrency=settings.TRANSLATION_INTER_THREADS,
+    )
+
+
+translator = build_translator()
@@ -0,0 +1,127 @@
+import asyncio
+import os
+import statistics
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Deque, Dict, List, Tuple
+
+
+class TranscriptionQueueFull(Exception):
+    """Toutes les répliques sont occupées et la file d'attente est pleine"""
+
+
+@dataclass
+class TranscriptionMetrics:
+    queue_wait: float
+    inference: float
+    audio_duration: float
+
+    @property
+    def rtf(self) -> float:
+        """Real-time factor : temps d'inférence / durée de l'audio"""
+        return self.inference / self.audio_duration if self.audio_duration else 0.0
+
+
+class WhisperPool:
+    """
+    Exécute les transcriptions faster-whisper hors de la boucle d'événements.
+    `workers` threads appellent en parallèle le même WhisperModel, chargé avec
+    num_workers=workers : CTranslate2 libère le GIL et dispose d'une réplique par
+    thread, le débit suit donc le nombre de cœurs (cpu_threads chacun).
+    Au-delà de `workers` transcriptions en cours et `max_queue` en attente,
+    les nouvelles demandes sont refusées (TranscriptionQueueFull -> 429).
+    """
+
+    def __init__(self, workers: int = 2, max_queue: int = 8, history: int = 500):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="whisper")
+        # Compteurs modifiés uniquement depuis la boucle d'événements
+        self._pending = 0
+        self._jobs: Deque[TranscriptionMetrics] = deque(maxlen=history)
+        self.counters: Dict[str, int] = {"completed": 0, "rejected": 0, "failed": 0}
+
+    @staticmethod
+    def cpu_threads_per_worker(workers: int) -> int:
+        """Répartit les cœurs disponibles entre les répliques"""
+        return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+    async def transcribe(self, model, audio, sampling_rate: int = 16000, **params) -> Tuple[List[Any], Any, TranscriptionMetrics]:
+        """
+        Transcrit `audio` (float32 mono) sur une réplique libre.
+        Les segments sont matérialisés dans le thread : le générateur de
+        faster-whisper n'est jamais parcouru sur la boucle d'événements.
+        """
+        if self._pending >= self.workers + self.max_queue:
+            self.counters["rejected"] += 1
+            raise TranscriptionQueueFull(
+                f"{self._pending} transcriptions en cours ou en attente (max {self.workers + self.max_queue})"
+            )
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+        future = self._executor.submit(self._run, model, audio, params)
+        self._pending += 1
+        # Libéré quand le thread a vraiment fini (ou n'a jamais démarré), même si
+        # l'appelant est annulé pendant que la transcription tourne encore
+        future.add_done_callback(lambda _: self._release(loop))
+        try:
+            segments, info, started, finished = await asyncio.wrap_future(future)
+        except Exception:
+            self.counters["failed"] += 1
+            raise
+
+        metrics = TranscriptionMetrics(
+            queue_wait=started - submitted,
+            inference=finished - started,
+            audio_duration=len(audio) / sampling_rate,
+        )
+        self._jobs.append(metrics)
+        self.counters["completed"] += 1
+        return segments, info, metrics
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Occupation du pool et temps des dernières transcriptions (secondes)"""
+        stats: Dict[str, Any] = {
+            **self.counters,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+        }
+        if self._jobs:
+            for field in ("queue_wait", "inference"):
+                values = sorted(getattr(job, field) for job in self._jobs)
+                stats[field] = {
+                    "p50": round(statistics.median(values), 4),
+                    "p95": round(values[int(len(values) * 0.95)], 4),
+                    "max": round(values[-1], 4),
+                }
+            stats["rtf"] = round(statistics.mean(job.rtf for job in self._jobs), 4)
+            stats["last_job"] = {k: round(v, 4) for k, v in asdict(self._jobs[-1]).items()}
+        return stats
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # --------------------------------------------------------------------------
+    # Méthodes utilitaires
+    # --------------------------------------------------------------------------
+
+    def _release(self, loop: asyncio.AbstractEventLoop):
+        """Callback du thread de l'exécuteur : décrémente `_pending` depuis la boucle"""
+        try:
+            loop.call_soon_threadsafe(self._decrement_pending)
+        except RuntimeError:
+            # Boucle déjà fermée (arrêt de l'application)
+            pass
+
+    def _decrement_pending(self):
+        self._pending -= 1
+
+    @staticmethod
+    def _run(model, audio, params: Dict[str, Any]):
+        started = time.perf_counter()
+        segments, info = model.transcribe(audio, **params)
+        segments = list(segments)
+        return segments, info, started, time.perf_counter()
@@ -8,6 +8,9 @@ class RedisSettings(BaseSettings):
     redis_db: int = Field(default=0, alias="REDIS_DB")
     redis_password: str | None = Field(default=None, alias="REDIS_PASSWORD")
     redis_url: str = Field(default="", alias="REDIS_URL")
+    redis_max_connections: int = Field(default=50, alias="REDIS_MAX_CONNECTIONS")
+    # Attente max (s) d'une connexion libre quand le pool est saturé
+    redis_pool_timeout: float = Field(default=5.0, alias="REDIS_POOL_TIMEOUT")
 
     class Config:
         env_file = ".env"
@@ -9,6 +9,75 @@ class Settings:
     Deepseek_Model = "deepseek-chat"
     DEEPSEEK_API_KEY= "sk-cdb75809151149d69cab6584a3296ce6"
     SESSION_COOKIE_NAME: str = "session_id_1"
+    # Pool de connexions HTTP vers les backends LLM
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    OLLAMA_MAX_CONNECTIONS: int = 20
+    OLLAMA_HTTP2: bool = False  # Ollama ne parle que HTTP/1.1
+    # Durée pendant laquelle Ollama garde le modèle (et son cache de prompt) en mémoire
+    OLLAMA_KEEP_ALIVE: str = "30m"
+    DEEPSEEK_MAX_CONNECTIONS: int = 10
+    DEEPSEEK_HTTP2: bool = True
+    # Délai artificiel entre deux tokens streamés (0 = transfert immédiat)
+    STREAM_CHUNK_DELAY: float = 0.0
+    # Cache sémantique des réponses (similarité cosinus MiniLM)
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_THRESHOLD: float = 0.92
+    SEMANTIC_CACHE_TTL: int = 3600
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 512
+    # Historique de session : requêtes conservées dans Redis / injectées dans les prompts
+    HISTORY_MAX_QUERIES: int = 50
+    HISTORY_PROMPT_QUERIES: int = 5
+    # Classifieur kNN sur embeddings (repli LLM sous le seuil de confiance)
+    CLASSIFIER_CONFIDENCE_THRESHOLD: float = 0.75
+    CLASSIFIER_TOP_K: int = 3
+    # Température du softmax ; None = ajustée sur les exemples annotés (leave-one-out)
+    CLASSIFIER_TEMPERATURE: float | None = None
+    # Recherche produits (index FAISS + métadonnées produits)
+    PRODUCT_INDEX_DIR: str = "ai/data/embeddings"
+    PRODUCT_INDEX_MMAP: bool = True
+    # Cache des détections de langue / traductions, délai max d'une traduction (s)
+    LANGUAGE_CACHE_MAX_ENTRIES: int = 2048
+    LANGUAGE_CACHE_TTL: int = 86400
+    TRANSLATION_TIMEOUT: float = 3.0
+    # Traduction ar -> fr : modèle local CTranslate2 (MarianMT / NLLB), Google en repli
+    TRANSLATION_BACKEND: str = "ctranslate2"  # "ctranslate2" ou "google"
+    TRANSLATION_MODEL_DIR: str = "ai/models/opus-mt-ar-fr-ct2"
+    TRANSLATION_COMPUTE_TYPE: str = "int8"
+    TRANSLATION_GOOGLE_FALLBACK: bool = True
+    TRANSLATION_INTER_THREADS: int = 2  # répliques du modèle (lots traduits en parallèle)
+    TRANSLATION_INTRA_THREADS: int = 2
+    TRANSLATION_BATCH_SIZE: int = 16
+    TRANSLATION_MAX_WAIT_MS: float = 10.0
+    # Sections de site_info.txt injectées dans les prompts plateforme (tokens estimés)
+    SITE_RAG_ENABLED: bool = True
+    SITE_RAG_CHUNK_TOKENS: int = 200
+    SITE_RAG_CHUNK_OVERLAP: int = 40
+    SITE_RAG_TOP_K: int = 4
+    SITE_RAG_TOKEN_BUDGET: int = 600
+    # Modèles chargés en arrière-plan au démarrage (les autres le sont à la première requête)
+    MODEL_PRELOAD: tuple = ("embedding", "classifier", "langid", "site_index", "product_index", "translation", "whisper")
+    MODEL_LOAD_WORKERS: int = 4
+    # Uploads audio : lus par blocs en mémoire, taille maximale acceptée
+    VOICE_MAX_UPLOAD_BYTES: int = 25 * 1024 * 1024
+    VOICE_UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    # Profil de transcription par défaut ("fast-cpu" : int8 + VAD + beam 1, "accurate" : beam 5),
+    # modifiable par requête avec ?profile=
+    WHISPER_PROFILE: str = "fast-cpu"
+    # Pool de transcription Whisper : répliques (threads), threads CPU par réplique (0 = cœurs / répliques),
+    # transcriptions en attente au-delà desquelles les requêtes sont refusées (429)
+    WHISPER_WORKERS: int = 2
+    WHISPER_CPU_THREADS: int = 0
+    WHISPER_MAX_QUEUE: int = 8
+    # Flux vocal /voice/stream : découpage par VAD Silero (segment clos après une pause,
+    # énoncé clos après un silence plus long) ; hors parole, seul CONTEXT_MS d'audio est conservé
+    VOICE_STREAM_VAD_THRESHOLD: float = 0.5
+    VOICE_STREAM_VAD_STEP_MS: int = 250
+    VOICE_STREAM_SEGMENT_SILENCE_MS: int = 400
+    VOICE_STREAM_END_SILENCE_MS: int = 900
+    VOICE_STREAM_SPEECH_PAD_MS: int = 200
+    VOICE_STREAM_MAX_SEGMENT_S: float = 15.0
+    VOICE_STREAM_CONTEXT_MS: int = 1000
     
 
 settings = Settings()
@@ -0,0 +1,130 @@
+from typing import Tuple
+
+from fastapi import Depends, HTTPException
+from fastapi.requests import HTTPConnection
+
+from ai.llm.ollama_client import OllamaClient
+from ai.prompts_template.adv_platform_prompt import ADVPlatformTemplate
+from ai.prompts_template.classifier_prompt import ClassifierPromptTemplate
+from ai.prompts_template.generale_prompt import GeneralDiscussionTemplate
+from ai.utils.embedding_classifier import EmbeddingClassifier
+from ai.utils.language_util import LanguageService
+from ai.utils.model_loader import ModelLoader
+from ai.utils.site_retriever import site_retriever
+from ai.utils.translation import translator
+from app.config.logger import app_logger as logger
+from app.config.settings import settings
+from app.services.classifier_service import ClassifierService
+from app.services.history_service import HistoryService
+from app.services.product_search_service import ProductSearchService
+from app.services.response_service import ResponseService
+from app.services.streaming_generator_service import StreamingGenerator
+from app.services.voice_service import VoiceService
+from app.utils.redis_manager import RedisManager
+
+
+class Container:
+    """
+    Graphe des services de l'application, construit une seule fois dans le lifespan.
+    Chaque client, template et modèle n'existe qu'en un exemplaire par processus ;
+    les routes le reçoivent par Depends au lieu de créer leurs propres instances.
+    """
+
+    def __init__(self):
+        # Accès aux données
+        self.redis_manager = RedisManager()
+        self.history_service = HistoryService(self.redis_manager)
+        self.language_service = LanguageService(self.history_service)
+        self.ollama_client = OllamaClient()
+
+        # Templates (site_info.txt lu une seule fois)
+        self.adv_template = ADVPlatformTemplate(language_service=self.language_service)
+        self.general_template = GeneralDiscussionTemplate(self.language_service, self.history_service)
+        self.classifier_template = ClassifierPromptTemplate(self.history_service)
+
+        # Services
+        self.response_service = ResponseService(self.adv_template, self.general_template, self.ollama_client)
+        self.classifier_service = ClassifierService(
+            self.classifier_template,
+            self.language_service,
+            self.ollama_client,
+            EmbeddingClassifier(),
+        )
+        self.streaming_generator = StreamingGenerator(
+            self.history_service,
+            self.classifier_service,
+            self.response_service,
+            self.language_service,
+        )
+        self.product_search_service = ProductSearchService()
+        self.voice_service = VoiceService()
+        self.register_models()
+        logger.info("Conteneur de services initialisé")
+
+    def register_models(self):
+        """
+        Déclare les modèles et index auprès de ModelLoader, sans les charger :
+        le lifespan les précharge en arrière-plan, chaque route n'attend que les siens.
+        Whisper est déclaré par VoiceService.
+        """
+        embedding_model = self.classifier_service.embedding_classifier.model_name
+        ModelLoader.register("embedding", lambda: ModelLoader.get_model(embedding_model))
+        ModelLoader.register("classifier", self.classifier_service.embedding_classifier.fit)
+        ModelLoader.register("langid", LanguageService.preload)
+        ModelLoader.register("translation", translator.warmup)
+        ModelLoader.register("product_index", ProductSearchService.load)
+        if settings.SITE_RAG_ENABLED:
+            ModelLoader.register("site_index", site_retriever.load)
+
+
+# ------------------------------------------------------------------------------
+# Dépendances FastAPI
+# ------------------------------------------------------------------------------
+
+def get_container(connection: HTTPConnection) -> Container:
+    # HTTPConnection : commun aux requêtes HTTP et aux WebSockets
+    return connection.app.state.container
+
+
+async def wait_for_models(*names: str, optional: Tuple[str, ...] = ()):
+    """
+    Attend les modèles d'une requête : 503 si un modèle requis échoue.
+    Les modèles optionnels (le service a un repli) sont attendus sans être exigés.
+    """
+    try:
+        await ModelLoader.wait(*names)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Modèle indisponible: {str(e)}")
+    if optional:
+        await ModelLoader.settle(*optional)
+
+
+def require_models(*names: str, optional: Tuple[str, ...] = ()):
+    """Dépendance de route : attend que les modèles nécessaires soient chargés (voir wait_for_models)"""
+    async def dependency():
+        await wait_for_models(*names, optional=optional)
+    return dependency
+
+
+def get_history_service(container: Container = Depends(get_container)) -> HistoryService:
+    return container.history_service
+
+
+def get_response_service(container: Container = Depends(get_container)) -> ResponseService:
+    return container.response_service
+
+
+def get_classifier_service(container: Container = Depends(get_container)) -> ClassifierService:
+    return container.classifier_service
+
+
+def get_streaming_generator(container: Container = Depends(get_container)) -> StreamingGenerator:
+    return container.streaming_generator
+
+
+def get_product_search_service(container: Container = Depends(get_container)) -> ProductSearchService:
+    return container.product_search_service
+
+
+def get_voice_service(container: Container = Depends(get_container)) -> VoiceService:
+    return container.voice_service
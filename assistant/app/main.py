@@ -1,3 +1,5 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 
@@ -7,16 +9,40 @@ from app.routes.search_routes import router as question_routes
 from app.routes.classifier_routes import router as filter_query
 from app.routes.chatBot_routes import router as bot_query
 from app.routes.voice_routes import router as voice_routes
+from app.routes.product_routes import router as product_routes
 
 from app.config.logger import LoggerConfig
 
 from app.routes.redis_routes import router as redis_routes
+from app.routes.health_routes import router as health_routes
+from ai.llm.http_pool import HTTPClientPool
+from app.utils.redis_manager import RedisManager
+from ai.utils.model_loader import ModelLoader
+from app.container import Container
 
 settings = Settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Connexions HTTP partagées vers les LLM, ouvertes/fermées avec l'application
+    await HTTPClientPool.startup()
+    # Graphe de services unique (templates, clients, modèles), partagé par toutes les routes
+    app.state.container = await asyncio.to_thread(Container)
+    # Modèles chargés en parallèle dans des threads : l'API répond dès maintenant,
+    # chaque route n'attend que les modèles dont elle a besoin (voir /health/ready)
+    ModelLoader.preload(settings.MODEL_PRELOAD, workers=settings.MODEL_LOAD_WORKERS)
+    yield
+    await HTTPClientPool.close()
+    await RedisManager.close_pool()
+    ModelLoader.shutdown()
+    app.state.container.voice_service.pool.shutdown()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -34,10 +60,12 @@ app.include_router(question_routes, prefix="/v1/question", tags=["Search from AD
 app.include_router(filter_query, prefix="/classify", tags=["Classify User Query"])
 app.include_router(voice_routes, prefix="/voice" ,tags=["Voice system"])
 app.include_router(bot_query, prefix="/bot", tags=["Bot Response"])
+app.include_router(product_routes, prefix="/v1/products", tags=["Product Search"])
 
 ######### ---------------------------------OTHER Api for testing fonctionnality
 
 app.include_router(redis_routes, tags=["Redis Cache"])
+app.include_router(health_routes, prefix="/health", tags=["Health"])
 
 ######### ---------------------------------Log Managemnt
 
@@ -1,22 +1,30 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from fastapi.responses import StreamingResponse
-from app.services.streaming_generator_service import StreamingGenerator
 
-# Initialisation des services
+from app.config.settings import settings
+from app.container import get_streaming_generator, require_models
 from app.services.streaming_generator_service import StreamingGenerator
 
 router = APIRouter()
 
-streamer = StreamingGenerator()
 
-@router.get("/bot-query")
-async def stream_bot_query(query: str):
+# Modèles appelés par StreamingGenerator.generate_stream : détection de langue et embedding
+# du cache de réponses. La traduction et les sections de site_info.txt ont un repli
+# (requête d'origine, document complet) : attendues sans être exigées
+GENERATION_MODELS = ("embedding", "langid")
+SITE_MODELS = ("site_index",) if settings.SITE_RAG_ENABLED else ()
+GENERATION_OPTIONAL_MODELS = ("translation",) + SITE_MODELS
+
+
+@router.get("/bot-query", dependencies=[Depends(require_models(*GENERATION_MODELS, optional=GENERATION_OPTIONAL_MODELS))])
+async def stream_bot_query(query: str, streamer: StreamingGenerator = Depends(get_streaming_generator)):
     return StreamingResponse(
         streamer.generate_stream(query),
         media_type="text/event-stream",
         headers={
             "X-Stream-Source": "ollama-llama3",
-            "Cache-Control": "no-store"
+            "Cache-Control": "no-store",
+            "X-Accel-Buffering": "no"  # Pas de bufferisation proxy : chaque token part immédiatement
         }
     )
 
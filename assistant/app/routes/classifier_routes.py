@@ -1,13 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from app.container import get_classifier_service, require_models
 from app.services.classifier_service import ClassifierService 
 from app.config.logger import error_logger 
 router = APIRouter()
 
 
-# Initialisation du service de classification
-classifier_service = ClassifierService()
-@router.post("/classify-query")
-async def classify_query(request: str):
+@router.post("/classify-query", dependencies=[Depends(require_models("embedding", "classifier", "langid", optional=("translation",)))])
+async def classify_query(request: str, classifier_service: ClassifierService = Depends(get_classifier_service)):
     try:
         classification = await classifier_service.classify(request)
         return classification
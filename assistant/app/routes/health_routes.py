@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from ai.utils.model_loader import ModelLoader
+from app.config.settings import settings
+
+router = APIRouter()
+
+
+@router.get("/live")
+async def liveness():
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def readiness():
+    """
+    État de chargement de chaque modèle (pending, queued, loading, ready, failed) et durée
+    de chargement en secondes. 503 tant qu'un modèle préchargé n'est pas prêt.
+    """
+    models = ModelLoader.status()
+    ready = ModelLoader.is_ready(*(name for name in settings.MODEL_PRELOAD if name in models))
+    return JSONResponse(
+        content={"ready": ready, "models": models},
+        status_code=200 if ready else 503
+    )
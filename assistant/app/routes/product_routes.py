@@ -0,0 +1,43 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.schemas.product import ProductSearchRequest, ProductSearchResult
+from app.container import get_product_search_service, require_models
+from app.services.product_search_service import ProductSearchService
+from app.config.logger import error_logger
+
+router = APIRouter()
+SEARCH_MODELS = ("embedding", "product_index")
+
+
+@router.get("/search", response_model=ProductSearchResult, dependencies=[Depends(require_models(*SEARCH_MODELS))])
+async def search_products(
+    query: str = Query(..., min_length=1),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, ge=1, le=100),
+    product_search_service: ProductSearchService = Depends(get_product_search_service)
+):
+    """
+    Recherche sémantique des produits les plus proches d'une requête.
+    """
+    try:
+        results = await product_search_service.search([query], page, page_size)
+        return results[0]
+    except Exception as e:
+        error_logger.error(f"Erreur recherche produits: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Échec de la recherche produits")
+
+
+@router.post("/search", response_model=List[ProductSearchResult], dependencies=[Depends(require_models(*SEARCH_MODELS))])
+async def search_products_batch(
+    request: ProductSearchRequest,
+    product_search_service: ProductSearchService = Depends(get_product_search_service)
+):
+    """
+    Recherche groupée : toutes les requêtes sont encodées puis cherchées en un seul appel à l'index.
+    """
+    try:
+        return await product_search_service.search(request.queries, request.page, request.page_size)
+    except Exception as e:
+        error_logger.error(f"Erreur recherche produits: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Échec de la recherche produits")
@@ -1,30 +1,28 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from typing import List, Optional
 
 from app.schemas.history import History
 
 from app.enum.QueryType import QueryType
-from datetime import datetime
 
 
 
 # app/api/history_routes.py
+from app.container import get_history_service
 from app.services.history_service import HistoryService
-from app.utils.redis_manager import RedisManager
+from ai.utils.language_cache import language_cache
 
 router = APIRouter()
-redis_manager = RedisManager()
-history_service = HistoryService()
 
 @router.post("/history/save")
-async def save_history_endpoint(history_data: History):
+async def save_history_endpoint(history_data: History, history_service: HistoryService = Depends(get_history_service)):
     success = await history_service.update(history_data)
     return {"success": success}
 
 
 
 @router.get("/history",response_model=History,responses={200: {"description": "Historique récupéré avec succès"},404: {"description": "Session non trouvée"}})
-async def get_full_history():
+async def get_full_history(history_service: HistoryService = Depends(get_history_service)):
     """
     Récupère l'historique complet pour la session actuelle.
     Inclut les requêtes utilisateur, la langue, les filtres, etc.
@@ -38,34 +36,29 @@ async def get_full_history():
     return history
 
 @router.get("/last-queries",response_model=List[str])
-async def get_last_user_queries(limit: int = 5):
+async def get_last_user_queries(limit: int = 5, history_service: HistoryService = Depends(get_history_service)):
     """
     Récupère les dernières requêtes utilisateur de la session actuelle.
     Args:
-    - limit: Nombre maximum de requêtes à retourner (par défaut 5)
+    - limit: Nombre maximum de requêtes à retourner (par défaut 5, toutes si <= 0)
     """
-    history = await history_service.get()
-    if not history or not history.user_queries:
+    user_queries = await history_service.get_queries(limit if limit > 0 else None)
+    if not user_queries:
         raise HTTPException(
             status_code=404,
             detail="No user queries found for current session"
         )
-    return history.user_queries[-limit:]
+    return user_queries
 
 @router.post("/add-query",response_model=bool)
-async def add_user_query(query: str):
+async def add_user_query(query: str, history_service: HistoryService = Depends(get_history_service)):
     """
     Ajoute une nouvelle requête utilisateur à l'historique de la session actuelle.
     Args:
     - query: La requête textuelle à ajouter
     """
     try:
-        history = await history_service.get() or History(
-            session_id=redis_manager.session_id,
-            timestamp=datetime.now().isoformat()
-        )
-        history.user_queries.append(query)
-        return await history_service.update(history)
+        return await history_service.add_query(query)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -73,7 +66,7 @@ async def add_user_query(query: str):
         )
 
 @router.post("/save-context",response_model=bool)
-async def save_context(history: History):
+async def save_context(history: History, history_service: HistoryService = Depends(get_history_service)):
     """
     Sauvegarde ou met à jour le contexte complet de la session.
     
@@ -85,7 +78,7 @@ async def save_context(history: History):
     """
     try:
         # On s'assure que la session_id est toujours celle du manager
-        history.session_id = redis_manager.session_id
+        history.session_id = history_service.redis_manager.session_id
         return await history_service.update(history)
     except Exception as e:
         raise HTTPException(
@@ -96,7 +89,7 @@ async def save_context(history: History):
 
 
 @router.put("/update-query-type",response_model=bool)
-async def update_query_type(query_type: QueryType):
+async def update_query_type(query_type: QueryType, history_service: HistoryService = Depends(get_history_service)):
     """
     Met à jour le type de requête dans l'historique.
     """
@@ -109,7 +102,7 @@ async def update_query_type(query_type: QueryType):
         )
 
 @router.delete("/clear",response_model=bool)               
-async def clear_history():
+async def clear_history(history_service: HistoryService = Depends(get_history_service)):
     """
     Supprime tout l'historique associé à la session actuelle.
     """
@@ -119,4 +112,11 @@ async def clear_history():
         raise HTTPException(
             status_code=500,
             detail=f"Failed to clear history: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.get("/language/cache-stats")
+async def get_language_cache_stats():
+    """
+    Taux de succès du cache de détection de langue et de traduction (processus courant).
+    """
+    return language_cache.get_stats()
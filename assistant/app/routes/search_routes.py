@@ -1,5 +1,8 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 
+from ai.llm.errors import LLMStreamError
+from app.container import get_response_service, require_models
+from app.routes.chatBot_routes import SITE_MODELS
 from app.services.response_service import ResponseService 
 
 from app.config.logger import error_logger
@@ -9,19 +12,23 @@ from fastapi.responses import StreamingResponse
 # Initialiser le routeur
 router = APIRouter()
 
-# Services
-response_service = ResponseService()
+
+async def _guarded_stream(stream_generator):
+    """Flux texte brut : une coupure du LLM termine le flux par le message d'erreur, sans trace ASGI"""
+    try:
+        async for chunk in stream_generator:
+            yield chunk
+    except LLMStreamError as e:
+        error_logger.error(f"Flux /search/site interrompu : {str(e)}")
+        yield str(e)
 
 
-@router.post("/search/site")
-async def site_question_stream(request: str):
+@router.post("/search/site", dependencies=[Depends(require_models(optional=SITE_MODELS))])
+async def site_question_stream(request: str, response_service: ResponseService = Depends(get_response_service)):
     try:
-        stream_generator = await response_service._generate_site_response(
-            query=request,
-            stream=True
-        )
+        stream_generator = await response_service._generate_site_response(query=request)
         return StreamingResponse(
-            stream_generator,
+            _guarded_stream(stream_generator),
             media_type="text/event-stream"
         )
         
@@ -1,33 +1,78 @@
 # app/api/voice_router.py
-from fastapi import APIRouter, UploadFile, HTTPException
+from typing import Callable, Optional
+from fastapi import APIRouter, Depends, UploadFile, HTTPException, WebSocket, Request, Response
+from fastapi.routing import APIRoute
+from app.config.logger import error_logger
+from app.config.settings import settings
+from app.container import get_streaming_generator, get_voice_service, wait_for_models
+from app.routes.chatBot_routes import GENERATION_MODELS, GENERATION_OPTIONAL_MODELS
 from app.services.voice_service import VoiceService
+from app.services.voice_stream_service import VoiceStreamSession, build_decoder
 from app.schemas.voice import TranscriptionResponse
 from fastapi.responses import StreamingResponse
 from app.services.streaming_generator_service import StreamingGenerator
 
-router = APIRouter()
-voice_service = VoiceService()
-streamer = StreamingGenerator()
+# Marge pour l'enveloppe multipart (boundary, en-têtes de la partie) autour du fichier
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadLimitRoute(APIRoute):
+    """
+    Refuse (413) une requête dont le Content-Length dépasse VOICE_MAX_UPLOAD_BYTES
+    avant que Starlette ne lise le corps multipart et ne le copie dans un fichier
+    temporaire (SpooledTemporaryFile, sur disque au-delà de 1 Mo).
+    Sans Content-Length (chunked), read_upload applique la même limite à la lecture.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def limited_handler(request: Request) -> Response:
+            max_bytes = settings.VOICE_MAX_UPLOAD_BYTES
+            length = request.headers.get("content-length", "")
+            if length.isdigit() and int(length) > max_bytes + MULTIPART_OVERHEAD_BYTES:
+                error_logger.error(f"Upload audio refusé: Content-Length {length} octets")
+                raise HTTPException(status_code=413, detail=f"Fichier audio limité à {max_bytes // (1024 * 1024)} Mo")
+            return await handler(request)
+
+        return limited_handler
+
+
+router = APIRouter(route_class=UploadLimitRoute)
 
 @router.post("/transcribe", response_model=TranscriptionResponse)
-async def transcribe_audio(file: UploadFile):
+async def transcribe_audio(
+    file: UploadFile,
+    profile: Optional[str] = None,
+    voice_service: VoiceService = Depends(get_voice_service)
+):
     if not file.content_type.startswith("audio/"):
         raise HTTPException(status_code=400, detail="Un fichier audio est requis (.wav, .mp3, etc)")
     
     try:
-        return await voice_service.transcribe(file)
+        return await voice_service.transcribe(file, profile)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur de transcription: {str(e)}")
 
     
 @router.post("/bot_query")
-async def bot_query(file:UploadFile):
+async def bot_query(
+    file: UploadFile,
+    profile: Optional[str] = None,
+    voice_service: VoiceService = Depends(get_voice_service),
+    streamer: StreamingGenerator = Depends(get_streaming_generator)
+):
 
     if not file.content_type.startswith("audio/"):
         raise HTTPException(status_code=400, detail="Un fichier audio est requis (.wav, .mp3, etc)")
+    # Le modèle Whisper attendu est celui du profil demandé
+    whisper_profile = voice_service.get_profile(profile) if profile else voice_service.profile
+    await wait_for_models(voice_service.model_key(whisper_profile), *GENERATION_MODELS, optional=GENERATION_OPTIONAL_MODELS)
     
     try:
-        result = await voice_service.transcribe(file)
+        result = await voice_service.transcribe(file, profile)
 
         # Concaténer tous les textes des segments
         full_text = " ".join(segment["text"] for segment in result["segments"])
@@ -36,9 +81,45 @@ async def bot_query(file:UploadFile):
         streamer.generate_stream(full_text),
         media_type="text/event-stream"
     )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur de transcription: {str(e)}")
     
+@router.websocket("/stream")
+async def voice_stream(
+    websocket: WebSocket,
+    format: str = "pcm16",
+    sample_rate: Optional[int] = None,
+    language: Optional[str] = None,
+    profile: Optional[str] = None,
+    voice_service: VoiceService = Depends(get_voice_service),
+    streamer: StreamingGenerator = Depends(get_streaming_generator)
+):
+    """
+    Transcription en continu : audio binaire (pcm16 16 kHz par défaut, ou paquets opus),
+    transcriptions partielles à chaque pause, réponse du LLM dès la fin de l'énoncé.
+    """
+    await websocket.accept()
+    try:
+        decoder = build_decoder(format, sample_rate)
+        whisper_profile = voice_service.get_profile(profile) if profile else voice_service.profile
+        await wait_for_models(voice_service.model_key(whisper_profile), *GENERATION_MODELS, optional=GENERATION_OPTIONAL_MODELS)
+    except ValueError as e:
+        await websocket.close(code=1003, reason=str(e))
+        return
+    except HTTPException as e:
+        # 400 : profil inconnu ; 503 : modèle indisponible
+        await websocket.close(code=1011 if e.status_code == 503 else 1003, reason=e.detail)
+        return
+    await VoiceStreamSession(websocket, voice_service, streamer, decoder, language, whisper_profile).run()
+
+
 @router.get("/api/system/gpu-info")
-async def get_gpu_info():
+async def get_gpu_info(voice_service: VoiceService = Depends(get_voice_service)):
     return voice_service.get_device_info()
+
+
+@router.get("/metrics")
+async def get_transcription_metrics(voice_service: VoiceService = Depends(get_voice_service)):
+    return voice_service.pool.get_stats()
@@ -4,6 +4,6 @@ from typing import Optional
 
 class Classification(BaseModel):
     Type: QueryType
-    confidence: Optional[float] = Field(None, ge=0.5, le=1.0)
+    confidence: Optional[float] = Field(None, ge=0.0, le=1.0)
     
 
@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+class ProductSearchRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1, max_length=64)
+    page: int = Field(1, ge=1)
+    page_size: int = Field(10, ge=1, le=100)
+
+class ProductHit(BaseModel):
+    id: str
+    name: Optional[str] = None
+    description: Optional[str] = None
+    brand: Optional[str] = None
+    price: Optional[float] = None
+    discountPrice: Optional[float] = None
+    stock: Optional[int] = None
+    stockStatus: Optional[str] = None
+    mainImgUrl: Optional[str] = None
+    slug: Optional[str] = None
+    score: float
+
+class ProductSearchResult(BaseModel):
+    query: str
+    page: int
+    page_size: int
+    hits: List[ProductHit]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 class Segment(BaseModel):
     start: float
@@ -10,3 +10,4 @@ class TranscriptionResponse(BaseModel):
     language: str
     language_probability: float
     segments: List[Segment]
+    profile: Optional[str] = None
@@ -1,17 +1,28 @@
+import asyncio
+import json
+import re
 from pydantic import ValidationError
 from ai.llm.ollama_client import OllamaClient
 from app.schemas.classification import Classification
 from ai.prompts_template.classifier_prompt import ClassifierPromptTemplate
 from ai.utils.language_util import LanguageService
+from ai.utils.embedding_classifier import EmbeddingClassifier
 from app.config.logger import classifier_logger as logger
-from typing import Tuple
+from app.config.settings import settings
+from typing import Optional, Tuple
 from app.enum.QueryType import QueryType
 
 class ClassifierService:
-    def __init__(self):
-        self.template = ClassifierPromptTemplate()
-        self.language_util = LanguageService()
-        self.ollama_client = OllamaClient()
+    def __init__(self,
+                 template: Optional[ClassifierPromptTemplate] = None,
+                 language_service: Optional[LanguageService] = None,
+                 ollama_client: Optional[OllamaClient] = None,
+                 embedding_classifier: Optional[EmbeddingClassifier] = None):
+        self.template = template or ClassifierPromptTemplate()
+        self.language_util = language_service or LanguageService()
+        self.ollama_client = ollama_client or OllamaClient()
+        self.embedding_classifier = embedding_classifier or EmbeddingClassifier()
+        self.confidence_threshold = settings.CLASSIFIER_CONFIDENCE_THRESHOLD
 
     async def classify(self, query: str) -> Tuple[Classification, str]:
         try:
@@ -31,19 +42,23 @@ class ClassifierService:
             if query_type:
                 classification = Classification(Type=query_type, confidence=1.0)
                 return classification, "fr"
-            processed_query, lang = self.language_util.process_language(query)
+            processed_query, lang = await self.language_util.process_language(query)
+
+            # Classification locale par plus proches voisins (quelques ms)
+            query_type, confidence = await asyncio.to_thread(self.embedding_classifier.predict, processed_query)
+            classification = Classification(Type=query_type, confidence=confidence)
+            if confidence >= self.confidence_threshold:
+                return classification, lang
+
+            # Confiance insuffisante : arbitrage par le LLM
+            logger.info(f"Confiance kNN faible ({confidence:.2f}) - repli sur le LLM")
             prompt = await self.template.build_prompt(processed_query)
             response = await self._get_llm_response(prompt)
-            
-            try:
-                return response,lang
-            except ValidationError:
-                logger.warning("LLM returned invalid classification, using fallback")
-                return Classification(type=QueryType.OTHER, confidence=0.5), lang
+            return self._parse_llm_response(response) or classification, lang
                 
         except Exception as e:
             logger.error(f"Classification error: {str(e)}", exc_info=True)
-            return Classification(Type=QueryType.OTHER, confidence=0.1), "fr"
+            return Classification(Type=QueryType.OTHER, confidence=0.5), "fr"
 
     async def _get_llm_response(self, prompt: str) -> str: 
         """
@@ -51,4 +66,15 @@ class ClassifierService:
         """
         response = await self.ollama_client.generate_response(prompt, stream=False)
         return response['message']['content'] if isinstance(response, dict) else str(response)
-    
\ No newline at end of file
+
+    def _parse_llm_response(self, response: str) -> Optional[Classification]:
+        """Extrait le JSON {"Type": ..., "confidence": ...} de la réponse du LLM"""
+        match = re.search(r"\{.*?\}", response, re.DOTALL)
+        if not match:
+            logger.warning(f"Réponse LLM sans JSON: {response}")
+            return None
+        try:
+            return Classification(**json.loads(match.group(0)))
+        except (json.JSONDecodeError, ValidationError, TypeError):
+            logger.warning("LLM returned invalid classification, using kNN result")
+            return None
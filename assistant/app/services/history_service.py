@@ -1,18 +1,24 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator
+from contextlib import asynccontextmanager
 from datetime import datetime
 from app.schemas.history import History
 from app.enum.QueryType import QueryType
 from app.config.logger import error_logger
 from app.utils.redis_manager import RedisManager
+from app.config.settings import settings
 
 class HistoryService:
     """
     Service simplifié pour la gestion de l'historique dans Redis.
     Fournit une interface CRUD complète avec des méthodes spécifiques pour chaque champ.
+    Les champs scalaires sont stockés dans un hash, les requêtes dans une liste plafonnée.
     """
     
-    def __init__(self):
-        self.redis_manager = RedisManager()
+    def __init__(self, redis_manager: Optional[RedisManager] = None):
+        self.redis_manager = redis_manager or RedisManager()
+        self.max_queries = settings.HISTORY_MAX_QUERIES
+        # L'ancien blob JSON n'est cherché qu'avant la première écriture partielle
+        self._legacy_checked = False
 
     
     async def create(self) -> History:
@@ -24,25 +30,68 @@ class HistoryService:
         await self.update(new_history)
         return new_history
     
-    async def get(self) -> History:
+    async def get(self, query_limit: Optional[int] = None) -> History:
         """
-        Récupère l'historique complet depuis Redis.
+        Récupère l'historique depuis Redis (les `query_limit` dernières requêtes seulement si précisé).
         Crée un nouvel historique s'il n'existe pas.
         """
         try:
-            history_data = await self.redis_manager.get_data()
-            if history_data:
-                return self._deserialize(history_data)
+            history = await self._load(query_limit)
+            if history is not None:
+                return history
             return await self.create()
         except Exception as e:
             error_logger.error(f"Error getting history: {str(e)}", exc_info=True)
             return await self.create()
     
+    @asynccontextmanager
+    async def session(self, query_limit: Optional[int] = None) -> AsyncIterator[History]:
+        """
+        Unité de travail : charge l'historique une seule fois, laisse l'appelant
+        modifier les champs et ajouter des requêtes, puis écrit le tout en un seul
+        aller-retour Redis. Rien n'est écrit si le bloc lève une exception.
+        Seuls les ajouts en fin de `user_queries` sont persistés.
+        Si Redis est indisponible, l'appelant travaille sur un historique vide.
+        """
+        try:
+            history = await self._load(query_limit) or self._new_history()
+        except Exception as e:
+            error_logger.error(f"Error loading history: {str(e)}", exc_info=True)
+            history = self._new_history()
+        loaded_count = len(history.user_queries or [])
+        yield history
+        new_queries = (history.user_queries or [])[loaded_count:]
+        await self._save(history, new_queries)
+
+    async def update_fields(self, **fields: Any) -> bool:
+        """
+        Met à jour plusieurs champs en une seule écriture, sans lecture préalable
+        (hormis la migration de l'ancien blob JSON, vérifiée une seule fois).
+        `query` ajoute une requête utilisateur, les autres clés sont des champs de History.
+        """
+        if not self._legacy_checked:
+            try:
+                await self._migrate_legacy(query_limit=0)
+                self._legacy_checked = True
+            except Exception as e:
+                error_logger.error(f"Error migrating legacy history: {str(e)}", exc_info=True)
+                return False
+        query = fields.pop("query", None)
+        history = History(session_id=self.redis_manager.session_id)
+        for field, value in fields.items():
+            setattr(history, field, value)
+        return await self._save(history, [query] if query is not None else [], only=set(fields))
+
     async def update(self, history: History) -> bool:
-        """Met à jour l'historique complet dans Redis"""
+        """Remplace l'historique complet dans Redis"""
         try:
             history.timestamp = datetime.now().isoformat()
-            return await self.redis_manager.save_data(self._serialize(history))
+            return await self.redis_manager.save_history(
+                self._serialize(history),
+                (history.user_queries or [])[-self.max_queries:],
+                replace=True,
+                max_queries=self.max_queries
+            )
         except Exception as e:
             error_logger.error(f"Error updating history: {str(e)}", exc_info=True)
             return False
@@ -62,15 +111,11 @@ class HistoryService:
     # -- Gestion des requêtes utilisateur --
     async def add_query(self, query: str) -> bool:
         """Ajoute une requête à l'historique"""
-        history = await self.get()
-        if not history.user_queries:
-            history.user_queries = []
-        history.user_queries.append(query)
-        return await self.update(history)
+        return await self.update_fields(query=query)
     
-    async def get_queries(self) -> List[str]:
-        """Récupère toutes les requêtes"""
-        return (await self.get()).user_queries or []
+    async def get_queries(self, limit: Optional[int] = None) -> List[str]:
+        """Récupère les `limit` dernières requêtes (toutes par défaut)"""
+        return (await self.get(query_limit=limit)).user_queries or []
     
     async def clear_queries(self) -> bool:
         """Efface toutes les requêtes"""
@@ -81,47 +126,77 @@ class HistoryService:
     # -- Gestion du type de requête --
     async def set_query_type(self, query_type: QueryType) -> bool:
         """Définit le type de requête"""
-        history = await self.get()
-        history.query_type = query_type
-        return await self.update(history)
+        return await self.update_fields(query_type=query_type)
     
     async def get_query_type(self) -> Optional[QueryType]:
         """Récupère le type de requête"""
-        return (await self.get()).query_type
+        return (await self.get(query_limit=0)).query_type
     
     # -- Gestion de la langue --
     async def set_language(self, lang: str) -> bool:
         """Définit la langue"""
-        history = await self.get()
-        history.lang = lang
-        return await self.update(history)
+        return await self.update_fields(lang=lang)
     
     async def get_language(self) -> Optional[str]:
         """Récupère la langue"""
-        return (await self.get()).lang
+        return (await self.get(query_limit=0)).lang
     
     # --------------------------------------------------------------------------
     # Méthodes utilitaires
     # --------------------------------------------------------------------------
     
-    def _serialize(self, history: History) -> Dict[str, Any]:
-        """Sérialise l'objet History pour Redis"""
+    async def _load(self, query_limit: Optional[int] = None) -> Optional[History]:
+        """Lit l'historique sans écriture ; None s'il n'existe pas"""
+        fields, queries = await self.redis_manager.load_history(query_limit)
+        if fields:
+            return self._deserialize({**fields, "user_queries": queries})
+        return await self._migrate_legacy(query_limit)
+
+    async def _migrate_legacy(self, query_limit: Optional[int] = None) -> Optional[History]:
+        """Convertit un ancien blob JSON `session:*:history` vers le hash + liste"""
+        legacy_data = await self.redis_manager.get_data()
+        if not legacy_data:
+            return None
+        history = self._deserialize(legacy_data)
+        await self.update(history)
+        if query_limit is not None:
+            history.user_queries = history.user_queries[-query_limit:] if query_limit else []
+        return history
+
+    async def _save(self, history: History, new_queries: List[str], only: Optional[set] = None) -> bool:
+        """Écrit les champs scalaires (tous, ou seulement `only`) et ajoute les nouvelles requêtes"""
+        try:
+            history.timestamp = datetime.now().isoformat()
+            fields = self._serialize(history)
+            if only is not None:
+                fields = {k: v for k, v in fields.items() if k in only or k in ("timestamp", "session_id")}
+            return await self.redis_manager.save_history(fields, new_queries, max_queries=self.max_queries)
+        except Exception as e:
+            error_logger.error(f"Error saving history: {str(e)}", exc_info=True)
+            return False
+
+    def _new_history(self) -> History:
+        return History(
+            session_id=self.redis_manager.session_id,
+            timestamp=datetime.now().isoformat(),
+            user_queries=[]
+        )
+
+    def _serialize(self, history: History) -> Dict[str, str]:
+        """Sérialise les champs scalaires de History pour le hash Redis (None -> "")"""
         return {
-            "timestamp": history.timestamp,
-            "session_id": history.session_id,
-            "query_type": history.query_type.value if history.query_type else None,
-            "lang": history.lang,
-            "user_queries": history.user_queries or []
+            "timestamp": history.timestamp or "",
+            "session_id": history.session_id or "",
+            "query_type": history.query_type.value if history.query_type else "",
+            "lang": history.lang or ""
         }
     
     def _deserialize(self, data: Dict[str, Any]) -> History:
-        """Désérialise les données Redis en objet History"""
+        """Désérialise les données Redis (hash ou ancien blob JSON) en objet History"""
         return History(
-            timestamp=data.get("timestamp"),
-            session_id=data.get("session_id"),
+            timestamp=data.get("timestamp") or None,
+            session_id=data.get("session_id") or None,
             query_type=QueryType(data["query_type"]) if data.get("query_type") else None,
-            product_filters=ProductFilters(**data["product_filters"]) if data.get("product_filters") else None,
-            lang=data.get("lang"),
-            user_queries=data.get("user_queries", []),
-          
+            lang=data.get("lang") or None,
+            user_queries=data.get("user_queries") or [],
         )
\ No newline at end of file
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+from typing import List, Optional, Tuple
+
+import faiss
+import numpy as np
+import pyarrow as pa
+
+from ai.preparation.storage import ProductStore
+from ai.utils.model_loader import ModelLoader
+from app.config.logger import search_logger as logger
+from app.config.settings import settings
+from app.schemas.product import ProductHit, ProductSearchResult
+
+
+class ProductSearchService:
+    """
+    Recherche sémantique de produits sur l'index FAISS construit par RAGPipeline.
+    L'index et les métadonnées sont ouverts une seule fois par processus, en mmap.
+    """
+    _index: Optional[faiss.Index] = None
+    _products: Optional[pa.Table] = None
+    _version: Optional[float] = None
+    _lock = threading.Lock()
+
+    # Colonnes renvoyées au client (le texte et l'embedding restent côté serveur)
+    result_columns = ["id", "name", "description", "brand", "price", "discountPrice", "stock", "stockStatus", "mainImgUrl", "slug"]
+
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+        self.model_name = model_name
+
+    @classmethod
+    def load(cls, index_dir: Optional[str] = None):
+        """
+        Ouvre l'index FAISS et les métadonnées produits.
+        Rouvre automatiquement si une synchronisation a publié une nouvelle version.
+        """
+        store = ProductStore(index_dir or settings.PRODUCT_INDEX_DIR)
+        version = store.index_version()
+        if cls._index is not None and version == cls._version:
+            return
+        with cls._lock:
+            if cls._index is not None and version == cls._version:
+                return
+            while True:
+                index = store.load_index(mmap=settings.PRODUCT_INDEX_MMAP)
+                products = store.load_metadata(cls.result_columns)
+                # Publication pendant la lecture : on relit pour ne pas mélanger deux versions
+                latest = store.index_version()
+                if latest == version:
+                    break
+                version = latest
+            # L'index et les métadonnées sont remplacés ensemble, jamais l'un sans l'autre
+            cls._index, cls._products, cls._version = index, products, version
+        logger.info(f"Index produits chargé - {index.ntotal} vecteurs, dimension {index.d}")
+
+    @classmethod
+    def current(cls) -> Tuple[faiss.Index, pa.Table]:
+        """Index et métadonnées d'une même version"""
+        with cls._lock:
+            return cls._index, cls._products
+
+    async def search(self, queries: List[str], page: int = 1, page_size: int = 10) -> List[ProductSearchResult]:
+        """Recherche les produits de plusieurs requêtes en un seul appel FAISS"""
+        return await asyncio.to_thread(self._search, queries, page, page_size)
+
+    def _search(self, queries: List[str], page: int, page_size: int) -> List[ProductSearchResult]:
+        self.load()
+        index, products = self.current()
+        offset = (page - 1) * page_size
+        k = min(offset + page_size, index.ntotal)
+
+        model = ModelLoader.get_model(self.model_name)
+        embeddings = np.asarray(model.encode(queries, normalize_embeddings=True), dtype="float32")
+        distances, ids = index.search(embeddings, k)
+
+        results = []
+        for query, row_distances, row_ids in zip(queries, distances, ids):
+            valid = row_ids[offset:k] != -1
+            page_ids, page_distances = row_ids[offset:k][valid], row_distances[offset:k][valid]
+            # Seules les lignes de la page sont matérialisées depuis la table Arrow
+            rows = products.take(pa.array(page_ids)).to_pylist()
+            hits = [
+                ProductHit(**row, score=self._to_similarity(index, d))
+                for row, d in zip(rows, page_distances)
+            ]
+            results.append(ProductSearchResult(query=query, page=page, page_size=page_size, hits=hits))
+        return results
+
+    @staticmethod
+    def _to_similarity(index: faiss.Index, distance: float) -> float:
+        """Score cosinus : distance L2² entre vecteurs normalisés -> 1 - d/2, produit scalaire inchangé"""
+        if index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            return float(distance)
+        return float(1.0 - distance / 2.0)
@@ -2,8 +2,9 @@
 from ai.prompts_template.generale_prompt import GeneralDiscussionTemplate
 from app.config.logger import  error_logger
 import re
-import asyncio
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Dict, List, Optional
+from app.schemas.history import History
+from ai.llm.errors import LLMStreamError
 from ai.llm.ollama_client import OllamaClient
 from ai.prompts_template.adv_platform_prompt import ADVPlatformTemplate
 
@@ -11,42 +12,49 @@ class ResponseService:
     """Service responsable de la génération des réponses avec llm.
     - Few-shot pour les requêtes sur le site
     """
-    def __init__(self):
-        """Initialise les templates et le modèle LLM"""
-        self.adv_template = ADVPlatformTemplate()
-        self.general_template = GeneralDiscussionTemplate()
-        self.ollama_client = OllamaClient()
+    def __init__(self,
+                 adv_template: Optional[ADVPlatformTemplate] = None,
+                 general_template: Optional[GeneralDiscussionTemplate] = None,
+                 ollama_client: Optional[OllamaClient] = None):
+        """Initialise les templates et le modèle LLM (instances partagées du conteneur si fournies)"""
+        self.adv_template = adv_template or ADVPlatformTemplate()
+        self.general_template = general_template or GeneralDiscussionTemplate()
+        self.ollama_client = ollama_client or OllamaClient()
     
-    async def _generate_site_response(self, query: str):
+    async def _generate_site_response(self, query: str, history: Optional[History] = None):
       
-        prompt = await self.adv_template.build_prompt(query)
+        messages = await self.adv_template.build_messages(query, history=history)
 
-        return await self._handle_generation(prompt, True)
+        return await self._handle_generation(messages, True)
       
-    async def _generate_general_response(self,query :str) -> AsyncGenerator[str, None]:
+    async def _generate_general_response(self,query :str, history: Optional[History] = None) -> AsyncGenerator[str, None]:
         """
         Génère une réponse générale pour les requêtes inconnues
         """
-        prompt = await self.general_template.build_prompt(query)
-        return  await self._handle_generation(prompt, True)
+        messages = await self.general_template.build_messages(query, history=history)
+        return  await self._handle_generation(messages, True)
 
-    async def _handle_generation(self, prompt: str, stream: bool) -> AsyncGenerator[str, None]:
-        """Gère la génération de réponse avec streaming"""
+    async def _handle_generation(self, messages: List[Dict[str, str]], stream: bool) -> AsyncGenerator[str, None]:
+        """
+        Gère la génération de réponse avec streaming.
+        Passe par /api/chat : le message système fixe reste en cache côté Ollama
+        """
         
         if stream:
             async def generate():
                 try:
-                    response_gen = await self.ollama_client.generate_response( prompt, stream)
+                    response_gen = await self.ollama_client.generate_with_context(messages, stream)
                     async for chunk in response_gen:
                         yield chunk
-                        await asyncio.sleep(0.01)
+                except LLMStreamError:
+                    raise
                 except Exception as e:
                     error_logger.error(f"Erreur streaming: {str(e)}", exc_info=True)
-                    yield "Erreur de service"
+                    raise LLMStreamError("Erreur de service") from e
             return generate()
         else:
             try:
-                response = await self.ollama_client.generate_response(prompt, stream)
+                response = await self.ollama_client.generate_with_context(messages, stream)
                 content = response.get('message', {}).get('content', '')
                 cleaned = self._clean_response(content) if content else "Aucune réponse générée"
                 return cleaned
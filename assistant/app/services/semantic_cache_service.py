@@ -0,0 +1,132 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ai.utils.model_loader import ModelLoader
+from app.config.logger import app_logger as logger
+from app.config.settings import settings
+from app.enum.QueryType import QueryType
+
+
+@dataclass
+class CachedResponse:
+    embedding: np.ndarray
+    events: List[str]
+    created_at: float
+
+
+class SemanticResponseCache:
+    """
+    Cache de réponses indexé par l'embedding de la requête (MiniLM).
+    Une requête proche d'une question déjà posée (même langue, même type)
+    rejoue la réponse enregistrée au lieu de relancer une génération LLM.
+    - TTL et éviction LRU par bucket (langue, type de requête)
+    - Invalidation complète si site_info.txt change
+    """
+
+    def __init__(self,
+                 model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+                 site_info_path: str = "ai/data/adv/site_info.txt"):
+        self.model_name = model_name
+        self.site_info_path = Path(site_info_path)
+        self.enabled = settings.SEMANTIC_CACHE_ENABLED
+        self.threshold = settings.SEMANTIC_CACHE_THRESHOLD
+        self.ttl = settings.SEMANTIC_CACHE_TTL
+        self.max_entries = settings.SEMANTIC_CACHE_MAX_ENTRIES
+        # Les réponses OTHER dépendent de l'historique : seules les questions plateforme sont mises en cache
+        self.cacheable_types = {QueryType.PLATFORM_INFO}
+
+        self._buckets: Dict[Tuple[str, QueryType], "OrderedDict[str, CachedResponse]"] = {}
+        self._matrices: Dict[Tuple[str, QueryType], Tuple[List[str], np.ndarray]] = {}
+        self._site_info_version = self._get_site_info_version()
+
+    def is_cacheable(self, query_type: QueryType) -> bool:
+        return self.enabled and query_type in self.cacheable_types
+
+    async def embed(self, query: str) -> np.ndarray:
+        """Calcule l'embedding normalisé de la requête hors de la boucle d'événements"""
+        model = ModelLoader.get_model(self.model_name)
+        embedding = await asyncio.to_thread(model.encode, query, normalize_embeddings=True)
+        return np.asarray(embedding, dtype="float32")
+
+    def lookup(self, embedding: np.ndarray, lang: str, query_type: QueryType) -> Optional[List[str]]:
+        """Renvoie les évènements SSE d'une réponse similaire, ou None"""
+        self._check_site_info()
+        key = (lang, query_type)
+        bucket = self._buckets.get(key)
+        if not bucket:
+            return None
+
+        self._evict_expired(key)
+        if not bucket:
+            return None
+
+        ids, matrix = self._get_matrix(key)
+        scores = matrix @ embedding
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+
+        entry_id = ids[best]
+        bucket.move_to_end(entry_id)
+        logger.info(f"Cache sémantique HIT (similarité {scores[best]:.3f}) - {lang}/{query_type.value}")
+        return bucket[entry_id].events
+
+    def store(self, embedding: np.ndarray, lang: str, query_type: QueryType, query: str, events: List[str]):
+        """Enregistre la réponse complète d'une requête"""
+        if not events:
+            return
+        key = (lang, query_type)
+        bucket = self._buckets.setdefault(key, OrderedDict())
+        bucket[query] = CachedResponse(embedding=embedding, events=list(events), created_at=time.monotonic())
+        bucket.move_to_end(query)
+        while len(bucket) > self.max_entries:
+            bucket.popitem(last=False)
+        self._matrices.pop(key, None)
+
+    def clear(self):
+        self._buckets.clear()
+        self._matrices.clear()
+
+    # --------------------------------------------------------------------------
+    # Méthodes utilitaires
+    # --------------------------------------------------------------------------
+
+    def _get_matrix(self, key: Tuple[str, QueryType]) -> Tuple[List[str], np.ndarray]:
+        """Matrice des embeddings du bucket, reconstruite seulement après modification"""
+        if key not in self._matrices:
+            bucket = self._buckets[key]
+            ids = list(bucket.keys())
+            self._matrices[key] = (ids, np.vstack([bucket[i].embedding for i in ids]))
+        return self._matrices[key]
+
+    def _evict_expired(self, key: Tuple[str, QueryType]):
+        bucket = self._buckets[key]
+        now = time.monotonic()
+        expired = [i for i, entry in bucket.items() if now - entry.created_at > self.ttl]
+        for entry_id in expired:
+            del bucket[entry_id]
+        if expired:
+            self._matrices.pop(key, None)
+
+    def _get_site_info_version(self) -> Optional[Tuple[float, int]]:
+        try:
+            stat = self.site_info_path.stat()
+            return stat.st_mtime, stat.st_size
+        except OSError:
+            return None
+
+    def _check_site_info(self):
+        version = self._get_site_info_version()
+        if version != self._site_info_version:
+            logger.info("site_info.txt modifié - invalidation du cache sémantique")
+            self._site_info_version = version
+            self.clear()
+
+
+response_cache = SemanticResponseCache()
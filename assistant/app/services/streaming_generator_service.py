@@ -1,20 +1,43 @@
 # streaming_generator.py - Version avec interface simplifiée
-from typing import AsyncGenerator
+from dataclasses import dataclass
+from typing import AsyncGenerator, Optional
+
+import numpy as np
+
+from app.schemas.history import History
 from app.services.classifier_service import ClassifierService
 from app.services.response_service import ResponseService
 from app.enum.QueryType import QueryType
 from app.config.logger import error_logger, app_logger as logger
+from app.config.settings import settings
 
 from app.services.history_service import HistoryService
+from ai.llm.errors import LLMStreamError
 from ai.utils.language_util import LanguageService
+from app.services.semantic_cache_service import response_cache
+
+@dataclass
+class PreparedQuery:
+    """Étapes sans effet de bord d'une requête (langue, traduction, embedding du cache)"""
+    query: str
+    processed_query: str
+    lang: str
+    query_type: QueryType
+    embedding: Optional[np.ndarray] = None
+
 
 class StreamingGenerator:
-    def __init__(self):
-        self.history_service = HistoryService()
+    def __init__(self,
+                 history_service: Optional[HistoryService] = None,
+                 classifier: Optional[ClassifierService] = None,
+                 response: Optional[ResponseService] = None,
+                 language_service: Optional[LanguageService] = None):
+        self.history_service = history_service or HistoryService()
         self._init_query_handlers()
-        self.classifier = ClassifierService()
-        self.response = ResponseService()
-        self.language_util = LanguageService()
+        self.classifier = classifier or ClassifierService()
+        self.response = response or ResponseService()
+        self.language_util = language_service or LanguageService()
+        self.response_cache = response_cache
 
     def _init_query_handlers(self):
         """Initialise les gestionnaires de requêtes."""
@@ -23,52 +46,92 @@ class StreamingGenerator:
             QueryType.OTHER: self._handle_unknown_query,
         }
 
-    async def generate_stream(self, query: str) -> AsyncGenerator[str, None]:
+    async def prepare(self, query: str) -> PreparedQuery:
+        """
+        Prépare la requête sans rien écrire (ni historique ni cache) : peut être
+        lancé à l'avance, par exemple sur une transcription vocale pas encore terminée.
+        """
+        queryType = QueryType.PLATFORM_INFO
+        processed_query, lang = await self.language_util.process_language(query)
+        embedding = None
+        if self.response_cache.is_cacheable(queryType):
+            embedding = await self.response_cache.embed(processed_query)
+        return PreparedQuery(query, processed_query, lang, queryType, embedding)
+
+    async def generate_stream(self, query: str, prepared: Optional[PreparedQuery] = None) -> AsyncGenerator[str, None]:
         """Génère un flux SSE pour la requête avec sauvegarde simplifiée"""
         try:
-            
-            queryType = QueryType.PLATFORM_INFO
-            processed_query, lang = self.language_util.process_language(query) 
+            if prepared is None or prepared.query != query:
+                prepared = await self.prepare(query)
+            processed_query, lang, queryType = prepared.processed_query, prepared.lang, prepared.query_type
 
-            await self.history_service.add_query(processed_query)
-            await self.history_service.set_language(lang)
-            await self.history_service.set_query_type(queryType)
+            # Une seule lecture et une seule écriture Redis pour toute la requête
+            async with self.history_service.session(query_limit=settings.HISTORY_PROMPT_QUERIES) as history:
+                history.user_queries = (history.user_queries or []) + [processed_query]
+                history.lang = lang
+                history.query_type = queryType
             
+            # Réponse déjà générée pour une question similaire
+            embedding = prepared.embedding
+            if embedding is not None:
+                cached_events = self.response_cache.lookup(embedding, lang, queryType)
+                if cached_events:
+                    for event in cached_events:
+                        yield event
+                    return
+
             # Sélection du handler approprié
             handler = self.query_handlers.get(queryType, self._handle_unknown_query)
 
             # Streaming de la réponse
-            async for chunk in handler(processed_query):
+            events = []
+            async for chunk in handler(processed_query, history):
+                events.append(chunk)
                 yield chunk
+
+            if embedding is not None and self._is_complete_response(events):
+                self.response_cache.store(embedding, lang, queryType, processed_query, events)
                 
         except Exception as e:
             logger.error(f"Erreur système: {str(e)}", exc_info=True)
             yield self._format_event("Erreur de traitement", "error")
 
 
-    async def _platform_handler(self, query: str) -> AsyncGenerator[str, None]:
+    async def _platform_handler(self, query: str, history: Optional[History] = None) -> AsyncGenerator[str, None]:
         """Gestion des requêtes de plateforme."""
         try:
             logger.info(f"Recherche de site pour la requête: {query}")
-            response_gen = await self.response._generate_site_response(query)
+            response_gen = await self.response._generate_site_response(query, history)
             async for chunk in response_gen:
                 yield self._format_event(chunk)
+        except LLMStreamError as e:
+            # Réponse interrompue : signalée par un évènement error, jamais mise en cache
+            yield self._format_event(str(e), "error")
         except Exception as e:
             error_logger.error(f"Platform handler error: {str(e)}")
             yield self._format_event("Erreur lors du traitement", "error")
 
-    async def _handle_unknown_query(self, query: str) -> AsyncGenerator[str, None]:
+    async def _handle_unknown_query(self, query: str, history: Optional[History] = None) -> AsyncGenerator[str, None]:
         """Gestion des requêtes inconnues."""
         try:
             logger.info(f"Classification de la requête: {query}")
-            response_gen = await self.response._generate_general_response(query) 
+            response_gen = await self.response._generate_general_response(query, history)
             async for chunk in response_gen:
                 yield self._format_event(chunk)
+        except LLMStreamError as e:
+            yield self._format_event(str(e), "error")
         except Exception as e:
             error_logger.error(f"Error in unknown query handler: {str(e)}")
             yield self._format_event("Erreur lors du traitement", "error")
 
 
+    def _is_complete_response(self, events: list) -> bool:
+        """
+        Une réponse en erreur ne doit jamais être rejouée depuis le cache : les clients
+        LLM signalent toute interruption (LLMStreamError), convertie en évènement error.
+        """
+        return bool(events) and not any(event.startswith("event: error") for event in events)
+
     def _format_event(self, data: str, event_type: str = "message") -> str:
         return f"event: {event_type}\ndata: {data}\n\n"
 
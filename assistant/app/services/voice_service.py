@@ -1,57 +1,119 @@
 from fastapi import UploadFile, HTTPException
 from faster_whisper import WhisperModel
+from faster_whisper.audio import decode_audio
+import asyncio
+import io
 import torch
-import os
 import uuid
 
-from pathlib import Path
-from typing import Dict, Any
+import numpy as np
+from dataclasses import asdict, dataclass
+from typing import Dict, Any, Optional
 from app.schemas.voice import Segment, TranscriptionResponse
-from app.config.logger import voice_logger, error_logger,models_logger
+from ai.utils.model_loader import ModelLoader
+from ai.utils.whisper_pool import TranscriptionQueueFull, WhisperPool
+from app.config.logger import voice_logger, error_logger
+from app.config.settings import settings
+
+@dataclass(frozen=True)
+class WhisperProfile:
+    """Profil de transcription : modèle, quantification et paramètres de décodage"""
+    name: str
+    model_size: str
+    cpu_compute_type: str
+    gpu_compute_type: str
+    beam_size: int
+    vad_filter: bool
+
+    def compute_type(self, cuda_available: bool) -> str:
+        return self.gpu_compute_type if cuda_available else self.cpu_compute_type
+
+    def transcribe_params(self) -> Dict[str, Any]:
+        return {"beam_size": self.beam_size, "vad_filter": self.vad_filter}
+
+
+WHISPER_PROFILES: Dict[str, WhisperProfile] = {
+    # int8 : ~2-4x plus rapide que float32 sur CPU ; VAD : les silences ne sont pas décodés
+    "fast-cpu": WhisperProfile("fast-cpu", "small", "int8", "int8_float16", beam_size=1, vad_filter=True),
+    "accurate": WhisperProfile("accurate", "small", "float32", "float16", beam_size=5, vad_filter=False),
+}
+
 
 class VoiceService:
-    def __init__(self, model_size: str = "small", compute_type: str = "float16"):
-        """Initialize the VoiceService with the specified model configuration.
+    MODEL_KEY = "whisper"
+
+    def __init__(self, profile: Optional[str] = None):
+        """Initialize the VoiceService with the specified transcription profile.
         Args:
-            model_size (str): Size of the model to use ("small", "base", "large", etc.)
-            compute_type (str): Numerical precision to use ("float16", "float32", etc.)
+            profile (str): Default profile ("fast-cpu", "accurate"), WHISPER_PROFILE if omitted
         """
         # Configuration optimisée
         self.cuda_available = torch.cuda.is_available()
-        self.compute_type = compute_type if self.cuda_available else "float32"
         self.device_name = "cuda" if self.cuda_available else "cpu"
         self.torch_device = torch.device(self.device_name)
+        self.profile = self.get_profile(profile or settings.WHISPER_PROFILE)
 
-        # Optimisation du choix du modèle
-        self.model_size = model_size
-        if not self.cuda_available and model_size == "small":
-            models_logger.warning("GPU non détecté - Downgrade automatique au modèle 'base'")
-            self.model_size = "base"
-                
-        voice_logger.info(f"Initialisation VoiceService - Modèle: {self.model_size}, Dispositif: {self.device_name}")
+        voice_logger.info(
+            f"Initialisation VoiceService - Profil: {self.profile.name}, Modèle: {self.profile.model_size}, "
+            f"Dispositif: {self.device_name}, Précision: {self.profile.compute_type(self.cuda_available)}"
+        )
         
-        # Préparation du répertoire temporaire
-        self.temp_dir = Path("data/audio")
-        self.temp_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Chargement du modèle avec les bons types de paramètres
+        # Transcriptions exécutées dans un pool de threads dédié, jamais sur la boucle d'événements
+        self.pool = WhisperPool(workers=settings.WHISPER_WORKERS, max_queue=settings.WHISPER_MAX_QUEUE)
+        self.cpu_threads = settings.WHISPER_CPU_THREADS or WhisperPool.cpu_threads_per_worker(self.pool.workers)
+
+        # Un modèle par couple (taille, précision), chargé à la première transcription du profil ;
+        # celui du profil par défaut ("whisper") est préchargé par le lifespan
+        for whisper_profile in WHISPER_PROFILES.values():
+            ModelLoader.register(self.model_key(whisper_profile), lambda p=whisper_profile: self.load_model(p))
+
+    @staticmethod
+    def get_profile(name: str) -> WhisperProfile:
+        if name not in WHISPER_PROFILES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Profil de transcription inconnu: {name} ({', '.join(WHISPER_PROFILES)})"
+            )
+        return WHISPER_PROFILES[name]
+
+    def model_key(self, profile: WhisperProfile) -> str:
+        """Nom du modèle dans ModelLoader ; les profils de même taille et précision le partagent"""
+        spec = (profile.model_size, profile.compute_type(self.cuda_available))
+        if spec == (self.profile.model_size, self.profile.compute_type(self.cuda_available)):
+            return self.MODEL_KEY
+        return f"{self.MODEL_KEY}:{spec[0]}:{spec[1]}"
+
+    def load_model(self, profile: WhisperProfile) -> WhisperModel:
+        """Charge le modèle Whisper d'un profil (appelé une seule fois par ModelLoader)"""
+        compute_type = profile.compute_type(self.cuda_available)
         try:
             # Utilisation de la chaîne de caractères pour device au lieu de l'objet torch.device
-            self.model = WhisperModel(
-                self.model_size, 
+            model = WhisperModel(
+                profile.model_size, 
                 device=self.device_name,  # Chaîne de caractères ("cuda" ou "cpu")
-                compute_type=self.compute_type
+                compute_type=compute_type,
+                cpu_threads=self.cpu_threads,
+                num_workers=self.pool.workers  # une réplique par thread du pool
+            )
+            voice_logger.info(
+                f"Modèle Whisper {profile.model_size} ({compute_type}) chargé avec succès - "
+                f"{self.pool.workers} répliques x {self.cpu_threads} threads"
             )
-            voice_logger.info("Modèle Whisper chargé avec succès")
+            return model
         except Exception as e:
             error_logger.error(f"Erreur chargement modèle: {str(e)}", exc_info=True)
             raise RuntimeError(f"Erreur initialisation modèle: {str(e)}") from e
 
-    async def transcribe(self, file: UploadFile, **kwargs) -> Dict[str, Any]:
+    @property
+    def model(self) -> WhisperModel:
+        return ModelLoader.get(self.MODEL_KEY)
+
+    async def transcribe(self, file: UploadFile, profile: Optional[str] = None, **kwargs) -> Dict[str, Any]:
         """Transcribe an audio file using the Whisper model.
         
         Args:
             file (UploadFile): The audio file to transcribe
+            profile (str): Transcription profile, the service default if omitted
             **kwargs: Additional parameters for the transcription model
             
         Returns:
@@ -61,36 +123,16 @@ class VoiceService:
             HTTPException: If any error occurs during transcription
         """
         transaction_id = uuid.uuid4().hex[:8]
-        voice_logger.info(f"[{transaction_id}] Début transcription - Fichier: {file.filename}")
+        whisper_profile = self.get_profile(profile) if profile else self.profile
+        voice_logger.info(f"[{transaction_id}] Début transcription - Fichier: {file.filename}, Profil: {whisper_profile.name}")
         
-        temp_file_path = None
         try:
-            # Validation du fichier
-            file_bytes = await file.read()
-            if not file_bytes:
-                error_logger.error(f"[{transaction_id}] Fichier audio vide")
-                raise HTTPException(status_code=400, detail="Fichier audio vide")
-            
-            # Création du fichier temporaire
-            temp_file_name = f"{uuid.uuid4()}.wav"
-            temp_file_path = self.temp_dir / temp_file_name
-                
-            with open(temp_file_path, "wb") as f:
-                f.write(file_bytes)
-            
-            # Configuration des paramètres de transcription
-            params = {
-                "beam_size": 5,
-                "language": None,
-                "task": "transcribe",
-                "initial_prompt": None
-            }
-            params.update(kwargs)
+            # Le corps multipart est déjà mis en tampon par Starlette (sur disque au-delà de 1 Mo) ;
+            # ici : copie plafonnée en mémoire puis décodage sans fichier temporaire supplémentaire
+            file_bytes = await self.read_upload(file, transaction_id)
+            audio = await asyncio.to_thread(self.decode, file_bytes)
             
-            voice_logger.debug(f"[{transaction_id}] Paramètres transcription: {params}")
-            
-            # Exécution de la transcription
-            segments, info = self.model.transcribe(str(temp_file_path), **params)
+            segments, info, metrics = await self.transcribe_array(audio, transaction_id, whisper_profile, **kwargs)
             
             # Construction de la réponse
             segment_list = [
@@ -102,30 +144,82 @@ class VoiceService:
                 language=info.language,
                 language_probability=info.language_probability,
                 segments=segment_list,
-                model=self.model_size,
-                device=self.device_name,  # Utilisation de la chaîne de caractères
-                cuda_available=self.cuda_available
+                profile=whisper_profile.name
             )
             
-            voice_logger.info(f"[{transaction_id}] Transcription réussie - Langue: {info.language}")
+            voice_logger.info(
+                f"[{transaction_id}] Transcription réussie - Langue: {info.language} | "
+                f"attente: {metrics.queue_wait * 1000:.0f} ms, inférence: {metrics.inference * 1000:.0f} ms, "
+                f"audio: {metrics.audio_duration:.1f} s, RTF: {metrics.rtf:.2f}"
+            )
             return response.dict()
             
         except HTTPException:
             # Réémission des exceptions HTTP
             raise
+        except TranscriptionQueueFull as e:
+            error_logger.warning(f"[{transaction_id}] Transcription refusée: {str(e)}")
+            raise HTTPException(status_code=429, detail="Trop de transcriptions en cours, réessayez plus tard",
+                                headers={"Retry-After": "1"})
         except Exception as e:
             error_msg = f"Erreur lors de la transcription: {str(e)}"
             error_logger.error(f"[{transaction_id}] {error_msg}", exc_info=True)
             raise HTTPException(status_code=500, detail=error_msg)
-        finally:
-            # Nettoyage du fichier temporaire si existant
-            if temp_file_path and temp_file_path.exists():
-                try:
-                    os.remove(temp_file_path)
-                    voice_logger.debug(f"[{transaction_id}] Fichier temporaire supprimé")
-                except OSError as e:
-                    error_logger.warning(f"[{transaction_id}] Impossible de supprimer le fichier temporaire: {str(e)}")
-    
+
+    async def transcribe_array(self,
+                               audio: np.ndarray,
+                               transaction_id: str = "",
+                               profile: Optional[WhisperProfile] = None,
+                               **kwargs):
+        """
+        Transcrit un signal float32 mono 16 kHz dans le pool Whisper.
+        Utilisé par l'upload de fichiers et par le flux WebSocket (/voice/stream).
+        """
+        profile = profile or self.profile
+        # Configuration des paramètres de transcription
+        params = {
+            "language": None,
+            "task": "transcribe",
+            "initial_prompt": None,
+            **profile.transcribe_params()
+        }
+        params.update(kwargs)
+        
+        voice_logger.debug(f"[{transaction_id}] Paramètres transcription: {params}")
+        
+        # Exécution de la transcription (attend le modèle s'il est encore en chargement)
+        model, = await ModelLoader.wait(self.model_key(profile))
+        return await self.pool.transcribe(model, audio, **params)
+
+    async def read_upload(self, file: UploadFile, transaction_id: str = "") -> bytes:
+        """
+        Lit l'upload par blocs ; 413 dès que VOICE_MAX_UPLOAD_BYTES est dépassé.
+        Filet de sécurité quand Content-Length est absent : le refus précoce est fait par UploadLimitRoute.
+        """
+        max_bytes = settings.VOICE_MAX_UPLOAD_BYTES
+        if file.size is not None and file.size > max_bytes:
+            error_logger.error(f"[{transaction_id}] Fichier audio trop volumineux: {file.size} octets")
+            raise HTTPException(status_code=413, detail=f"Fichier audio limité à {max_bytes // (1024 * 1024)} Mo")
+
+        buffer = bytearray()
+        while chunk := await file.read(settings.VOICE_UPLOAD_CHUNK_SIZE):
+            buffer.extend(chunk)
+            if len(buffer) > max_bytes:
+                error_logger.error(f"[{transaction_id}] Fichier audio trop volumineux (> {max_bytes} octets)")
+                raise HTTPException(status_code=413, detail=f"Fichier audio limité à {max_bytes // (1024 * 1024)} Mo")
+        if not buffer:
+            error_logger.error(f"[{transaction_id}] Fichier audio vide")
+            raise HTTPException(status_code=400, detail="Fichier audio vide")
+        return bytes(buffer)
+
+    @staticmethod
+    def decode(file_bytes: bytes) -> np.ndarray:
+        """Décode l'audio (tout format lu par PyAV) en float32 mono 16 kHz, entièrement en mémoire"""
+        try:
+            return decode_audio(io.BytesIO(file_bytes), sampling_rate=16000)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Fichier audio illisible: {str(e)}") from e
+
     def get_device_info(self) -> Dict[str, Any]:
         """Get information about the current device and hardware configuration.
         
@@ -135,8 +229,20 @@ class VoiceService:
         info = {
             "device": self.device_name,  # Utilisation de la chaîne de caractères
             "cuda_available": self.cuda_available,
-            "model_size": self.model_size,
-            "compute_type": self.compute_type
+            "profile": self.profile.name,
+            "model_size": self.profile.model_size,
+            "compute_type": self.profile.compute_type(self.cuda_available),
+            "model_loaded": ModelLoader.is_ready(self.MODEL_KEY),
+            "workers": self.pool.workers,
+            "cpu_threads": self.cpu_threads,
+            "profiles": {
+                name: {
+                    **asdict(profile),
+                    "compute_type": profile.compute_type(self.cuda_available),
+                    "model_loaded": ModelLoader.is_ready(self.model_key(profile))
+                }
+                for name, profile in WHISPER_PROFILES.items()
+            }
         }
         
         if self.cuda_available:
@@ -0,0 +1,295 @@
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from fastapi import WebSocket, WebSocketDisconnect
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+from ai.utils.whisper_pool import TranscriptionQueueFull
+from app.config.logger import voice_logger as logger, error_logger
+from app.config.settings import settings
+from app.services.streaming_generator_service import PreparedQuery, StreamingGenerator
+from app.services.voice_service import VoiceService, WhisperProfile
+
+SAMPLE_RATE = 16000
+
+
+class PcmDecoder:
+    """PCM 16 bits little-endian mono, rééchantillonné en float32 16 kHz"""
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self._remainder = b""
+
+    def decode(self, data: bytes) -> np.ndarray:
+        data = self._remainder + data
+        # Un message peut couper un échantillon en deux
+        usable = len(data) - len(data) % 2
+        self._remainder = data[usable:]
+        audio = np.frombuffer(data[:usable], dtype="<i2").astype("float32") / 32768.0
+        if self.sample_rate != SAMPLE_RATE and len(audio):
+            positions = np.arange(0, len(audio), self.sample_rate / SAMPLE_RATE)
+            audio = np.interp(positions, np.arange(len(audio)), audio).astype("float32")
+        return audio
+
+
+class OpusDecoder:
+    """
+    Paquets Opus bruts, un par message (ex. AudioEncoder de WebCodecs / MediaRecorder
+    démultiplexé), décodés avec PyAV puis rééchantillonnés en float32 mono 16 kHz.
+    """
+
+    def __init__(self, sample_rate: int = 48000):
+        import av
+
+        self._av = av
+        self.codec = av.CodecContext.create("opus", "r")
+        self.codec.sample_rate = sample_rate
+        self.resampler = av.AudioResampler(format="flt", layout="mono", rate=SAMPLE_RATE)
+
+    def decode(self, data: bytes) -> np.ndarray:
+        chunks = []
+        for frame in self.codec.decode(self._av.Packet(data)):
+            for resampled in self.resampler.resample(frame):
+                chunks.append(resampled.to_ndarray().reshape(-1))
+        return np.concatenate(chunks).astype("float32") if chunks else np.zeros(0, dtype="float32")
+
+
+def build_decoder(audio_format: str, sample_rate: Optional[int] = None):
+    if audio_format == "pcm16":
+        return PcmDecoder(sample_rate or SAMPLE_RATE)
+    if audio_format == "opus":
+        return OpusDecoder(sample_rate or 48000)
+    raise ValueError(f"Format audio non supporté: {audio_format} (pcm16 ou opus)")
+
+
+class VoiceStreamSession:
+    """
+    Transcription incrémentale d'un flux audio reçu par WebSocket.
+
+    Le VAD Silero de faster-whisper découpe le flux aux pauses : chaque segment
+    terminé est transcrit dans le pool Whisper et renvoyé aussitôt ("partial").
+    Dès qu'un segment est transcrit, la requête (langue, traduction, embedding)
+    est préparée sur le texte connu ; si l'utilisateur ne reprend pas la parole,
+    la fin d'énoncé ("final") enchaîne directement sur la génération LLM.
+
+    Messages envoyés : partial, final, token / error (évènements de la réponse), done.
+    Messages reçus : audio binaire, ou {"type": "end"} pour clore l'énoncé sans attendre le silence.
+    """
+
+    def __init__(self,
+                 websocket: WebSocket,
+                 voice_service: VoiceService,
+                 streamer: StreamingGenerator,
+                 decoder,
+                 language: Optional[str] = None,
+                 profile: Optional[WhisperProfile] = None):
+        self.websocket = websocket
+        self.voice_service = voice_service
+        self.streamer = streamer
+        self.decoder = decoder
+        self.language = language
+        self.profile = profile
+
+        self.vad_options = VadOptions(
+            threshold=settings.VOICE_STREAM_VAD_THRESHOLD,
+            min_silence_duration_ms=settings.VOICE_STREAM_SEGMENT_SILENCE_MS,
+            max_speech_duration_s=settings.VOICE_STREAM_MAX_SEGMENT_S,
+            speech_pad_ms=settings.VOICE_STREAM_SPEECH_PAD_MS,
+        )
+        self.vad_step = settings.VOICE_STREAM_VAD_STEP_MS * SAMPLE_RATE // 1000
+        self.end_silence = settings.VOICE_STREAM_END_SILENCE_MS * SAMPLE_RATE // 1000
+        self.context = settings.VOICE_STREAM_CONTEXT_MS * SAMPLE_RATE // 1000
+        self.max_segment = int(settings.VOICE_STREAM_MAX_SEGMENT_S * SAMPLE_RATE)
+
+        self.buffer = np.zeros(0, dtype="float32")
+        self.segments: List[str] = []
+        self._since_vad = 0
+        self._silence = 0
+        # Silence retiré du début du tampon depuis la dernière parole transcrite
+        self._trimmed = 0
+        self._in_utterance = False
+        self._detected_language: Optional[str] = None
+        self._transcription: Optional[asyncio.Task] = None
+        self._prepare: Optional[asyncio.Task] = None
+        self._response: Optional[asyncio.Task] = None
+        self._send_lock = asyncio.Lock()
+        self.closed = False
+
+    @property
+    def transcript(self) -> str:
+        return " ".join(self.segments)
+
+    async def run(self):
+        try:
+            while not self.closed:
+                message = await self.websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                if message.get("bytes"):
+                    await self.feed(self.decoder.decode(message["bytes"]))
+                elif message.get("text"):
+                    await self._control(message["text"])
+        except WebSocketDisconnect:
+            pass
+        finally:
+            self.closed = True
+            for task in (self._transcription, self._prepare, self._response):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def feed(self, audio: np.ndarray):
+        """Ajoute l'audio reçu ; le VAD n'est relancé que tous les vad_step échantillons"""
+        self.buffer = np.concatenate([self.buffer, audio])
+        self._since_vad += len(audio)
+        if self._since_vad < self.vad_step:
+            return
+        self._since_vad = 0
+        await self._segment()
+        if self._in_utterance and self._silence >= self.end_silence:
+            await self.end_of_utterance()
+
+    async def end_of_utterance(self, flush: bool = False):
+        """Clôt l'énoncé : dernier segment, transcription complète, puis réponse du LLM"""
+        if flush:
+            await self._segment(flush=True)
+        if self._transcription is not None:
+            await self._transcription
+        transcript, prepare = self.transcript, self._prepare
+        self.segments, self._prepare, self._transcription = [], None, None
+        self._in_utterance, self._silence, self._detected_language = False, 0, None
+
+        await self.send({"type": "final", "text": transcript})
+        if not transcript:
+            return
+        # Une seule réponse à la fois par connexion ; l'audio suivant continue d'être traité
+        previous = self._response
+        self._response = asyncio.create_task(self._respond(transcript, prepare, previous))
+
+    async def send(self, payload: Dict[str, Any]) -> bool:
+        """Envoie un message ; False si le client est parti (la session est alors terminée)"""
+        async with self._send_lock:
+            if self.closed:
+                return False
+            try:
+                await self.websocket.send_json(payload)
+                return True
+            except Exception as e:
+                # Déconnexion pendant une transcription ou une réponse en arrière-plan
+                logger.info(f"Flux vocal fermé par le client: {type(e).__name__}")
+                self.closed = True
+                return False
+
+    # --------------------------------------------------------------------------
+    # Méthodes utilitaires
+    # --------------------------------------------------------------------------
+
+    async def _control(self, text: str):
+        """Message texte du client : seul {"type": "end"} est reconnu"""
+        try:
+            control = json.loads(text)
+        except json.JSONDecodeError:
+            control = None
+        if not isinstance(control, dict):
+            await self.send({"type": "error", "data": "Message de contrôle invalide (JSON attendu)"})
+            return
+        if control.get("type") == "end":
+            await self.end_of_utterance(flush=True)
+
+    async def _segment(self, flush: bool = False):
+        """
+        Détecte la parole dans le tampon et transcrit les segments terminés.
+        Le tampon commence toujours à la fin de la dernière parole transcrite et,
+        sans parole, n'en garde que `context` échantillons : chaque passage du VAD
+        ne porte que sur l'audio pas encore découpé, quelle que soit la durée du flux.
+        """
+        speech = await asyncio.to_thread(get_speech_timestamps, self.buffer, self.vad_options)
+        if not speech:
+            self._silence = self._trimmed + len(self.buffer)
+            self._trim()
+            return
+
+        # Segments clos : le VAD a fermé la parole (silence suffisant) avant la fin du tampon
+        closed = [s for s in speech if s["end"] < len(self.buffer)]
+        if flush or speech[-1]["end"] - speech[-1]["start"] >= self.max_segment:
+            closed = speech
+        if closed:
+            self._submit(self.buffer[closed[0]["start"]:closed[-1]["end"]])
+            self.buffer = self.buffer[closed[-1]["end"]:]
+            self._trimmed = 0
+        self._silence = 0 if len(closed) < len(speech) else len(self.buffer)
+
+    def _trim(self):
+        """Ne garde que le contexte précédant une éventuelle reprise de la parole"""
+        excess = len(self.buffer) - self.context
+        if excess > 0:
+            self.buffer = self.buffer[excess:]
+            self._trimmed += excess
+
+    def _submit(self, audio: np.ndarray):
+        self._in_utterance = True
+        self._transcription = asyncio.create_task(self._transcribe(audio, self._transcription))
+
+    async def _transcribe(self, audio: np.ndarray, previous: Optional[asyncio.Task]):
+        """Transcrit un segment après le précédent (ordre conservé), puis prépare la requête"""
+        if previous is not None:
+            await previous
+        try:
+            segments, info, metrics = await self.voice_service.transcribe_array(
+                audio,
+                profile=self.profile,
+                # Langue détectée sur le premier segment, réutilisée pour la suite de l'énoncé
+                language=self.language or self._detected_language,
+                initial_prompt=self.transcript or None,
+                condition_on_previous_text=False,
+            )
+        except TranscriptionQueueFull as e:
+            error_logger.warning(f"Segment vocal ignoré: {str(e)}")
+            await self.send({"type": "error", "data": "Trop de transcriptions en cours"})
+            return
+        except Exception as e:
+            error_logger.error(f"Erreur de transcription du segment: {str(e)}", exc_info=True)
+            await self.send({"type": "error", "data": "Erreur de transcription"})
+            return
+
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+        if not text:
+            return
+        self._detected_language = self._detected_language or info.language
+        self.segments.append(text)
+        logger.info(f"Segment vocal transcrit: {metrics.audio_duration:.1f} s, RTF {metrics.rtf:.2f}")
+        await self.send({"type": "partial", "text": text, "transcript": self.transcript})
+
+        # Préparation anticipée : prête si ce segment est le dernier de l'énoncé
+        if self._prepare is not None:
+            self._prepare.cancel()
+        self._prepare = asyncio.create_task(self.streamer.prepare(self.transcript))
+
+    async def _respond(self, transcript: str, prepare: Optional[asyncio.Task], previous: Optional[asyncio.Task]):
+        if previous is not None:
+            await previous
+        prepared: Optional[PreparedQuery] = None
+        if prepare is not None:
+            try:
+                prepared = await prepare
+            except (asyncio.CancelledError, Exception):
+                prepared = None
+        try:
+            async for event in self.streamer.generate_stream(transcript, prepared):
+                if not await self.send(self._parse_event(event)):
+                    # Client déconnecté : inutile de poursuivre la génération
+                    return
+            await self.send({"type": "done"})
+        except Exception as e:
+            error_logger.error(f"Erreur de réponse au flux vocal: {str(e)}")
+
+    @staticmethod
+    def _parse_event(event: str) -> Dict[str, str]:
+        """Évènement SSE ("event: x\\ndata: y\\n\\n") -> message JSON"""
+        header, _, data = event.partition("\n")
+        event_type = header.removeprefix("event: ")
+        return {
+            "type": "token" if event_type == "message" else event_type,
+            "data": data.removeprefix("data: ").removesuffix("\n\n"),
+        }
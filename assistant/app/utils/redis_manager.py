@@ -1,39 +1,95 @@
 import json
-import redis
-from typing import Optional, Dict, Any
+import redis.asyncio as redis
+from typing import Optional, Dict, Any, List, Tuple
 from app.config.redis_settings import redis_settings
 from app.config.settings import settings
 
 class RedisManager:
     """Repository layer - Only handles raw Redis operations"""
+    # Pool de connexions partagé par toutes les instances du processus :
+    # à saturation, une requête attend qu'une connexion se libère (redis_pool_timeout)
+    _pool: Optional[redis.BlockingConnectionPool] = None
+
     def __init__(self):
-        self.client = redis.Redis.from_url(
-            redis_settings.get_redis_url(),
-            decode_responses=True,
-            socket_timeout=5,
-            retry_on_timeout=True
-        )
+        self.client = redis.Redis(connection_pool=self.get_pool())
         self.session_id = settings.SESSION_COOKIE_NAME
         self.expiration = 86400  # 24h
 
+    @classmethod
+    def get_pool(cls) -> redis.BlockingConnectionPool:
+        if cls._pool is None:
+            cls._pool = redis.BlockingConnectionPool.from_url(
+                redis_settings.get_redis_url(),
+                decode_responses=True,
+                socket_timeout=5,
+                retry_on_timeout=True,
+                max_connections=redis_settings.redis_max_connections,
+                timeout=redis_settings.redis_pool_timeout
+            )
+        return cls._pool
+
+    @classmethod
+    async def close_pool(cls):
+        """Ferme toutes les connexions du pool (arrêt de l'application)"""
+        if cls._pool is not None:
+            await cls._pool.disconnect()
+            cls._pool = None
+
     def _get_key(self) -> str:
+        """Ancien format : toute la session dans un seul blob JSON"""
         return f"session:{self.session_id}:history"
 
-    async def save_data(self, data: Dict[str, Any]) -> bool:
-        """Save raw data to Redis"""
+    def _get_meta_key(self) -> str:
+        return f"session:{self.session_id}:meta"
+
+    def _get_queries_key(self) -> str:
+        return f"session:{self.session_id}:queries"
+
+    async def save_history(self, fields: Dict[str, str], queries: List[str], replace: bool = False, max_queries: int = 50) -> bool:
+        """
+        Écrit les champs scalaires (hash) et ajoute les requêtes (liste plafonnée)
+        en une seule transaction pipelinée.
+        Si replace=True, la liste des requêtes et l'ancien blob JSON sont remplacés.
+        """
         try:
-            key = self._get_key()
-            self.client.set(key, json.dumps(data, ensure_ascii=False, default=str))
-            self.client.expire(key, self.expiration)
+            meta_key, queries_key = self._get_meta_key(), self._get_queries_key()
+            async with self.client.pipeline(transaction=True) as pipe:
+                if fields:
+                    pipe.hset(meta_key, mapping=fields)
+                if replace:
+                    pipe.delete(queries_key, self._get_key())
+                if queries:
+                    pipe.rpush(queries_key, *queries)
+                    pipe.ltrim(queries_key, -max_queries, -1)
+                pipe.expire(meta_key, self.expiration)
+                pipe.expire(queries_key, self.expiration)
+                await pipe.execute()
             return True
         except Exception as e:
-            raise RedisOperationError(f"Error saving data to Redis: {str(e)}")
+            raise RedisOperationError(f"Error saving history to Redis: {str(e)}")
+
+    async def load_history(self, query_limit: Optional[int] = None) -> Tuple[Dict[str, str], List[str]]:
+        """
+        Lit les champs scalaires et les `query_limit` dernières requêtes en un aller-retour.
+        query_limit=None lit toutes les requêtes, 0 n'en lit aucune.
+        """
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.hgetall(self._get_meta_key())
+                if query_limit != 0:
+                    pipe.lrange(self._get_queries_key(), -query_limit if query_limit else 0, -1)
+                results = await pipe.execute()
+            fields = results[0] or {}
+            queries = results[1] if query_limit != 0 else []
+            return fields, queries
+        except Exception as e:
+            raise RedisOperationError(f"Error loading history from Redis: {str(e)}")
 
     async def get_data(self) -> Optional[Dict[str, Any]]:
-        """Get raw data from Redis"""
+        """Get raw legacy JSON blob from Redis (lecture de migration)"""
         try:
             key = self._get_key()
-            raw_data = self.client.get(key)
+            raw_data = await self.client.get(key)
             return json.loads(raw_data) if raw_data else None
         except Exception as e:
             raise RedisOperationError(f"Error getting data from Redis: {str(e)}")
@@ -41,11 +97,23 @@ class RedisManager:
     async def delete_data(self) -> bool:
         """Delete data from Redis"""
         try:
-            key = self._get_key()
-            return self.client.delete(key) > 0
+            return await self.client.delete(self._get_meta_key(), self._get_queries_key(), self._get_key()) > 0
         except Exception as e:
             raise RedisOperationError(f"Error deleting data from Redis: {str(e)}")
 
+    async def get_cached(self, key: str) -> Optional[str]:
+        """Lecture d'une valeur de cache partagée entre workers (hors session)"""
+        try:
+            return await self.client.get(key)
+        except Exception as e:
+            raise RedisOperationError(f"Error reading cache from Redis: {str(e)}")
+
+    async def set_cached(self, key: str, value: str, ttl: int) -> bool:
+        try:
+            return bool(await self.client.set(key, value, ex=ttl))
+        except Exception as e:
+            raise RedisOperationError(f"Error writing cache to Redis: {str(e)}")
+
 class RedisOperationError(Exception):
     """Custom exception for Redis operations"""
-    pass
\ No newline at end of file
+    pass
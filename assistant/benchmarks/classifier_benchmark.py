@@ -0,0 +1,82 @@
+"""
+Benchmark hors-ligne du classifieur : précision et latence, kNN vs LLM.
+
+- kNN : validation leave-one-out sur les exemples annotés, avec la température
+  du softmax ajustée sur ces mêmes exemples et la calibration de la confiance
+- LLM : même jeu d'exemples envoyé à Ollama (option --llm, Ollama démarré)
+
+Usage (depuis le dossier assistant/) :
+    uv run python -m benchmarks.classifier_benchmark [--llm]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import numpy as np
+
+from ai.llm.http_pool import HTTPClientPool
+from ai.utils.embedding_classifier import EmbeddingClassifier
+from app.config.settings import settings
+from app.schemas.history import History
+from app.services.classifier_service import ClassifierService
+
+
+def report(name: str, correct: int, total: int, latencies: list):
+    latencies = sorted(latencies)
+    print(
+        f"{name:<5} précision: {correct / total:6.1%} ({correct}/{total}) | "
+        f"latence p50: {statistics.median(latencies) * 1000:8.1f} ms "
+        f"p95: {latencies[int(len(latencies) * 0.95)] * 1000:8.1f} ms"
+    )
+
+
+def benchmark_knn(classifier: EmbeddingClassifier, examples: list):
+    classifier.fit(examples)
+    temperature, log_loss = classifier.fit_temperature()
+    print(f"Température du softmax: {classifier.temperature:.4f} "
+          f"(optimum leave-one-out {temperature:.4f}, log-loss {log_loss:.3f})")
+    all_embeddings, all_labels = classifier._embeddings, classifier._labels
+    correct, latencies, confidences = 0, [], []
+    for i, (query, label) in enumerate(examples):
+        mask = np.arange(len(examples)) != i
+        classifier._embeddings, classifier._labels = all_embeddings[mask], all_labels[mask]
+        start = time.perf_counter()
+        predicted, confidence = classifier.predict(query)
+        latencies.append(time.perf_counter() - start)
+        correct += predicted == label
+        confidences.append(confidence)
+    classifier._embeddings, classifier._labels = all_embeddings, all_labels
+    report("kNN", correct, len(examples), latencies)
+    threshold = settings.CLASSIFIER_CONFIDENCE_THRESHOLD
+    print(f"      confiance moyenne: {statistics.mean(confidences):6.1%} | "
+          f"au-dessus du seuil {threshold}: {sum(c >= threshold for c in confidences)}/{len(examples)}")
+
+
+async def benchmark_llm(examples: list):
+    service = ClassifierService()
+    correct, latencies = 0, []
+    try:
+        for query, label in examples:
+            start = time.perf_counter()
+            prompt = await service.template.build_prompt(query, history=History(user_queries=[]))
+            classification = service._parse_llm_response(await service._get_llm_response(prompt))
+            latencies.append(time.perf_counter() - start)
+            correct += classification is not None and classification.Type == label
+    finally:
+        await HTTPClientPool.close()
+    report("LLM", correct, len(examples), latencies)
+
+
+def main(args):
+    classifier = EmbeddingClassifier()
+    examples = classifier.load_examples()
+    benchmark_knn(classifier, examples)
+    if args.llm:
+        asyncio.run(benchmark_llm(examples))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark du classifieur de requêtes")
+    parser.add_argument("--llm", action="store_true", help="Inclure le chemin LLM (nécessite Ollama)")
+    main(parser.parse_args())
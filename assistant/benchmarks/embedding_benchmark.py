@@ -0,0 +1,71 @@
+"""
+Benchmark de génération d'embeddings (lignes/s).
+
+Compare l'ancien encodage ligne par ligne (`df.apply(model.encode)`) à
+l'encodage par lots trié par longueur, en mono et multi-processus, sur :
+- les descriptions réelles de ai/data/raw/products.csv
+- un catalogue synthétique (100k lignes par défaut) construit à partir de leurs mots
+
+Usage (depuis le dossier assistant/) :
+    uv run python -m benchmarks.embedding_benchmark --synthetic-rows 100000 --workers 4
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from ai.preparation.clean import clean_text
+from ai.preparation.embedding import EmbeddingGenerator
+
+
+def load_real_texts(path: str) -> list:
+    df = pd.read_csv(path, usecols=["name", "brand", "description"], dtype=str)
+    return [
+        f"Produit: {row.name}\nMarque: {row.brand}\nDescription: {clean_text(row.description)}"
+        for row in df.fillna("").itertuples()
+    ]
+
+
+def synthetic_texts(real_texts: list, rows: int, seed: int = 0) -> list:
+    """Textes de longueurs variées tirés du vocabulaire réel"""
+    rng = np.random.default_rng(seed)
+    vocabulary = " ".join(real_texts).split()
+    lengths = rng.integers(10, 200, size=rows)
+    return [" ".join(rng.choice(vocabulary, size=n)) for n in lengths]
+
+
+def measure(name: str, texts: list, encode):
+    start = time.perf_counter()
+    encode(texts)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<32} {len(texts):>7} lignes | {len(texts) / elapsed:9.1f} lignes/s")
+
+
+def run(label: str, texts: list, generator: EmbeddingGenerator, workers: int, legacy_rows: int):
+    print(f"== {label}")
+    measure("ligne par ligne (ancien)", texts[:legacy_rows], lambda t: pd.Series(t).apply(generator.model.encode))
+    generator.workers = 1
+    measure("par lots, 1 processus", texts, generator.encode)
+    if workers > 1:
+        generator.workers = workers
+        measure(f"par lots, {workers} processus", texts, generator.encode)
+
+
+def main(args):
+    generator = EmbeddingGenerator(batch_size=args.batch_size)
+    real_texts = load_real_texts(args.csv)
+    run("products.csv", real_texts, generator, args.workers, len(real_texts))
+    synthetic = synthetic_texts(real_texts, args.synthetic_rows)
+    run("catalogue synthétique", synthetic, generator, args.workers, min(args.legacy_rows, len(synthetic)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de génération d'embeddings")
+    parser.add_argument("--csv", default="ai/data/raw/products.csv")
+    parser.add_argument("--synthetic-rows", type=int, default=100_000)
+    parser.add_argument("--legacy-rows", type=int, default=2_000, help="Lignes mesurées pour l'ancien chemin (lent)")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    main(parser.parse_args())
@@ -0,0 +1,90 @@
+"""
+Benchmark des types d'index FAISS : rappel@k et requêtes/s par rapport à l'index exact.
+
+Les vecteurs viennent de produits_vectors.npy, complétés par des vecteurs
+synthétiques (bruit autour des vecteurs réels) jusqu'à --vectors.
+Les paramètres de recherche (nprobe / efSearch) sont balayés pour tracer
+le compromis rappel / débit de chaque type.
+
+Usage (depuis le dossier assistant/) :
+    uv run python -m benchmarks.index_benchmark --vectors 200000 --k 10
+"""
+import argparse
+import time
+
+import faiss
+import numpy as np
+
+from ai.preparation.indexing import FAISSIndexer
+from ai.preparation.storage import ProductStore
+
+
+def load_vectors(n: int, directory: str, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    base = np.array(ProductStore(directory).load_vectors(mmap=False), dtype="float32")
+    if n <= len(base):
+        return base[:n]
+    picks = base[rng.integers(0, len(base), size=n - len(base))]
+    noise = rng.normal(scale=0.05, size=picks.shape).astype("float32")
+    vectors = np.vstack([base, picks + noise])
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    k = truth.shape[1]
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+    return hits / (len(truth) * k)
+
+
+def measure(name: str, index: faiss.Index, queries: np.ndarray, truth: np.ndarray, k: int, build_time: float):
+    start = time.perf_counter()
+    _, found = index.search(queries, k)
+    elapsed = time.perf_counter() - start
+    size_mb = faiss.serialize_index(index).nbytes / 1e6
+    print(
+        f"{name:<22} rappel@{k}: {recall_at_k(found, truth):6.3f} | "
+        f"{len(queries) / elapsed:10.0f} req/s | construction: {build_time:6.1f} s | taille: {size_mb:8.1f} Mo"
+    )
+
+
+def main(args):
+    faiss.omp_set_num_threads(args.threads)
+    vectors = load_vectors(args.vectors, args.dir)
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.integers(0, len(vectors), size=args.queries)]
+    queries = queries + rng.normal(scale=0.02, size=queries.shape).astype("float32")
+
+    start = time.perf_counter()
+    flat = FAISSIndexer.create_index(vectors, "flat")
+    flat_build = time.perf_counter() - start
+    _, truth = flat.search(queries, args.k)
+    print(f"{len(vectors)} vecteurs, {len(queries)} requêtes, auto -> {FAISSIndexer.select_index_type(len(vectors), args.recall_target)}")
+    measure("flat", flat, queries, truth, args.k, flat_build)
+
+    for index_type in ("hnsw", "ivf_flat", "ivf_pq", "sq8"):
+        start = time.perf_counter()
+        index = FAISSIndexer.create_index(vectors, index_type)
+        build_time = time.perf_counter() - start
+
+        if index_type == "hnsw":
+            for ef in (16, 32, 64, 128, 256):
+                index.hnsw.efSearch = ef
+                measure(f"hnsw efSearch={ef}", index, queries, truth, args.k, build_time)
+        elif index_type.startswith("ivf"):
+            for nprobe in sorted({1, 4, 16, 64, index.nlist}):
+                if nprobe <= index.nlist:
+                    index.nprobe = nprobe
+                    measure(f"{index_type} nprobe={nprobe}", index, queries, truth, args.k, build_time)
+        else:
+            measure(index_type, index, queries, truth, args.k, build_time)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark rappel / débit des index FAISS")
+    parser.add_argument("--dir", default="ai/data/embeddings")
+    parser.add_argument("--vectors", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--recall-target", type=float, default=0.95)
+    parser.add_argument("--threads", type=int, default=1)
+    main(parser.parse_args())
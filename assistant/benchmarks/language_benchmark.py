@@ -0,0 +1,75 @@
+"""
+Microbenchmark de la détection de langue : latence par requête et précision.
+
+- langid global   : langid.classify (97 langues, modèle chargé au premier appel)
+- langid restreint : modèle préchargé limité à fr / en / ar / de
+- écriture + langid : chemin rapide par écriture Unicode, langid restreint sinon
+(le cache de LanguageService n'est pas utilisé : chaque appel est une détection réelle)
+
+Usage (depuis le dossier assistant/) :
+    uv run python -m benchmarks.language_benchmark --repeat 200
+"""
+import argparse
+import statistics
+import time
+
+import langid
+
+from ai.utils.language_util import LanguageService
+
+SAMPLES = [
+    ("Quels sont les horaires de livraison ?", "fr"),
+    ("Je cherche un smartphone pas cher", "fr"),
+    ("Comment fonctionne la plateforme ADV ?", "fr"),
+    ("Quelle est la politique de retour ?", "fr"),
+    ("bonjour", "fr"),
+    ("What are the delivery times?", "en"),
+    ("I am looking for a cheap phone", "en"),
+    ("How does the ADV platform work?", "en"),
+    ("Can I return a product?", "en"),
+    ("Wie lange dauert die Lieferung?", "de"),
+    ("Ich suche ein günstiges Handy", "de"),
+    ("Wie funktioniert die ADV-Plattform?", "de"),
+    ("Kann ich ein Produkt zurückgeben?", "de"),
+    ("ما هي مواعيد التوصيل؟", "ar"),
+    ("أبحث عن هاتف رخيص", "ar"),
+    ("كيف تعمل منصة ADV؟", "ar"),
+    ("هل يمكنني إرجاع المنتج؟", "ar"),
+    ("شكرا جزيلا", "ar"),
+]
+
+
+def run(name: str, detect, repeat: int):
+    latencies, correct = [], 0
+    for _ in range(repeat):
+        for text, expected in SAMPLES:
+            start = time.perf_counter()
+            lang = detect(text)
+            latencies.append(time.perf_counter() - start)
+            correct += lang == expected
+    latencies.sort()
+    print(
+        f"{name:<20} précision: {correct / len(latencies):6.1%} | "
+        f"p50: {statistics.median(latencies) * 1e6:8.1f} µs "
+        f"p95: {latencies[int(len(latencies) * 0.95)] * 1e6:8.1f} µs"
+    )
+
+
+def main(args):
+    start = time.perf_counter()
+    langid.classify("warmup")
+    print(f"Premier appel langid.classify (chargement paresseux) : {(time.perf_counter() - start) * 1000:.0f} ms")
+    start = time.perf_counter()
+    identifier = LanguageService.preload()
+    print(f"LanguageService.preload (au démarrage) : {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    service = LanguageService()
+    run("langid global", lambda t: langid.classify(t)[0], args.repeat)
+    run("langid restreint", lambda t: identifier.classify(t)[0], args.repeat)
+    run("écriture + langid", lambda t: service.detect_script(t) or identifier.classify(t)[0], args.repeat)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmark de la détection de langue")
+    parser.add_argument("--repeat", type=int, default=200, help="Passages sur le jeu d'exemples")
+    main(parser.parse_args())
@@ -0,0 +1,83 @@
+"""
+Benchmark de la réutilisation du cache de prompt Ollama (Ollama démarré, modèle OLLAMA_MODEL).
+
+Compare, sur une série de questions, le temps d'évaluation du prompt
+(prompt_eval_count / prompt_eval_duration renvoyés par Ollama) pour :
+- variable d'abord : partie variable placée avant les instructions fixes (ancienne disposition)
+- préfixe stable   : message système fixe puis partie variable (disposition actuelle)
+
+La première requête de chaque mode sert de préchauffage et n'est pas comptée.
+Une seule génération de token est demandée : seul le coût du prompt est mesuré.
+
+Usage (depuis le dossier assistant/) :
+    uv run python -m benchmarks.prompt_cache_benchmark --template adv
+"""
+import argparse
+import asyncio
+import statistics
+
+from ai.llm.http_pool import HTTPClientPool
+from ai.llm.ollama_client import OllamaClient
+from ai.prompts_template.adv_platform_prompt import ADVPlatformTemplate
+from ai.prompts_template.generale_prompt import GeneralDiscussionTemplate
+from app.schemas.history import History
+
+QUESTIONS = [
+    "Quand a démarré le projet ADV ?",
+    "Sur quelles plateformes le parc client est-il réparti ?",
+    "Quel progiciel est utilisé par ADV ?",
+    "Quelle est la cible de la rénovation en cours ?",
+    "Que signifie le préfixe CO_ pour une table ?",
+    "Quels sont les domaines de l'architecture fonctionnelle ?",
+    "Pourquoi le projet VPF a-t-il été arrêté ?",
+    "Qu'est-ce que la plateforme MOBI ?",
+    "Combien de databases compte chaque plateforme ?",
+    "Quel est le rôle de DISE ?",
+]
+
+
+async def build_messages(template, question: str):
+    return await template.build_messages(question, history=History(lang="fr", user_queries=QUESTIONS[:2]))
+
+
+def variable_first(messages):
+    """Ancienne disposition : le contenu variable précède les instructions fixes"""
+    system, user = messages[0]["content"], messages[1]["content"]
+    return [{"role": "user", "content": f"{user}\n\n{system}"}]
+
+
+async def run_mode(client: OllamaClient, template, layout) -> list:
+    stats = []
+    for question in QUESTIONS:
+        messages = layout(await build_messages(template, question))
+        response = await client.generate_with_context(messages, stream=False, options={"num_predict": 1, "temperature": 0})
+        stats.append(response.get("stats", {}))
+    return stats[1:]
+
+
+def report(name: str, stats: list):
+    counts = [s.get("prompt_eval_count", 0) for s in stats]
+    durations = [s.get("prompt_eval_duration", 0) / 1e6 for s in stats]
+    print(
+        f"{name:<18} tokens évalués: {statistics.mean(counts):7.1f} | "
+        f"prompt_eval: {statistics.mean(durations):8.1f} ms (p50 {statistics.median(durations):8.1f} ms)"
+    )
+    return statistics.mean(durations)
+
+
+async def main(args):
+    template = ADVPlatformTemplate() if args.template == "adv" else GeneralDiscussionTemplate()
+    client = OllamaClient()
+    try:
+        legacy = report("variable d'abord", await run_mode(client, template, variable_first))
+        stable = report("préfixe stable", await run_mode(client, template, lambda m: m))
+    finally:
+        await HTTPClientPool.close()
+    if legacy:
+        print(f"Gain sur prompt_eval_duration : {1 - stable / legacy:.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark du cache de prompt Ollama")
+    parser.add_argument("--template", choices=("adv", "general"), default="adv")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,73 @@
+"""
+Test de charge : latence des flux /bot/bot-query pendant des écritures d'historique.
+
+Lance N flux SSE concurrents contre une API démarrée, pendant que M écrivains
+ajoutent des requêtes à l'historique Redis en boucle, puis affiche les
+percentiles du temps jusqu'au premier octet (TTFB) et de la durée totale.
+
+Usage (API et Redis démarrés, depuis le dossier assistant/) :
+    uv run python -m benchmarks.redis_load_benchmark --url http://localhost:8080 --streams 50 --writers 20
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+import httpx
+
+
+def percentile(values: List[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+async def run_stream(client: httpx.AsyncClient, url: str, query: str, ttfb: List[float], totals: List[float]):
+    start = time.perf_counter()
+    first = None
+    async with client.stream("GET", f"{url}/bot/bot-query", params={"query": query}) as response:
+        async for _ in response.aiter_raw():
+            if first is None:
+                first = time.perf_counter()
+    ttfb.append((first or time.perf_counter()) - start)
+    totals.append(time.perf_counter() - start)
+
+
+async def run_writer(client: httpx.AsyncClient, url: str, stop: asyncio.Event, latencies: List[float]):
+    i = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.post(f"{url}/add-query", params={"query": f"requête de charge {i}"})
+        latencies.append(time.perf_counter() - start)
+        i += 1
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.streams + args.writers)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        ttfb, totals, writes = [], [], []
+        stop = asyncio.Event()
+        writers = [asyncio.create_task(run_writer(client, args.url, stop, writes)) for _ in range(args.writers)]
+
+        streams = [run_stream(client, args.url, args.query, ttfb, totals) for _ in range(args.streams)]
+        await asyncio.gather(*streams)
+
+        stop.set()
+        await asyncio.gather(*writers)
+
+    print(f"{args.streams} flux / {args.writers} écrivains d'historique ({len(writes)} écritures)")
+    for name, values in (("TTFB flux", ttfb), ("Durée flux", totals), ("Écriture historique", writes)):
+        print(
+            f"{name:<20} p50: {percentile(values, 0.50) * 1000:8.1f} ms | "
+            f"p95: {percentile(values, 0.95) * 1000:8.1f} ms | "
+            f"p99: {percentile(values, 0.99) * 1000:8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Test de charge SSE + historique Redis")
+    parser.add_argument("--url", default="http://localhost:8080", help="URL de base de l'API")
+    parser.add_argument("--streams", type=int, default=50, help="Nombre de flux /bot/bot-query concurrents")
+    parser.add_argument("--writers", type=int, default=20, help="Nombre d'écrivains d'historique concurrents")
+    parser.add_argument("--query", default="c'est quoi ADV ?", help="Question envoyée par chaque flux")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    asyncio.run(main(parser.parse_args()))
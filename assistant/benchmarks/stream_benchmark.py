@@ -0,0 +1,123 @@
+"""
+Benchmark du streaming de tokens contre un faux serveur Ollama local.
+
+Mesure le débit (tokens/s) et la latence inter-token pour :
+- legacy : ancien comportement (10 ms dans le client + 10 ms dans ResponseService)
+- direct : transfert immédiat des tokens (STREAM_CHUNK_DELAY = 0)
+
+Usage (depuis le dossier assistant/) :
+    uv run python -m benchmarks.stream_benchmark --tokens 500 --token-interval 0.002
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import List
+
+from app.config.settings import settings
+from ai.llm.http_pool import HTTPClientPool
+from ai.llm.ollama_client import OllamaClient
+
+
+class FakeOllamaServer:
+    """Serveur HTTP minimal qui imite /api/generate en NDJSON chunké"""
+
+    def __init__(self, tokens: int, token_interval: float):
+        self.tokens = tokens
+        self.token_interval = token_interval
+        self.server = None
+        self.port = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                headers = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in headers.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":")[1])
+                await reader.readexactly(length)
+
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/x-ndjson\r\n"
+                    b"Transfer-Encoding: chunked\r\n\r\n"
+                )
+                for i in range(self.tokens):
+                    if self.token_interval:
+                        await asyncio.sleep(self.token_interval)
+                    self._write_chunk(writer, {"model": "fake", "response": f"tok{i} ", "done": False})
+                    await writer.drain()
+                self._write_chunk(writer, {"model": "fake", "response": "", "done": True})
+                writer.write(b"0\r\n\r\n")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _write_chunk(writer: asyncio.StreamWriter, data: dict):
+        body = (json.dumps(data) + "\n").encode()
+        writer.write(f"{len(body):x}\r\n".encode() + body + b"\r\n")
+
+
+async def run_once(client: OllamaClient, legacy: bool) -> List[float]:
+    """Consomme un flux complet et renvoie les instants d'arrivée de chaque token"""
+    settings.STREAM_CHUNK_DELAY = 0.01 if legacy else 0.0
+    arrivals = []
+    stream = await client.generate_response("benchmark", stream=True)
+    async for _ in stream:
+        arrivals.append(time.perf_counter())
+        if legacy:
+            # Reproduit l'ancien sleep de ResponseService._handle_generation
+            await asyncio.sleep(0.01)
+    return arrivals
+
+
+def report(name: str, runs: List[List[float]], starts: List[float]):
+    gaps = [b - a for arrivals in runs for a, b in zip(arrivals, arrivals[1:])]
+    totals = [arrivals[-1] - start for arrivals, start in zip(runs, starts)]
+    ttft = [arrivals[0] - start for arrivals, start in zip(runs, starts)]
+    tokens = sum(len(arrivals) for arrivals in runs)
+    gaps.sort()
+    print(
+        f"{name:<8} tokens/s: {tokens / sum(totals):9.1f} | "
+        f"TTFT: {statistics.mean(ttft) * 1000:7.2f} ms | "
+        f"inter-token p50: {gaps[len(gaps) // 2] * 1000:6.2f} ms "
+        f"p99: {gaps[int(len(gaps) * 0.99)] * 1000:6.2f} ms"
+    )
+
+
+async def main(args):
+    server = FakeOllamaServer(args.tokens, args.token_interval)
+    await server.start()
+    client = OllamaClient()
+    client.base_url = f"http://127.0.0.1:{server.port}/api"
+    try:
+        for name, legacy in (("legacy", True), ("direct", False)):
+            runs, starts = [], []
+            for _ in range(args.runs):
+                starts.append(time.perf_counter())
+                runs.append(await run_once(client, legacy))
+            report(name, runs, starts)
+    finally:
+        await HTTPClientPool.close()
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark du streaming Ollama")
+    parser.add_argument("--tokens", type=int, default=500, help="Tokens par réponse")
+    parser.add_argument("--token-interval", type=float, default=0.0, help="Délai de génération simulé par token (s)")
+    parser.add_argument("--runs", type=int, default=3, help="Nombre de réponses par mode")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,116 @@
+"""
+Benchmark de la transcription Whisper sous uploads concurrents.
+
+Pour chaque configuration, `--jobs` transcriptions sont lancées en même temps :
+- inline         : model.transcribe appelé dans la coroutine (ancien VoiceService)
+- pool N workers : WhisperPool, modèle chargé avec num_workers=N et cœurs / N threads chacun
+
+Mesures : débit (secondes d'audio transcrites par seconde), latence par requête,
+et retard maximal de la boucle d'événements (un tick toutes les 10 ms) : c'est
+le gel subi par les flux SSE du chat pendant les transcriptions.
+
+Usage (depuis le dossier assistant/) :
+    uv run python -m benchmarks.whisper_pool_benchmark --audio clip.wav --jobs 8 --workers 1 2 4
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import numpy as np
+from faster_whisper import WhisperModel
+from faster_whisper.audio import decode_audio
+
+from ai.utils.whisper_pool import WhisperPool
+
+
+def load_audio(args) -> np.ndarray:
+    if args.audio:
+        return decode_audio(args.audio, sampling_rate=16000)
+    # Signal synthétique (notes et bruit) : préférer un vrai enregistrement pour des chiffres réalistes
+    t = np.arange(int(args.seconds * 16000)) / 16000
+    tone = 0.3 * np.sin(2 * np.pi * (220 + 80 * np.sin(2 * np.pi * 0.5 * t)) * t)
+    noise = 0.05 * np.random.default_rng(0).standard_normal(len(t))
+    return (tone + noise).astype("float32")
+
+
+async def measure_loop_lag(stop: asyncio.Event) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, time.perf_counter() - start - 0.01)
+    return worst
+
+
+async def run(name: str, transcribe, audio: np.ndarray, jobs: int):
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop))
+    latencies = []
+
+    async def job():
+        start = time.perf_counter()
+        await transcribe(audio)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(job() for _ in range(jobs)))
+    wall = time.perf_counter() - start
+    stop.set()
+    lag = await lag_task
+
+    latencies.sort()
+    audio_seconds = jobs * len(audio) / 16000
+    print(
+        f"{name:<16} débit: {audio_seconds / wall:6.2f} s audio/s | "
+        f"latence p50: {statistics.median(latencies):6.2f} s p95: {latencies[int(len(latencies) * 0.95)]:6.2f} s | "
+        f"gel boucle max: {lag * 1000:7.0f} ms"
+    )
+    return audio_seconds / wall
+
+
+async def main(args):
+    audio = load_audio(args)
+    params = {"beam_size": args.beam_size, "language": args.language}
+    print(f"{os.cpu_count()} cœurs, {args.jobs} transcriptions de {len(audio) / 16000:.1f} s, modèle {args.model}")
+
+    model = WhisperModel(args.model, device="cpu", compute_type=args.compute_type)
+
+    async def inline(clip):
+        segments, _ = model.transcribe(clip, **params)
+        return list(segments)
+
+    await inline(audio[:16000])
+    baseline = await run("inline", inline, audio, args.jobs)
+    del model
+
+    for workers in args.workers:
+        cpu_threads = WhisperPool.cpu_threads_per_worker(workers)
+        model = WhisperModel(
+            args.model, device="cpu", compute_type=args.compute_type,
+            cpu_threads=cpu_threads, num_workers=workers,
+        )
+        pool = WhisperPool(workers=workers, max_queue=args.jobs)
+        await pool.transcribe(model, audio[:16000], **params)
+        throughput = await run(
+            f"pool {workers}x{cpu_threads}",
+            lambda clip: pool.transcribe(model, clip, **params),
+            audio, args.jobs,
+        )
+        print(f"{'':<16} accélération vs inline: x{throughput / baseline:.2f}")
+        pool.shutdown()
+        del model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark du pool de transcription Whisper")
+    parser.add_argument("--audio", help="Fichier audio (sinon signal synthétique)")
+    parser.add_argument("--seconds", type=float, default=30.0, help="Durée du signal synthétique")
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--language", default="fr")
+    parser.add_argument("--beam-size", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=8, help="Transcriptions lancées simultanément")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Répliques testées")
+    asyncio.run(main(parser.parse_args()))
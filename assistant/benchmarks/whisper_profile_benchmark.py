@@ -0,0 +1,126 @@
+"""
+Benchmark des profils de transcription Whisper (WHISPER_PROFILES) : vitesse et précision.
+
+Chaque extrait audio du dossier --clips est accompagné de sa transcription de
+référence dans un fichier .txt de même nom (ex. livraison.wav + livraison.txt).
+Pour chaque profil : temps de chargement, RTF (temps de transcription / durée de
+l'audio, < 1 = plus rapide que le temps réel) et WER (taux d'erreur par mot
+après normalisation : minuscules, sans ponctuation).
+
+Les extraits ne sont pas versionnés (données vocales, licences) : déposer ses
+propres enregistrements dans ai/data/voice_samples ou passer --clips.
+
+Usage (depuis le dossier assistant/) :
+    uv run python -m benchmarks.whisper_profile_benchmark --clips ai/data/voice_samples --language fr
+"""
+import argparse
+import os
+import re
+import time
+import unicodedata
+from pathlib import Path
+
+import torch
+from faster_whisper import WhisperModel
+from faster_whisper.audio import decode_audio
+
+from app.services.voice_service import WHISPER_PROFILES
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".ogg", ".flac", ".m4a", ".webm", ".opus"}
+
+
+def normalize(text: str) -> list:
+    text = unicodedata.normalize("NFC", text.lower())
+    text = re.sub(r"[^\w\s']", " ", text).replace("'", " ")
+    return text.split()
+
+
+def word_errors(reference: list, hypothesis: list) -> int:
+    """Distance d'édition (substitutions, insertions, suppressions) entre deux suites de mots"""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1]
+
+
+def load_clips(clips_dir: Path) -> list:
+    clips = []
+    for path in sorted(clips_dir.iterdir()):
+        reference = path.with_suffix(".txt")
+        if path.suffix.lower() in AUDIO_EXTENSIONS and reference.exists():
+            audio = decode_audio(str(path), sampling_rate=16000)
+            clips.append((path.name, audio, reference.read_text(encoding="utf-8").strip()))
+    return clips
+
+
+def run_profile(profile, clips: list, args, cuda_available: bool):
+    compute_type = profile.compute_type(cuda_available)
+    start = time.perf_counter()
+    model = WhisperModel(
+        profile.model_size,
+        device="cuda" if cuda_available else "cpu",
+        compute_type=compute_type,
+        cpu_threads=args.cpu_threads,
+    )
+    load_time = time.perf_counter() - start
+    params = {**profile.transcribe_params(), "language": args.language}
+
+    # Préchauffage : la première transcription initialise les caches CTranslate2
+    list(model.transcribe(clips[0][1][:16000], **params)[0])
+
+    total_audio = total_time = 0.0
+    total_errors = total_words = 0
+    for name, audio, reference in clips:
+        start = time.perf_counter()
+        segments, _ = model.transcribe(audio, **params)
+        hypothesis = " ".join(segment.text.strip() for segment in segments)
+        elapsed = time.perf_counter() - start
+
+        duration = len(audio) / 16000
+        ref_words = normalize(reference)
+        errors = word_errors(ref_words, normalize(hypothesis))
+        total_audio += duration
+        total_time += elapsed
+        total_errors += errors
+        total_words += len(ref_words)
+        if args.verbose:
+            print(f"  {name:<28} {duration:5.1f} s | RTF {elapsed / duration:5.2f} | WER {errors / max(1, len(ref_words)):6.1%} | {hypothesis}")
+
+    print(
+        f"{profile.name:<10} {profile.model_size}/{compute_type:<13} beam {profile.beam_size} "
+        f"vad {'oui' if profile.vad_filter else 'non'} | chargement: {load_time:5.1f} s | "
+        f"RTF: {total_time / total_audio:5.3f} | WER: {total_errors / max(1, total_words):6.1%}"
+    )
+    del model
+
+
+def main(args):
+    clips_dir = Path(args.clips)
+    if not clips_dir.is_dir():
+        raise SystemExit(
+            f"Dossier d'extraits introuvable: {clips_dir}. Les extraits ne sont pas fournis avec le dépôt : "
+            "y déposer des fichiers audio accompagnés de leur transcription .txt, ou indiquer un autre dossier avec --clips"
+        )
+    clips = load_clips(clips_dir)
+    if not clips:
+        raise SystemExit(f"Aucun extrait audio avec transcription .txt dans {args.clips}")
+    cuda_available = torch.cuda.is_available() and not args.cpu
+    total = sum(len(audio) for _, audio, _ in clips) / 16000
+    print(f"{len(clips)} extraits ({total:.0f} s d'audio), {'cuda' if cuda_available else 'cpu'}, {args.cpu_threads} threads")
+
+    for name in args.profiles:
+        run_profile(WHISPER_PROFILES[name], clips, args, cuda_available)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark des profils de transcription Whisper")
+    parser.add_argument("--clips", default="ai/data/voice_samples", help="Dossier des extraits audio et de leurs .txt")
+    parser.add_argument("--profiles", nargs="+", default=list(WHISPER_PROFILES), choices=list(WHISPER_PROFILES))
+    parser.add_argument("--language", default=None, help="Langue imposée (détection automatique sinon)")
+    parser.add_argument("--cpu-threads", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--cpu", action="store_true", help="Forcer le CPU même si un GPU est disponible")
+    parser.add_argument("--verbose", action="store_true", help="Détail par extrait")
+    main(parser.parse_args())
@@ -0,0 +1,17 @@
+import pytest
+
+from ai.preparation.clean import _clean_with_soup, clean_text
+
+
+@pytest.mark.parametrize("html, expected", [
+    ('<p>Robe <b>en lin</b></p>', "Robe en lin"),
+    ('<div class="a>b">t</div>', "t"),
+    ('<img alt="a > b">z', "z"),
+    ("<a title='x > y' href=\"/p\">lien</a>", "lien"),
+    ('<p title="l\'été">été</p>', "été"),
+    ('<p>Prix &amp; livraison</p><!-- note --><script>var a = "<b>";</script>', "Prix & livraison"),
+    ("<p title=l'été>x</p>", "x"),
+])
+def test_clean_text_matches_html_parser(html, expected):
+    assert clean_text(html) == expected
+    assert _clean_with_soup(html) == expected
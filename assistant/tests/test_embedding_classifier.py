@@ -0,0 +1,62 @@
+import numpy as np
+
+from ai.utils.embedding_classifier import EmbeddingClassifier
+from ai.utils.model_loader import ModelLoader
+from app.config.settings import settings
+from app.enum.QueryType import QueryType
+
+MODEL_NAME = "test/keyword-embedding"
+VOCABULARY = ["livraison", "commande", "prix", "site", "bonjour", "merci", "revoir"]
+
+EXAMPLES = [
+    ("livraison commande", QueryType.PLATFORM_INFO),
+    ("prix livraison", QueryType.PLATFORM_INFO),
+    ("site commande", QueryType.PLATFORM_INFO),
+    ("commande prix site", QueryType.PLATFORM_INFO),
+    ("livraison site", QueryType.PLATFORM_INFO),
+    ("merci commande", QueryType.PLATFORM_INFO),
+    ("bonjour merci", QueryType.OTHER),
+    ("merci au revoir", QueryType.OTHER),
+    ("bonjour", QueryType.OTHER),
+    ("revoir bonjour", QueryType.OTHER),
+    ("bonjour livraison", QueryType.OTHER),
+    ("prix merci", QueryType.OTHER),
+]
+
+
+class KeywordEmbeddingModel:
+    """Embedding par comptage de mots-clés : pas de téléchargement de modèle"""
+
+    def encode(self, texts, normalize_embeddings=True, **kwargs):
+        single = isinstance(texts, str)
+        vectors = np.array([
+            [text.split().count(word) for word in VOCABULARY] + [0.5]
+            for text in ([texts] if single else texts)
+        ], dtype="float32")
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors[0] if single else vectors
+
+
+def build_classifier(monkeypatch, temperature):
+    monkeypatch.setattr(settings, "CLASSIFIER_TEMPERATURE", temperature)
+    ModelLoader._instances[MODEL_NAME] = KeywordEmbeddingModel()
+    classifier = EmbeddingClassifier(model_name=MODEL_NAME)
+    classifier.fit(EXAMPLES)
+    return classifier
+
+
+def test_temperature_is_fitted_on_examples(monkeypatch):
+    classifier = build_classifier(monkeypatch, None)
+    grid = EmbeddingClassifier.TEMPERATURE_GRID
+
+    assert grid[0] < classifier.temperature < grid[-1]
+    assert classifier.temperature == classifier.fit_temperature()[0]
+
+    query_type, confidence = classifier.predict("commande livraison")
+    assert query_type == QueryType.PLATFORM_INFO
+    assert 0.5 < confidence < 1.0
+
+
+def test_configured_temperature_is_kept(monkeypatch):
+    classifier = build_classifier(monkeypatch, 0.2)
+    assert classifier.temperature == 0.2
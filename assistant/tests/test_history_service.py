@@ -0,0 +1,96 @@
+import asyncio
+
+from app.services.history_service import HistoryService
+
+
+class FakeRedisManager:
+    """Remplace RedisManager : mémoire locale, ou erreur de connexion simulée"""
+
+    def __init__(self, available: bool = True):
+        self.session_id = "test-session"
+        self.available = available
+        self.saved = []
+
+    async def load_history(self, query_limit=None):
+        if not self.available:
+            raise ConnectionError("Redis indisponible")
+        return {}, []
+
+    async def get_data(self):
+        return None
+
+    async def save_history(self, fields, queries, replace=False, max_queries=50):
+        if not self.available:
+            raise ConnectionError("Redis indisponible")
+        self.saved.append((fields, queries))
+        return True
+
+
+def test_session_falls_back_to_empty_history_when_redis_fails():
+    service = HistoryService(FakeRedisManager(available=False))
+
+    async def run():
+        async with service.session() as history:
+            history.user_queries.append("bonjour")
+            return history
+
+    history = asyncio.run(run())
+    assert history.session_id == "test-session"
+    assert history.user_queries == ["bonjour"]
+
+
+def test_session_saves_only_new_queries():
+    redis_manager = FakeRedisManager()
+    service = HistoryService(redis_manager)
+
+    async def run():
+        async with service.session() as history:
+            history.lang = "fr"
+            history.user_queries.append("bonjour")
+
+    asyncio.run(run())
+    fields, queries = redis_manager.saved[-1]
+    assert fields["lang"] == "fr"
+    assert queries == ["bonjour"]
+
+
+class LegacyRedisManager(FakeRedisManager):
+    """Hash + liste en mémoire, avec un ancien blob JSON `session:*:history` préexistant"""
+
+    def __init__(self, legacy):
+        super().__init__()
+        self.legacy = legacy
+        self.meta, self.queries = {}, []
+
+    async def load_history(self, query_limit=None):
+        queries = self.queries[-query_limit:] if query_limit else ([] if query_limit == 0 else self.queries)
+        return dict(self.meta), list(queries)
+
+    async def get_data(self):
+        return self.legacy
+
+    async def save_history(self, fields, queries, replace=False, max_queries=50):
+        self.meta.update(fields)
+        if replace:
+            self.queries, self.legacy = [], None
+        self.queries = (self.queries + list(queries))[-max_queries:]
+        return True
+
+
+def test_add_query_keeps_legacy_history():
+    redis_manager = LegacyRedisManager({
+        "session_id": "test-session",
+        "lang": "ar",
+        "query_type": "",
+        "user_queries": ["bonjour", "prix du lait"],
+    })
+    service = HistoryService(redis_manager)
+
+    async def run():
+        await service.add_query("livraison ?")
+        return await service.get()
+
+    history = asyncio.run(run())
+    assert history.user_queries == ["bonjour", "prix du lait", "livraison ?"]
+    assert history.lang == "ar"
+    assert redis_manager.legacy is None
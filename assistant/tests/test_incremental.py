@@ -0,0 +1,70 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from ai.preparation.pipeline import RAGPipeline
+from ai.preparation.storage import ProductStore
+from ai.utils.model_loader import ModelLoader
+
+MODEL_NAME = "test/hash-embedding"
+
+
+class HashEmbeddingModel:
+    """Embedding déterministe (hash du texte) : pas de téléchargement de modèle"""
+
+    def get_sentence_embedding_dimension(self):
+        return 8
+
+    def encode(self, texts, normalize_embeddings=True, **kwargs):
+        vectors = np.array([
+            np.frombuffer(hashlib.sha256(text.encode("utf-8")).digest()[:8], dtype="uint8")
+            for text in texts
+        ], dtype="float32") + 1.0
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def catalog(ids):
+    return pd.DataFrame({
+        "id": [f"p{i}" for i in ids],
+        "name": [f"Produit {i}" for i in ids],
+        "text": [f"Produit {i} description" for i in ids],
+    })
+
+
+def test_incremental_sync_after_full_rebuild(tmp_path):
+    ModelLoader._instances[MODEL_NAME] = HashEmbeddingModel()
+    pipeline = RAGPipeline(MODEL_NAME, index_type="flat")
+    store = ProductStore(str(tmp_path))
+
+    # Synchronisation incrémentale, puis reconstruction complète d'un catalogue plus petit
+    pipeline.run_incremental(catalog(range(20)), str(tmp_path))
+    pipeline.run_incremental(catalog(range(5, 20)), str(tmp_path))
+    pipeline.run_from_dataframe(catalog(range(13)), str(tmp_path))
+
+    stats = pipeline.run_incremental(catalog(range(14)), str(tmp_path))
+    assert stats["added"] == 1 and stats["unchanged"] == 13
+
+    index, metadata = store.load_index(mmap=False), store.load_metadata()
+    manifest = store.load_manifest()
+    assert manifest["next_row"] == len(store.load_vectors()) == metadata.num_rows
+    # Chaque identifiant FAISS pointe vers la ligne de métadonnées du même produit
+    for pid, entry in manifest["products"].items():
+        assert metadata.column("id")[entry["row"]].as_py() == pid
+    assert index.ntotal == 14
+
+
+def test_stale_manifest_triggers_full_build(tmp_path):
+    ModelLoader._instances[MODEL_NAME] = HashEmbeddingModel()
+    pipeline = RAGPipeline(MODEL_NAME, index_type="flat")
+    store = ProductStore(str(tmp_path))
+
+    pipeline.run_incremental(catalog(range(20)), str(tmp_path))
+    # Fichiers réécrits par un autre outil, manifest laissé tel quel
+    pipeline.run_from_dataframe(catalog(range(13)).drop(columns=["id"]), str(tmp_path))
+    assert store.load_manifest() == {}
+
+    store.save_manifest({"products": {}, "tombstones": [], "next_row": 20})
+    stats = pipeline.run_incremental(catalog(range(14)), str(tmp_path))
+    assert stats["added"] == 14
+    assert store.load_manifest()["next_row"] == 14
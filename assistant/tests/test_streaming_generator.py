@@ -0,0 +1,94 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import numpy as np
+
+from ai.llm.errors import LLMStreamError
+from app.schemas.history import History
+from app.services.streaming_generator_service import StreamingGenerator
+
+
+class FakeHistoryService:
+    @asynccontextmanager
+    async def session(self, query_limit=None):
+        yield History(session_id="test-session", user_queries=[])
+
+
+class FakeLanguageService:
+    async def process_language(self, query):
+        return query, "fr"
+
+
+class FakeResponseService:
+    """Quelques tokens puis, si demandé, une coupure du flux LLM"""
+
+    def __init__(self, fail: bool):
+        self.fail = fail
+
+    async def _generate_site_response(self, query, history=None):
+        async def generate():
+            yield "Bonjour, "
+            yield "voici"
+            if self.fail:
+                raise LLMStreamError("Erreur lors de la génération de la réponse")
+        return generate()
+
+
+class FakeCache:
+    def __init__(self):
+        self.stored = []
+
+    def is_cacheable(self, query_type):
+        return True
+
+    async def embed(self, query):
+        return np.ones(4, dtype="float32")
+
+    def lookup(self, embedding, lang, query_type):
+        return None
+
+    def store(self, embedding, lang, query_type, query, events):
+        self.stored.append(events)
+
+
+def run_generator(fail: bool):
+    generator = StreamingGenerator(
+        history_service=FakeHistoryService(),
+        classifier=object(),
+        response=FakeResponseService(fail),
+        language_service=FakeLanguageService(),
+    )
+    generator.response_cache = FakeCache()
+
+    async def collect():
+        return [event async for event in generator.generate_stream("livraison ?")]
+
+    return asyncio.run(collect()), generator.response_cache
+
+
+def test_interrupted_response_is_not_cached():
+    events, cache = run_generator(fail=True)
+    assert events[:2] == ["event: message\ndata: Bonjour, \n\n", "event: message\ndata: voici\n\n"]
+    assert events[-1] == "event: error\ndata: Erreur lors de la génération de la réponse\n\n"
+    assert cache.stored == []
+
+
+def test_complete_response_is_cached():
+    events, cache = run_generator(fail=False)
+    assert cache.stored == [events]
+
+
+def test_site_route_ends_stream_with_error_message():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.container import get_response_service
+    from app.routes.search_routes import router
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_response_service] = lambda: FakeResponseService(fail=True)
+
+    response = TestClient(app).post("/search/site", params={"request": "livraison ?"})
+    assert response.status_code == 200
+    assert response.text == "Bonjour, voiciErreur lors de la génération de la réponse"
@@ -0,0 +1,47 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config.settings import settings
+from app.container import get_voice_service
+from app.routes.voice_routes import router
+
+
+class FakeVoiceService:
+    def __init__(self):
+        self.calls = 0
+
+    async def transcribe(self, file, profile=None):
+        self.calls += 1
+        data = await file.read()
+        return {"language": "fr", "language_probability": 1.0, "profile": "fast",
+                "segments": [{"start": 0.0, "end": 1.0, "text": f"{len(data)} octets"}]}
+
+
+def client_with(voice_service):
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_voice_service] = lambda: voice_service
+    return TestClient(app)
+
+
+def test_oversized_upload_is_rejected_from_content_length(monkeypatch):
+    monkeypatch.setattr(settings, "VOICE_MAX_UPLOAD_BYTES", 1024 * 1024)
+    voice_service = FakeVoiceService()
+
+    response = client_with(voice_service).post(
+        "/transcribe", files={"file": ("long.wav", b"\0" * (2 * 1024 * 1024), "audio/wav")}
+    )
+    assert response.status_code == 413
+    assert voice_service.calls == 0
+
+
+def test_upload_within_limit_reaches_the_service(monkeypatch):
+    monkeypatch.setattr(settings, "VOICE_MAX_UPLOAD_BYTES", 1024 * 1024)
+    voice_service = FakeVoiceService()
+
+    response = client_with(voice_service).post(
+        "/transcribe", files={"file": ("court.wav", b"\0" * 1000, "audio/wav")}
+    )
+    assert response.status_code == 200
+    assert response.json()["segments"][0]["text"] == "1000 octets"
+    assert voice_service.calls == 1
@@ -0,0 +1,47 @@
+import asyncio
+import threading
+
+from ai.utils.whisper_pool import TranscriptionQueueFull, WhisperPool
+
+
+class BlockingModel:
+    """Modèle factice : la transcription attend que le test la libère"""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def transcribe(self, audio, **params):
+        self.release.wait(timeout=5)
+        return iter([]), "info"
+
+
+def test_cancelled_caller_keeps_slot_until_thread_finishes():
+    pool = WhisperPool(workers=1, max_queue=0)
+    model = BlockingModel()
+    audio = [0.0] * 16000
+
+    async def run():
+        task = asyncio.create_task(pool.transcribe(model, audio))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.sleep(0.05)
+        # La transcription tourne encore : la place reste occupée
+        assert pool._pending == 1
+        try:
+            await pool.transcribe(model, audio)
+            raise AssertionError("TranscriptionQueueFull attendu")
+        except TranscriptionQueueFull:
+            pass
+
+        model.release.set()
+        for _ in range(100):
+            if pool._pending == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert pool._pending == 0
+        await pool.transcribe(model, audio)
+
+    try:
+        asyncio.run(run())
+    finally:
+        pool.shutdown()